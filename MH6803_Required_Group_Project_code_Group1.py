@@ -22,235 +22,10 @@ License:
 """
 
 import re
-import locale
-import unittest
-from enum import Enum, auto
-from unittest.mock import patch
-from unittest.runner import TextTestResult
-
-
-class TestBorrowerDetails(unittest.TestCase):
-
-    def test_validate_full_name_valid(self):
-        valid_names = [
-            "John Doe",
-            "Dirceu de Medeiros Teixeira",
-            "José Silva",
-            "Marie Curie",
-            "René Descartes",
-            "Müller",
-            "李小龙",
-            "Иван Иванович"
-        ]
-        for name in valid_names:
-            self.assertTrue(validate_full_name(name), f"'{name}' should be valid")
-
-    def test_validate_full_name_invalid(self):
-        invalid_names = [
-            "123 John",
-            "John_Doe",
-            "John@Doe",
-            "",
-            " "
-        ]
-        for name in invalid_names:
-            self.assertFalse(validate_full_name(name), f"'{name}' should be invalid")
-
-    def test_get_age_status(self):
-        self.assertEqual(invalid_guarantors_age(20), True, "Age 20 should be REJECTED")
-        self.assertEqual(invalid_guarantors_age(65), False, "Age 65 should be ACCEPTED")
-        self.assertEqual(invalid_guarantors_age(21), False, "Age 21 should be ACCEPTED")
-        self.assertEqual(invalid_guarantors_age(66), True, "Age 66 should be REJECTED")
-
-    def test_get_guarantor_score(self):
-        self.assertEqual(get_guarantor_score(1), 5, "1 guarantor should give a score of 5")
-        self.assertEqual(get_guarantor_score(2), 4, "2 guarantors should give a score of 4")
-        self.assertEqual(get_guarantor_score(3), 3, "3 guarantors should give a score of 3")
-        self.assertEqual(get_guarantor_score(4), 2, "4 guarantors should give a score of 2")
-        self.assertEqual(get_guarantor_score(5), 1, "More than 4 guarantors should give a score of 1")
-
-    def test_grade_score_enum(self):
-        self.assertEqual(GradeScore.A.value, 1, "GradeScore A should have value 1")
-        self.assertEqual(GradeScore.B.value, 2, "GradeScore B should have value 2")
-
-    @patch('builtins.input', side_effect=["123 John", "John Doe"])
-    def test_get_borrower_name_invalid(self, mock):
-        result = input_borrower_full_name()
-        self.assertEqual(result, "John Doe", "The function should return the valid name after invalid attempts")
-
-    @patch('builtins.input', side_effect=["John Doe", "John Doe"])
-    def test_get_borrower_name(self, mock):
-        result = input_borrower_full_name()
-        self.assertEqual(result, "John Doe", "The function should return the valid name immediately")
-
-    def test_get_grade_history_score(self):
-        self.assertEqual(get_grade_history_score("A"), 1, "Grade A should give a score of 1")
-        self.assertEqual(get_grade_history_score("B"), 2, "Grade B should give a score of 2")
-        self.assertEqual(get_grade_history_score("C"), 3, "Grade C should give a score of 3")
-
-    def test_get_bank_status_score(self):
-        self.assertEqual(get_bank_status_score(ClientBankStatus.NEW_BANK), 4, "New Bank should give a score of 4")
-        self.assertEqual(get_bank_status_score(ClientBankStatus.EXISTING_TO_A_BANK), 2,
-                         "Existing Bank should give a score of 2")
-
-    def test_get_entity_type_score(self):
-        self.assertEqual(get_entity_type_score(EntityType.SOLE_PROPRIETORSHIP), 3,
-                         "Sole Proprietorship should give a score of 3")
-        self.assertEqual(get_entity_type_score(EntityType.LIMITED_PARTNERSHIP), 2,
-                         "Limited Partnership should give a score of 2")
-        self.assertEqual(get_entity_type_score(EntityType.COMPANY_LIMITED), 1,
-                         "Company Limited should give a score of 1")
-
-    def test_get_borrow_history_status(self):
-        self.assertEqual(invalid_borrow_history_grade("A"), False, "Grade A should not reject")
-        self.assertEqual(invalid_borrow_history_grade("C"), False, "Grade C should not reject")
-        self.assertEqual(invalid_borrow_history_grade("D"), True, "Grade D should be rejected")
-        self.assertEqual(invalid_borrow_history_grade("Z"), True, "Grade Z should be rejected")
-
-    def test_validate_borrower_history(self):
-        self.assertTrue(validate_borrower_history("A"), "History 'A' should be valid")
-        self.assertTrue(validate_borrower_history("B"), "History 'B' should be valid")
-        self.assertFalse(validate_borrower_history("123"), "Numeric history should be invalid")
-        self.assertFalse(validate_borrower_history(""), "Empty history should be invalid")
-
-    def test_validate_client_bank_status_option(self):
-        self.assertTrue(validate_client_bank_status_option("1"), "Option '1' should be valid")
-        self.assertTrue(validate_client_bank_status_option("2"), "Option '2' should be valid")
-        self.assertFalse(validate_client_bank_status_option("3"), "Option '3' should be invalid")
-
-    def test_validate_number_input(self):
-        self.assertTrue(validate_number_input("5"), "Number '5' should be valid")
-        self.assertFalse(validate_number_input("-1"), "Negative numbers should be invalid")
-        self.assertFalse(validate_number_input("abc"), "Non-numeric input should be invalid")
-
-    def test_validate_entity_type(self):
-        self.assertTrue(validate_entity_type("1"), "Option '1' should be valid")
-        self.assertTrue(validate_entity_type("2"), "Option '2' should be valid")
-        self.assertTrue(validate_entity_type("3"), "Option '3' should be valid")
-        self.assertFalse(validate_entity_type("4"), "Option '4' should be invalid")
-
-    def test_validate_property_type(self):
-        self.assertTrue(validate_property_type("1"), "Option '1' should be valid")
-        self.assertTrue(validate_property_type("2"), "Option '2' should be valid")
-        self.assertFalse(validate_property_type("5"), "Option '5' should be invalid")
-
-    def test_validate_property_location(self):
-        self.assertTrue(validate_property_location("1"), "Option '1' should be valid")
-        self.assertTrue(validate_property_location("2"), "Option '2' should be valid")
-        self.assertFalse(validate_property_location("4"), "Option '4' should be invalid")
-
-    def test_validate_property_status_input(self):
-        self.assertTrue(validate_property_status_input("1"), "Option '1' should be valid")
-        self.assertTrue(validate_property_status_input("2"), "Option '2' should be valid")
-        self.assertFalse(validate_property_status_input("3"), "Option '3' should be invalid")
-
-    def test_validate_type_of_facility_applying_input(self):
-        self.assertTrue(validate_type_of_facility_applying_input("1"), "Option '1' should be valid")
-        self.assertTrue(validate_type_of_facility_applying_input("2"), "Option '2' should be valid")
-        self.assertFalse(validate_type_of_facility_applying_input("3"), "Option '3' should be invalid")
-
-    def test_get_debt_to_sales_ratio(self):
-        self.assertAlmostEqual(get_debt_to_sales_ratio(50000, 100000), 50.0, msg="Ratio should be 50.0%")
-        self.assertAlmostEqual(get_debt_to_sales_ratio(20000, 50000), 40.0, msg="Ratio should be 40.0%")
-
-    def test_get_loan_to_valuation(self):
-        self.assertAlmostEqual(get_loan_to_valuation_ratio(50000, 100000), 50.0, msg="Ratio should be 50.0%")
-        self.assertAlmostEqual(get_loan_to_valuation_ratio(20000, 50000), 40.0, msg="Ratio should be 40.0%")
-
-    def test_get_debt_to_income_ratio(self):
-        self.assertAlmostEqual(get_debt_to_income_ratio(50000, 100000), 50.0, msg="Ratio should be 50.0%")
-        self.assertAlmostEqual(get_debt_to_income_ratio(20000, 50000), 40.0, msg="Ratio should be 40.0%")
-
-    def test_get_debt_sales_ratio_score(self):
-        self.assertEqual(get_debt_sales_ratio_score(75), 0, "Ratio > 70% should return 0")
-        self.assertEqual(get_debt_sales_ratio_score(65), 4, "Ratio between 60-70% should return 4")
-        self.assertEqual(get_debt_sales_ratio_score(50), 3, "Ratio between 50-59% should return 3")
-        self.assertEqual(get_debt_sales_ratio_score(30), 1, "Ratio < 40% should return 1")
-
-    def test_get_to_income_ratio_score(self):
-        self.assertEqual(get_to_income_ratio_score(60), 0, "Ratio > 55% should return 0")
-        self.assertEqual(get_to_income_ratio_score(50), 3, "Ratio between 35-55% should return 3")
-        self.assertEqual(get_to_income_ratio_score(20), 1, "Ratio < 35% should return 1")
-
-    def test_get_loan_to_valuation_ratio_score(self):
-        self.assertEqual(get_loan_to_valuation_ratio_score(85), 0, "Ratio > 80% should return 0")
-        self.assertEqual(get_loan_to_valuation_ratio_score(75), 2, "Ratio between 60-79% should return 2")
-        self.assertEqual(get_loan_to_valuation_ratio_score(50), 1, "Ratio < 60% should return 1")
-
-    def test_calculate_score_and_update_status(self):
-        borrower_credit_analysis = BorrowerCreditAnalysis()
-
-        borrower_credit_analysis.get_borrower_information_details_score = lambda: 10
-        borrower_credit_analysis.get_financial_details_score = lambda: 5
-        borrower_credit_analysis.get_collateral_details_score = lambda: 3
-        borrower_credit_analysis.get_facility_details_score = lambda: 3
-        borrower_credit_analysis.min_total_credit_score = 20
-
-        borrower_credit_analysis.calculate_score_and_update_status()
-        self.assertEqual(
-            borrower_credit_analysis.borrower_analysis_status, BorrowStatus.REJECTED,
-            "Score >= min_total_credit_score should set status to REJECTED"
-        )
-
-        borrower_credit_analysis.get_borrower_information_details_score = lambda: 9
-        borrower_credit_analysis.get_financial_details_score = lambda: 5
-        borrower_credit_analysis.get_collateral_details_score = lambda: 3
-        borrower_credit_analysis.get_facility_details_score = lambda: 2
-
-        borrower_credit_analysis.calculate_score_and_update_status()
-        self.assertEqual(
-            borrower_credit_analysis.borrower_analysis_status, BorrowStatus.ACCEPTED,
-            "Score < min_total_credit_score should set status to ACCEPTED"
-        )
-
-    def test_display_rejection_reasons(self):
-        borrower_credit_analysis = BorrowerCreditAnalysis()
-        borrower_credit_analysis.rejection_reasons.append("Debt-to-sales ratio exceeds 70%.")
-        self.assertIn("Debt-to-sales ratio exceeds 70%.",
-                      borrower_credit_analysis.get_rejection_results()['rejection_reasons'])
-
-    @patch('builtins.input', side_effect=["50000", "100000", "200000"])
-    def test_financial_details_inputs(self, mock_input):
-        details = financial_details()
-        self.assertEqual(details[0], 50000, "Total debt input mismatch")
-        self.assertEqual(details[1], 100000, "Gross income input mismatch")
-        self.assertEqual(details[2], 200000, "Total sales input mismatch")
-
-    @patch('builtins.input', side_effect=["1", "2", "3", "4"])
-    def test_property_inputs(self, mock_input):
-        location_of_property = input_location_of_property()
-        self.assertEqual(location_of_property, property_location_dic["1"], "Location property input mismatch")
-
-        type_of_property = input_type_of_property()
-        self.assertEqual(type_of_property, property_type_dic["2"], "Property type input mismatch")
-
-    @patch('builtins.input', side_effect=["1", "50000", "75000"])
-    def test_facility_inputs(self, mock_input):
-        type_of_facility, applied_loan_amount = facility_details()
-        self.assertEqual(type_of_facility, type_of_facility_applying_dic["1"], "Facility type mismatch")
-        self.assertEqual(applied_loan_amount, 50000, "Loan amount mismatch")
-
-
-class TestResult(TextTestResult):
-    def __init__(self, *args):
-        super().__init__(*args)
-        self.test_cases = []
-
-    def addSuccess(self, test):
-        super().addSuccess(test)
-        self.test_cases.append(f"{test} - PASSED")
-
-    def addFailure(self, test, err):
-        super().addFailure(test, err)
-        self.test_cases.append(f"{test} - FAILED")
-
-    def addError(self, test, err):
-        super().addError(test, err)
-        self.test_cases.append(f"{test} - ERROR")
-
-    def addSkip(self, test, reason):
-        super().addSkip(test, reason)
-        self.test_cases.append(f"{test} - SKIPPED")
+import math
+from bisect import bisect_right
+from enum import Enum, IntFlag, auto
+from typing import NamedTuple
 
 
 def run_tests():
@@ -258,11 +33,17 @@ def run_tests():
     Manually add test cases to the test suite and run unit tests
     before executing the main program.
     """
+    import unittest
+    from test_MH6803_Required_Group_Project_code_Group1 import (TestBorrowerDetails, TestScorecard, TestSectionResults,
+                                                           TestResult)
+
     print("Running tests...")
 
     suite = unittest.TestSuite()
     loader = unittest.TestLoader()
     suite.addTest(loader.loadTestsFromTestCase(TestBorrowerDetails))
+    suite.addTest(loader.loadTestsFromTestCase(TestScorecard))
+    suite.addTest(loader.loadTestsFromTestCase(TestSectionResults))
 
     runner = unittest.TextTestRunner(verbosity=2, resultclass=TestResult)
     result = runner.run(suite)
@@ -379,6 +160,13 @@ INVALID_TOTAL_SALES_PER_YEAR_MESSAGE = "Please enter total sales per year a numb
 ERROR_MESSAGE_CLIENT_BANK_STATUS = "Sorry! Please Choose '1' for New bank or '2' for Existing to a bank."
 ERROR_UPDATE_SCORE_MESSAGE = "Invalid score. Please provide an integer value."
 ERROR_MESSAGE_ENTITY_TYPE = "Sorry! Please Choose \n'1' for Sole Proprietorship or \n'2' for Limited Partnership or \n'3' for Company Limited \n."
+REJECTION_BORROWING_HISTORY_MESSAGE = "Only borrowing history A,B or C are accepted."
+REJECTION_GUARANTOR_AGE_MESSAGE = "Guarantor age is invalid (either below 21 or above 65)."
+REJECTION_NO_GUARANTORS_MESSAGE = "No guarantors provided."
+REJECTION_DEBT_TO_SALES_MESSAGE = "Debt-to-sales ratio exceeds 70%."
+REJECTION_DEBT_TO_INCOME_MESSAGE = "Debt-to-income ratio exceeds 55%."
+REJECTION_UNDER_CONSTRUCTION_MESSAGE = "Property is under construction."
+REJECTION_LOAN_TO_VALUATION_MESSAGE = "Loan-to-valuation ratio exceeds 80%."
 
 
 class EntityType(Enum):
@@ -405,6 +193,45 @@ class ClientBankStatus(Enum):
     EXISTING_TO_A_BANK = 2
 
 
+class RejectionReason(IntFlag):
+    """
+    Why an application was rejected, one bit per reason. A section ORs its reasons
+    into a single integer; the *_SCORE bits mark a score at or above its threshold.
+    """
+    BORROWING_HISTORY = auto()
+    GUARANTOR_AGE = auto()
+    NO_GUARANTORS = auto()
+    DEBT_TO_SALES = auto()
+    DEBT_TO_INCOME = auto()
+    UNDER_CONSTRUCTION = auto()
+    LOAN_TO_VALUATION = auto()
+    BORROWER_SCORE = auto()
+    FINANCIAL_SCORE = auto()
+    COLLATERAL_SCORE = auto()
+    FACILITY_SCORE = auto()
+    TOTAL_SCORE = auto()
+
+
+NO_REJECTION = RejectionReason(0)
+
+# messages shown by display_rejection_reasons, in the order they are printed;
+# the threshold bits have no message of their own
+REJECTION_REASON_MESSAGES = {
+    RejectionReason.BORROWING_HISTORY: REJECTION_BORROWING_HISTORY_MESSAGE,
+    RejectionReason.GUARANTOR_AGE: REJECTION_GUARANTOR_AGE_MESSAGE,
+    RejectionReason.NO_GUARANTORS: REJECTION_NO_GUARANTORS_MESSAGE,
+    RejectionReason.DEBT_TO_SALES: REJECTION_DEBT_TO_SALES_MESSAGE,
+    RejectionReason.DEBT_TO_INCOME: REJECTION_DEBT_TO_INCOME_MESSAGE,
+    RejectionReason.UNDER_CONSTRUCTION: REJECTION_UNDER_CONSTRUCTION_MESSAGE,
+    RejectionReason.LOAN_TO_VALUATION: REJECTION_LOAN_TO_VALUATION_MESSAGE,
+}
+
+
+def rejection_messages(reasons) -> tuple:
+    """Messages for the bits set in reasons (a RejectionReason or a plain int)."""
+    return tuple(message for reason, message in REJECTION_REASON_MESSAGES.items() if reasons & reason)
+
+
 class BorrowStatus(Enum):
     ACCEPTED = auto()
     REJECTED = auto()
@@ -421,7 +248,22 @@ class TypeFacilityApplying(Enum):
     TERM_LOAN = 1
 
 
-locale.setlocale(locale.LC_ALL, 'en_US.UTF-8')
+REPORT_LOCALE = 'en_US.UTF-8'
+_report_locale = None  # the locale module, once a report has set it up
+
+
+def format_currency(amount) -> str:
+    """
+    Format an amount for the reports. The locale module is only imported and set the
+    first time a report needs it, so scoring-only callers (batch jobs, worker processes)
+    never pay for it.
+    """
+    global _report_locale
+    if _report_locale is None:
+        import locale
+        locale.setlocale(locale.LC_ALL, REPORT_LOCALE)
+        _report_locale = locale
+    return _report_locale.currency(amount, grouping=True)
 
 
 class FinancialDetails:
@@ -461,6 +303,69 @@ class Borrower:
         self.borrowing_history = borrowing_history
 
 
+class SectionResult(NamedTuple):
+    """Immutable outcome of scoring one section of an application."""
+    score: int
+    reasons: RejectionReason = NO_REJECTION
+    debt_to_sales_ratio: float = None
+    debt_to_income_ratio: float = None
+    loan_to_valuation_ratio: float = None
+
+    @property
+    def rejected(self) -> bool:
+        return bool(self.reasons)
+
+    @property
+    def rejection_reasons(self) -> tuple:
+        return rejection_messages(self.reasons)
+
+
+EMPTY_SECTION_RESULT = SectionResult(0)
+
+
+# the order the sections are collected and scored in
+SECTION_NAMES = ("borrower", "financial", "collateral", "facility")
+
+
+class CreditDecision(NamedTuple):
+    """
+    Outcome of BorrowerCreditAnalysis.evaluate(). After evaluate_staged() the sections
+    following the first rejecting one are None and total_credit_score is None.
+    """
+    status: BorrowStatus
+    total_credit_score: int
+    borrower: SectionResult
+    financial: SectionResult
+    collateral: SectionResult
+    facility: SectionResult
+    reasons: RejectionReason = NO_REJECTION
+
+    @property
+    def sections(self) -> tuple:
+        return self.borrower, self.financial, self.collateral, self.facility
+
+    @property
+    def rejection_reasons(self) -> list:
+        return list(rejection_messages(self.reasons))
+
+    @property
+    def rejected_stage(self) -> str:
+        """First section that rejected on its own, "total" for the total threshold, None when accepted."""
+        for name, section in zip(SECTION_NAMES, self.sections):
+            if section is not None and section.rejected:
+                return name
+        if self.status == BorrowStatus.REJECTED:
+            return "total"
+        return None
+
+
+def final_status(total_credit_score: int, min_total_credit_score: int, section_rejected: bool) -> BorrowStatus:
+    # a section that rejected on its own keeps the application rejected
+    if total_credit_score >= min_total_credit_score or section_rejected:
+        return BorrowStatus.REJECTED
+    return BorrowStatus.ACCEPTED
+
+
 class BorrowerCreditAnalysis:
     def __init__(self, borrower_information_details: Borrower = None,
                  borrower_financial_details: FinancialDetails = None,
@@ -471,7 +376,8 @@ class BorrowerCreditAnalysis:
                  min_collateral_score=5,
                  min_facility_score=4,
                  min_total_credit_score=20,
-                 total_credit_score=0):
+                 total_credit_score=0,
+                 scorecard=None):
         self.borrower_information_details = borrower_information_details
         self.borrower_financial_details = borrower_financial_details
         self.borrower_collateral_detail = borrower_collateral_detail
@@ -484,82 +390,73 @@ class BorrowerCreditAnalysis:
         self.min_facility_score = min_facility_score
         self.min_total_credit_score = min_total_credit_score
         self.total_credit_score = total_credit_score
+        self.scorecard = scorecard or DEFAULT_SCORECARD
+        # reasons recorded by callers on top of the ones produced by the sections
         self.rejection_reasons = []
+        self._section_results = {}
+
+    # ------------------------------------------ Cached section results ------------------------------------------------
+    # Each section is evaluated once per set of inputs. The cache entry is keyed by the
+    # details objects, the scorecard and the section threshold, so assigning new details
+    # or changing a threshold re-scores that section only. Details objects are treated as
+    # read-only once they have been scored.
+
+    def _section(self, name, evaluate, *inputs) -> SectionResult:
+        cached = self._section_results.get(name)
+        if cached is None or cached[0] != inputs:
+            cached = (inputs, evaluate(*inputs))
+            self._section_results[name] = cached
+        return cached[1]
+
+    def borrower_section(self) -> SectionResult:
+        if self.borrower_information_details is None:
+            return EMPTY_SECTION_RESULT
+        return self._section("borrower", evaluate_borrower_section, self.borrower_information_details,
+                             self.scorecard, self.min_borrow_info_score)
+
+    def financial_section(self) -> SectionResult:
+        if self.borrower_financial_details is None:
+            return EMPTY_SECTION_RESULT
+        return self._section("financial", evaluate_financial_section, self.borrower_financial_details,
+                             self.scorecard, self.min_financial_details_score)
+
+    def collateral_section(self) -> SectionResult:
+        if self.borrower_collateral_detail is None:
+            return EMPTY_SECTION_RESULT
+        return self._section("collateral", evaluate_collateral_section, self.borrower_collateral_detail,
+                             self.scorecard, self.min_collateral_score)
+
+    def facility_section(self) -> SectionResult:
+        if self.borrower_facility_details is None:
+            return EMPTY_SECTION_RESULT
+        return self._section("facility", evaluate_facility_section, self.borrower_facility_details,
+                             self.borrower_collateral_detail, self.scorecard, self.min_facility_score)
+
+    def sections(self) -> tuple:
+        return self.borrower_section(), self.financial_section(), self.collateral_section(), self.facility_section()
+
+    def _apply_section(self, section: SectionResult) -> int:
+        if section.rejected:
+            self.borrower_analysis_status = BorrowStatus.REJECTED
+        return section.score
+
+    # ------------------------------------------ Scoring ---------------------------------------------------------------
 
     def get_borrower_information_details_score(self):
-        if self.borrower_information_details is not None:
-            if invalid_guarantors_age(
-                    self.borrower_information_details.age_of_guarantors) or self.borrower_information_details.number_of_guarantors < 1 or invalid_borrow_history_grade(
-                self.borrower_information_details.borrowing_history):
-                self.borrower_analysis_status = BorrowStatus.REJECTED
-            borrower_score = (
-                    get_entity_type_score(self.borrower_information_details.entity_type) +
-                    get_bank_status_score(self.borrower_information_details.bank_status) +
-                    get_guarantor_score(self.borrower_information_details.number_of_guarantors) +
-                    get_grade_history_score(self.borrower_information_details.borrowing_history.upper())
-            )
-            if invalid_borrow_history_grade(self.borrower_information_details.borrowing_history):
-                self.rejection_reasons.append("Only borrowing history A,B or C are accepted.")
-            if invalid_guarantors_age(self.borrower_information_details.age_of_guarantors):
-                self.rejection_reasons.append("Guarantor age is invalid (either below 21 or above 65).")
-            if self.borrower_information_details.number_of_guarantors < 1:
-                self.rejection_reasons.append("No guarantors provided.")
-            if borrower_score >= self.min_borrow_info_score:
-                self.borrower_analysis_status = BorrowStatus.REJECTED
-
-            return borrower_score
-        return 0
+        return self._apply_section(self.borrower_section())
 
     def get_financial_details_score(self):
-        if self.borrower_financial_details is not None:
-            debt_to_sales_ratio = get_debt_to_sales_ratio(self.borrower_financial_details.current_total_debt,
-                                                          self.borrower_financial_details.total_sales_per_year)
-            debt_to_income_ratio = get_debt_to_income_ratio(self.borrower_financial_details.current_total_debt,
-                                                            self.borrower_financial_details.gross_income)
-
-            current_debt_sales_ratio_score = get_debt_sales_ratio_score(debt_to_sales_ratio)
-            current_debt_to_income_score = get_to_income_ratio_score(debt_to_income_ratio)
-            if debt_to_sales_ratio > 70:
-                self.rejection_reasons.append("Debt-to-sales ratio exceeds 70%.")
-            if debt_to_income_ratio > 55:
-                self.rejection_reasons.append("Debt-to-income ratio exceeds 55%.")
-            if current_debt_sales_ratio_score == 0 or current_debt_to_income_score == 0:
-                self.borrower_analysis_status = BorrowStatus.REJECTED
-            financial_details_score = (current_debt_sales_ratio_score + current_debt_to_income_score)
-            if financial_details_score >= self.min_financial_details_score:
-                self.borrower_analysis_status = BorrowStatus.REJECTED
-            return financial_details_score
-        return 0
+        return self._apply_section(self.financial_section())
 
     def get_collateral_details_score(self):
-        if self.borrower_collateral_detail is not None:
-            if self.borrower_collateral_detail.current_property_status == CurrentPropertyStatus.UNDER_CONSTRUCTION:
-                self.rejection_reasons.append("Property is under construction.")
-                self.borrower_analysis_status = BorrowStatus.REJECTED
-            total_collateral_details_score = (int(self.borrower_collateral_detail.type_of_property.value) + int(
-                self.borrower_collateral_detail.location_of_the_property.value))
-            if total_collateral_details_score >= self.min_collateral_score:
-                self.borrower_analysis_status = BorrowStatus.REJECTED
-            return total_collateral_details_score
-        return 0
+        return self._apply_section(self.collateral_section())
 
     def get_facility_details_score(self):
-        if self.borrower_facility_details is not None:
-            loan_to_valuation_score = get_loan_to_valuation_ratio_score(
-                get_loan_to_valuation_ratio(self.borrower_facility_details.applied_loan_amount,
-                                            self.borrower_collateral_detail.current_market_value))
-
-            if loan_to_valuation_score == 0:
-                self.rejection_reasons.append("Loan-to-valuation ratio exceeds 80%.")
-                self.borrower_analysis_status = BorrowStatus.REJECTED
-            total_facility_details_score = (
-                    int(self.borrower_facility_details.type_of_facility_applying.value) + loan_to_valuation_score)
-            if total_facility_details_score >= self.min_facility_score:
-                self.borrower_analysis_status = BorrowStatus.REJECTED
-            return total_facility_details_score
-        return 0
+        return self._apply_section(self.facility_section())
 
     def calculate_score_and_update_status(self):
+        self.borrower_analysis_status = BorrowStatus.IN_PROGRESS
+
         # borrow details
         borrower_details_score = self.get_borrower_information_details_score()
 
@@ -573,25 +470,65 @@ class BorrowerCreditAnalysis:
         total_facility_details_score = self.get_facility_details_score()
 
         self.total_credit_score = borrower_details_score + total_financial_details_score + total_collateral_details_score + total_facility_details_score
-        if self.total_credit_score >= self.min_total_credit_score:
-            self.borrower_analysis_status = BorrowStatus.REJECTED
-        else:
-            self.borrower_analysis_status = BorrowStatus.ACCEPTED
+        self.borrower_analysis_status = final_status(
+            self.total_credit_score, self.min_total_credit_score,
+            self.borrower_analysis_status == BorrowStatus.REJECTED)
 
         return self.total_credit_score
 
+    def evaluate(self) -> CreditDecision:
+        """
+        Score every section and return the decision without changing the analysis,
+        so the same object can be evaluated from several threads.
+        """
+        borrower, financial, collateral, facility = self.sections()
+        total_credit_score = borrower.score + financial.score + collateral.score + facility.score
+        reasons = borrower.reasons | financial.reasons | collateral.reasons | facility.reasons
+        if total_credit_score >= self.min_total_credit_score:
+            reasons |= RejectionReason.TOTAL_SCORE
+        return CreditDecision(final_status(total_credit_score, self.min_total_credit_score, bool(reasons)),
+                              total_credit_score, borrower, financial, collateral, facility, reasons)
+
+    def evaluate_staged(self) -> CreditDecision:
+        """
+        Score the sections in order and stop at the first one that rejects, like the
+        interactive flow does. Sections without details are never looked at either, so
+        callers can attach details one stage at a time.
+        """
+        sections = []
+        for section_result in (self.borrower_section, self.financial_section, self.collateral_section,
+                               self.facility_section):
+            section = section_result()
+            sections.append(section)
+            if section.rejected:
+                sections.extend([None] * (len(SECTION_NAMES) - len(sections)))
+                return CreditDecision(BorrowStatus.REJECTED, None, *sections, section.reasons)
+        total_credit_score = sum(section.score for section in sections)
+        reasons = RejectionReason.TOTAL_SCORE if total_credit_score >= self.min_total_credit_score else NO_REJECTION
+        return CreditDecision(final_status(total_credit_score, self.min_total_credit_score, False),
+                              total_credit_score, *sections, reasons)
+
     def get_rejection_results(self):
-        return {"rejection_reasons": self.rejection_reasons}
+        reasons = NO_REJECTION
+        for section in self.sections():
+            reasons |= section.reasons
+        return {"rejection_reasons": list(rejection_messages(reasons)) + self.rejection_reasons,
+                "reason_flags": reasons}
+
+    @staticmethod
+    def format_section(section_title, details) -> str:
+        lines = ["=" * 50, f" {section_title} ".center(50, "=")]
+        lines.extend(f"{label:<30}: {value}" for label, value in details.items())
+        lines.append("-" * 50)
+        return "\n".join(lines)
 
     @staticmethod
     def display_section(section_title, details):
-        print("=" * 50)
-        print(f" {section_title} ".center(50, "="))
-        for label, value in details.items():
-            print(f"{label:<30}: {value}")
-        print("-" * 50)
+        print(BorrowerCreditAnalysis.format_section(section_title, details))
 
-    def borrower_details_summary(self):
+    # The *_report methods return the (title, details) of a summary; currency formats the amounts.
+
+    def borrower_details_report(self) -> tuple:
         details = {
             "Full Name": self.borrower_information_details.full_name,
             "Entity Type": entity_type_dic_name[self.borrower_information_details.entity_type],
@@ -599,51 +536,65 @@ class BorrowerCreditAnalysis:
             "Number of Guarantors": self.borrower_information_details.number_of_guarantors,
             "Age of Guarantors": self.borrower_information_details.age_of_guarantors,
             "Borrowing History": self.borrower_information_details.borrowing_history,
-            "Borrower Score": self.get_borrower_information_details_score(),
+            "Borrower Score": self.borrower_section().score,
         }
-        self.display_section("Borrower Financial Analysis Summary", details)
+        return "Borrower Financial Analysis Summary", details
 
-    def financial_details_summary(self):
+    def financial_details_report(self, currency=format_currency) -> tuple:
         details = {
-            "Current Total Debt": locale.currency(self.borrower_financial_details.current_total_debt, grouping=True),
-            "Gross Income": locale.currency(self.borrower_financial_details.gross_income, grouping=True),
-            "Total Sales per Year": locale.currency(self.borrower_financial_details.total_sales_per_year,
-                                                    grouping=True),
-            "Debt to Income Ratio": f"{self.borrower_financial_details.debt_to_income_ratio:.2f}%",
-            "Financial Score": self.get_financial_details_score(),
+            "Current Total Debt": currency(self.borrower_financial_details.current_total_debt),
+            "Gross Income": currency(self.borrower_financial_details.gross_income),
+            "Total Sales per Year": currency(self.borrower_financial_details.total_sales_per_year),
+            "Debt to Income Ratio": f"{self.financial_section().debt_to_income_ratio:.2f}%",
+            "Financial Score": self.financial_section().score,
         }
-        self.display_section("Financial Details", details)
+        return "Financial Details", details
 
-    def collateral_details_summary(self):
+    def collateral_details_report(self, currency=format_currency) -> tuple:
         details = {
-            "Current Market Value (CVM)": locale.currency(self.borrower_collateral_detail.current_market_value,
-                                                          grouping=True),
+            "Current Market Value (CVM)": currency(self.borrower_collateral_detail.current_market_value),
             "Type of Property": property_type_dic_name[self.borrower_collateral_detail.type_of_property],
             "Location of Property": property_location_dic_name[
                 self.borrower_collateral_detail.location_of_the_property],
-            "Collateral Score": self.get_collateral_details_score(),
+            "Collateral Score": self.collateral_section().score,
         }
-        self.display_section("Collateral Details", details)
+        return "Collateral Details", details
 
-    def facility_details_summary(self):
+    def facility_details_report(self, currency=format_currency) -> tuple:
         details = {
             "Type of Facility Applying": type_of_facility_applying_dic_name[
                 self.borrower_facility_details.type_of_facility_applying],
-            "Applied Loan Amount": locale.currency(self.borrower_facility_details.applied_loan_amount, grouping=True),
-            "Loan to Valuation": f"{self.borrower_facility_details.loan_to_valuation:.2f}%",
-            "Facility Score": self.get_facility_details_score(),
+            "Applied Loan Amount": currency(self.borrower_facility_details.applied_loan_amount),
+            "Loan to Valuation": f"{self.facility_section().loan_to_valuation_ratio:.2f}%",
+            "Facility Score": self.facility_section().score,
         }
-        self.display_section("Facility Details", details)
+        return "Facility Details", details
+
+    def loan_status_report(self) -> list:
+        return [("Status", {"Loan Application Status": self.borrower_analysis_status.name}),
+                ("Total Score", {"Total Credit Analysis Score": self.total_credit_score})]
+
+    def report_sections(self, currency=format_currency) -> list:
+        """Every (title, details) of display_credit_analysis_result, in display order."""
+        return [self.borrower_details_report(), self.financial_details_report(currency),
+                self.collateral_details_report(currency), self.facility_details_report(currency),
+                *self.loan_status_report()]
+
+    def borrower_details_summary(self):
+        self.display_section(*self.borrower_details_report())
+
+    def financial_details_summary(self):
+        self.display_section(*self.financial_details_report())
+
+    def collateral_details_summary(self):
+        self.display_section(*self.collateral_details_report())
+
+    def facility_details_summary(self):
+        self.display_section(*self.facility_details_report())
 
     def loan_status(self):
-        details = {
-            "Loan Application Status": self.borrower_analysis_status.name,
-        }
-        result = {
-            "Total Credit Analysis Score": self.total_credit_score
-        }
-        self.display_section("Status", details)
-        self.display_section("Total Score", result)
+        for section_title, details in self.loan_status_report():
+            self.display_section(section_title, details)
 
     def display_credit_analysis_result(self):
         self.borrower_details_summary()
@@ -708,15 +659,229 @@ class GradeScore(Enum):
     C = 3
 
 
+# -------------------------------------------- Scorecard ---------------------------------------------------------------
+
+BASIS_POINTS = 10000  # basis points in a ratio of 1, i.e. 100 per percent
+
+
+def _basis_points(edge) -> tuple:
+    """A percentage edge as an exact (numerator, denominator) of basis points, read as the decimal it was written as."""
+    if isinstance(edge, int):
+        return edge * 100, 1
+    text = repr(float(edge))
+    if "e" in text or "n" in text:
+        numerator, denominator = float(edge).as_integer_ratio()
+    else:
+        whole, _, fraction = text.partition(".")
+        numerator, denominator = int(whole + fraction), 10 ** len(fraction)
+    numerator *= 100
+    divisor = math.gcd(numerator, denominator)
+    return numerator // divisor, denominator // divisor
+
+
+class BandTable:
+    """
+    Points for a percentage ratio. A ratio below the first edge scores base_points;
+    each (edge, points, strict) band starts at its edge, or just above it when strict.
+    The edges are compiled once so a lookup is a single bisect with no branching.
+
+    band_index_exact decides the band of numerator / denominator in integers instead,
+    comparing numerator * BASIS_POINTS with each edge times the denominator.
+    """
+
+    def __init__(self, base_points: int, bands):
+        self.base_points = base_points
+        self.bands = tuple(bands)
+        self.edges = tuple(math.nextafter(edge, math.inf) if strict else edge for edge, _, strict in self.bands)
+        if list(self.edges) != sorted(self.edges):
+            raise ValueError("Band edges must be in ascending order.")
+        self.points = (base_points,) + tuple(points for _, points, _ in self.bands)
+        # (edge numerator, edge denominator, strict) with the edge in basis points
+        self.basis_point_edges = tuple(_basis_points(edge) + (strict,) for edge, _, strict in self.bands)
+
+    def band_index(self, ratio) -> int:
+        return bisect_right(self.edges, ratio)
+
+    def score(self, ratio) -> int:
+        return self.points[bisect_right(self.edges, ratio)]
+
+    def band_index_exact(self, numerator: int, denominator: int) -> int:
+        """Band of the ratio numerator / denominator; a zero denominator counts as a ratio of 0."""
+        if denominator == 0:
+            numerator, denominator = 0, 1
+        scaled = numerator * BASIS_POINTS
+        band = 0
+        for edge_numerator, edge_denominator, strict in self.basis_point_edges:
+            left = scaled * edge_denominator
+            right = edge_numerator * denominator
+            if left < right or (strict and left == right):
+                break
+            band += 1
+        return band
+
+    def score_exact(self, numerator: int, denominator: int) -> int:
+        return self.points[self.band_index_exact(numerator, denominator)]
+
+
+def _enum_points_table(enum_class, points: dict) -> tuple:
+    """Lookup table indexed by enum value."""
+    table = [0] * (max(member.value for member in enum_class) + 1)
+    for member in enum_class:
+        table[member.value] = points[member]
+    return tuple(table)
+
+
+class Scorecard:
+    """
+    Point tables and ratio bands used by BorrowerCreditAnalysis. Every table is data,
+    so a different scorecard can be swapped in without touching the scoring code.
+
+    guarantor_points is indexed by the number of guarantors; its last entry is used
+    for any larger number. grade_points maps an upper-case borrowing history grade to
+    its points; unknown grades score 0.
+    """
+
+    def __init__(self, entity_type_points: dict, bank_status_points: dict, guarantor_points, grade_points: dict,
+                 property_type_points: dict, property_location_points: dict, facility_type_points: dict,
+                 debt_to_sales_bands: BandTable, debt_to_income_bands: BandTable,
+                 loan_to_valuation_bands: BandTable):
+        self.entity_type_points = dict(entity_type_points)
+        self.bank_status_points = dict(bank_status_points)
+        self.guarantor_points = tuple(guarantor_points)
+        self.grade_points = dict(grade_points)
+        self.property_type_points = dict(property_type_points)
+        self.property_location_points = dict(property_location_points)
+        self.facility_type_points = dict(facility_type_points)
+        self.debt_to_sales_bands = debt_to_sales_bands
+        self.debt_to_income_bands = debt_to_income_bands
+        self.loan_to_valuation_bands = loan_to_valuation_bands
+
+        self.entity_type_table = _enum_points_table(EntityType, self.entity_type_points)
+        self.bank_status_table = _enum_points_table(ClientBankStatus, self.bank_status_points)
+        self.property_type_table = _enum_points_table(TypeProperty, self.property_type_points)
+        self.property_location_table = _enum_points_table(LocationProperty, self.property_location_points)
+        self.facility_type_table = _enum_points_table(TypeFacilityApplying, self.facility_type_points)
+        self.max_guarantor_index = len(self.guarantor_points) - 1
+
+        # grade categories of the section cubes: the scored grades, then any other valid or invalid history
+        self.grade_categories = {grade: index for index, grade in enumerate(self.grade_points)}
+        self.unknown_grade_category = len(self.grade_points)
+        self._section_cubes = {}
+
+    def entity_type_score(self, entity_type: EntityType) -> int:
+        return self.entity_type_table[entity_type.value]
+
+    def bank_status_score(self, bank_status: ClientBankStatus) -> int:
+        return self.bank_status_table[bank_status.value]
+
+    def guarantor_score(self, guarantors: int) -> int:
+        return self.guarantor_points[min(guarantors, self.max_guarantor_index)]
+
+    def grade_history_score(self, grade: str) -> int:
+        return self.grade_points.get(grade, 0)
+
+    def property_type_score(self, type_of_property: TypeProperty) -> int:
+        return self.property_type_table[type_of_property.value]
+
+    def property_location_score(self, location_of_property: LocationProperty) -> int:
+        return self.property_location_table[location_of_property.value]
+
+    def facility_type_score(self, type_of_facility_applying: TypeFacilityApplying) -> int:
+        return self.facility_type_table[type_of_facility_applying.value]
+
+    def debt_to_sales_score(self, debt_to_sales_ratio) -> int:
+        return self.debt_to_sales_bands.score(debt_to_sales_ratio)
+
+    def debt_to_income_score(self, debt_to_income_ratio) -> int:
+        return self.debt_to_income_bands.score(debt_to_income_ratio)
+
+    def loan_to_valuation_score(self, loan_to_valuation_ratio) -> int:
+        return self.loan_to_valuation_bands.score(loan_to_valuation_ratio)
+
+    # ------------------------------------------ Section cubes ---------------------------------------------------------
+    # Every categorical input of the borrower and collateral sections, crossed, gives a few
+    # hundred cells. The SectionResult of each cell is computed once per threshold, so a
+    # section costs one cell index and one lookup.
+
+    def borrower_cell(self, borrower) -> int:
+        grade = borrower.borrowing_history.upper()
+        category = self.grade_categories.get(grade)
+        if category is None:
+            category = self.unknown_grade_category + invalid_borrow_history_grade(grade)
+        # bucket 0 is no guarantors, bucket n + 1 scores guarantor_points[n]
+        guarantors = borrower.number_of_guarantors
+        bucket = min(guarantors, self.max_guarantor_index) + 1 if guarantors >= 1 else 0
+        # _value_ is the plain attribute behind Enum.value, without the descriptor call
+        cell = (borrower.entity_type._value_ * len(self.bank_status_table) + borrower.bank_status._value_) * \
+            (len(self.guarantor_points) + 1) + bucket
+        return ((cell * (self.unknown_grade_category + 2) + category) * 2 +
+                invalid_guarantors_age(borrower.age_of_guarantors))
+
+    def collateral_cell(self, collateral_detail) -> int:
+        return ((collateral_detail.type_of_property._value_ * len(self.property_location_table) +
+                 collateral_detail.location_of_the_property._value_) * 2 +
+                (collateral_detail.current_property_status == CurrentPropertyStatus.UNDER_CONSTRUCTION))
+
+    def borrower_cube(self, min_borrow_info_score) -> tuple:
+        """SectionResult of every borrower_cell for this threshold."""
+        cube = self._section_cubes.get(("borrower", min_borrow_info_score))
+        if cube is None:
+            grades = [(points, invalid_borrow_history_grade(grade)) for grade, points in self.grade_points.items()]
+            grades += [(0, False), (0, True)]
+            cube = []
+            for entity_points in self.entity_type_table:
+                for bank_points in self.bank_status_table:
+                    for bucket, guarantor_points in enumerate((self.guarantor_points[0],) + self.guarantor_points):
+                        for grade_points, grade_invalid in grades:
+                            score = entity_points + bank_points + guarantor_points + grade_points
+                            reasons = NO_REJECTION
+                            if grade_invalid:
+                                reasons |= RejectionReason.BORROWING_HISTORY
+                            if bucket < 1:
+                                reasons |= RejectionReason.NO_GUARANTORS
+                            if score >= min_borrow_info_score:
+                                reasons |= RejectionReason.BORROWER_SCORE
+                            cube.append(SectionResult(score, reasons))
+                            cube.append(SectionResult(score, reasons | RejectionReason.GUARANTOR_AGE))
+            cube = self._section_cubes[("borrower", min_borrow_info_score)] = tuple(cube)
+        return cube
+
+    def collateral_cube(self, min_collateral_score) -> tuple:
+        """SectionResult of every collateral_cell for this threshold."""
+        cube = self._section_cubes.get(("collateral", min_collateral_score))
+        if cube is None:
+            cube = []
+            for type_points in self.property_type_table:
+                for location_points in self.property_location_table:
+                    score = type_points + location_points
+                    reasons = RejectionReason.COLLATERAL_SCORE if score >= min_collateral_score else NO_REJECTION
+                    cube.append(SectionResult(score, reasons))
+                    cube.append(SectionResult(score, reasons | RejectionReason.UNDER_CONSTRUCTION))
+            cube = self._section_cubes[("collateral", min_collateral_score)] = tuple(cube)
+        return cube
+
+
+DEFAULT_SCORECARD = Scorecard(
+    entity_type_points={EntityType.SOLE_PROPRIETORSHIP: 3,
+                        EntityType.LIMITED_PARTNERSHIP: 2,
+                        EntityType.COMPANY_LIMITED: 1},
+    bank_status_points={ClientBankStatus.NEW_BANK: 4,
+                        ClientBankStatus.EXISTING_TO_A_BANK: 2},
+    # 0, 1, 2, 3, 4, more than 4 guarantors
+    guarantor_points=(1, 5, 4, 3, 2, 1),
+    grade_points={grade.name: grade.value for grade in GradeScore},
+    property_type_points={member: member.value for member in TypeProperty},
+    property_location_points={member: member.value for member in LocationProperty},
+    facility_type_points={member: member.value for member in TypeFacilityApplying},
+    # (edge, points, strict): e.g. (70, 0, True) means above 70% scores 0
+    debt_to_sales_bands=BandTable(1, [(40, 3, False), (50, 3, False), (60, 4, False), (70, 0, True)]),
+    debt_to_income_bands=BandTable(1, [(35, 3, False), (55, 0, True)]),
+    loan_to_valuation_bands=BandTable(1, [(60, 2, False), (80, 0, True)]),
+)
+
+
 def get_grade_history_score(grade: str) -> int:
-    match grade:
-        case "A":
-            return GradeScore.A.value
-        case "B":
-            return GradeScore.B.value
-        case "C":
-            return GradeScore.C.value
-    return 0
+    return DEFAULT_SCORECARD.grade_history_score(grade)
 
 
 def invalid_guarantors_age(age: int) -> bool:
@@ -724,34 +889,61 @@ def invalid_guarantors_age(age: int) -> bool:
 
 
 def get_bank_status_score(bank_status: ClientBankStatus) -> int:
-    if bank_status == ClientBankStatus.NEW_BANK:
-        return 4
-    return 2
+    return DEFAULT_SCORECARD.bank_status_score(bank_status)
 
 
 def get_entity_type_score(entity_type: EntityType) -> int:
-    match entity_type:
-        case EntityType.SOLE_PROPRIETORSHIP:
-            return 3
-        case EntityType.LIMITED_PARTNERSHIP:
-            return 2
-        case EntityType.COMPANY_LIMITED:
-            return 1
+    return DEFAULT_SCORECARD.entity_type_score(entity_type)
 
 
 def get_guarantor_score(guarantors: int) -> int:
-    if guarantors > 4 or guarantors == 0:
-        return 1
-
-    match guarantors:
-        case 1:
-            return 5
-        case 2:
-            return 4
-        case 3:
-            return 3
-        case 4:
-            return 2
+    return DEFAULT_SCORECARD.guarantor_score(guarantors)
+
+
+# ---------------------------------------- Section evaluation ----------------------------------------------------------
+
+def evaluate_borrower_section(borrower: Borrower, scorecard: Scorecard, min_borrow_info_score) -> SectionResult:
+    return scorecard.borrower_cube(min_borrow_info_score)[scorecard.borrower_cell(borrower)]
+
+
+def evaluate_financial_section(financial_details: FinancialDetails, scorecard: Scorecard,
+                               min_financial_details_score) -> SectionResult:
+    debt_to_sales_ratio = get_debt_to_sales_ratio(financial_details.current_total_debt,
+                                                  financial_details.total_sales_per_year)
+    debt_to_income_ratio = get_debt_to_income_ratio(financial_details.current_total_debt,
+                                                    financial_details.gross_income)
+    current_debt_sales_ratio_score = scorecard.debt_to_sales_score(debt_to_sales_ratio)
+    current_debt_to_income_score = scorecard.debt_to_income_score(debt_to_income_ratio)
+    reasons = NO_REJECTION
+    if current_debt_sales_ratio_score == 0:
+        reasons |= RejectionReason.DEBT_TO_SALES
+    if current_debt_to_income_score == 0:
+        reasons |= RejectionReason.DEBT_TO_INCOME
+    financial_details_score = current_debt_sales_ratio_score + current_debt_to_income_score
+    if financial_details_score >= min_financial_details_score:
+        reasons |= RejectionReason.FINANCIAL_SCORE
+    return SectionResult(financial_details_score, reasons,
+                         debt_to_sales_ratio=debt_to_sales_ratio, debt_to_income_ratio=debt_to_income_ratio)
+
+
+def evaluate_collateral_section(collateral_detail: CollateralDetails, scorecard: Scorecard,
+                                min_collateral_score) -> SectionResult:
+    return scorecard.collateral_cube(min_collateral_score)[scorecard.collateral_cell(collateral_detail)]
+
+
+def evaluate_facility_section(facility_details: FacilityDetails, collateral_detail: CollateralDetails,
+                              scorecard: Scorecard, min_facility_score) -> SectionResult:
+    loan_to_valuation_ratio = get_loan_to_valuation_ratio(facility_details.applied_loan_amount,
+                                                          collateral_detail.current_market_value)
+    loan_to_valuation_score = scorecard.loan_to_valuation_score(loan_to_valuation_ratio)
+    reasons = NO_REJECTION
+    if loan_to_valuation_score == 0:
+        reasons |= RejectionReason.LOAN_TO_VALUATION
+    total_facility_details_score = (scorecard.facility_type_score(facility_details.type_of_facility_applying) +
+                                    loan_to_valuation_score)
+    if total_facility_details_score >= min_facility_score:
+        reasons |= RejectionReason.FACILITY_SCORE
+    return SectionResult(total_facility_details_score, reasons, loan_to_valuation_ratio=loan_to_valuation_ratio)
 
 
 # --------------------------------------- Input with exit option -------------------------------------------------------
@@ -774,19 +966,21 @@ def input_with_exit_option(prompt, validation_func=None, error_message="Invalid
 
 # -------------------------------------- Validate functions ------------------------------------------------------------
 
+FULL_NAME_PATTERN = re.compile(r"^[^\W\d_]+(?: [^\W\d_]+)*$", re.UNICODE)
+BORROWER_HISTORY_PATTERN = re.compile(r'^[a-zA-Z]+$')
+ACCEPTED_GRADE_PATTERN = re.compile(r'^[a-cA-C]+$')
+
+
 def validate_full_name(name: str) -> bool:
-    pattern = r"^[^\W\d_]+(?: [^\W\d_]+)*$"
-    return bool(re.match(pattern, name, re.UNICODE))
+    return bool(FULL_NAME_PATTERN.match(name))
 
 
 def validate_borrower_history(history: str):
-    pattern = r'^[a-zA-Z]+$'
-    return bool(re.match(pattern, history))
+    return bool(BORROWER_HISTORY_PATTERN.match(history))
 
 
 def invalid_borrow_history_grade(history: str) -> bool:
-    pattern_status = r'^[a-cA-C]+$'
-    return not re.match(pattern_status, history)
+    return not ACCEPTED_GRADE_PATTERN.match(history)
 
 
 def validate_client_bank_status_option(option: str) -> bool:
@@ -892,36 +1086,15 @@ def input_type_of_facility_applying():
 
 
 def get_debt_sales_ratio_score(debt_sales_ratio) -> int:
-    if debt_sales_ratio > 70:
-        return 0
-    elif 60 <= debt_sales_ratio <= 70:
-        return 4
-    elif 50 <= debt_sales_ratio <= 59:
-        return 3
-    elif 40 <= debt_sales_ratio <= 49:
-        return 3
-    else:
-        return 1
+    return DEFAULT_SCORECARD.debt_to_sales_score(debt_sales_ratio)
 
 
 def get_to_income_ratio_score(debt_to_income_ratio) -> int:
-    if debt_to_income_ratio > 55:
-        return 0
-    elif 35 <= debt_to_income_ratio <= 55:
-        return 3
-    elif debt_to_income_ratio < 35:
-        return 1
+    return DEFAULT_SCORECARD.debt_to_income_score(debt_to_income_ratio)
 
 
 def get_loan_to_valuation_ratio_score(loan_to_valuation_ratio) -> int:
-    if loan_to_valuation_ratio > 80:
-        return 0
-    elif 60 <= loan_to_valuation_ratio <= 79:
-        return 2
-    elif loan_to_valuation_ratio < 60:
-        return 1
-    else:
-        return 1
+    return DEFAULT_SCORECARD.loan_to_valuation_score(loan_to_valuation_ratio)
 
 
 def get_debt_to_sales_ratio(current_total_debt, total_sales_per_year) -> float:
@@ -942,6 +1115,43 @@ def get_debt_to_income_ratio(current_total_debt, gross_income) -> float:
     return float(current_total_debt / gross_income) * 100
 
 
+class RatioBand(NamedTuple):
+    """A ratio kept as the exact fraction numerator / denominator, with its band and points."""
+    numerator: int
+    denominator: int
+    band: int
+    points: int
+
+    @property
+    def basis_points(self) -> int:
+        """The ratio in basis points, rounded down; 0 when the denominator is 0."""
+        return self.numerator * BASIS_POINTS // self.denominator if self.denominator else 0
+
+    @property
+    def remainder(self) -> int:
+        """What basis_points dropped, as a numerator over the denominator; 0 when the ratio is a whole basis point."""
+        return self.numerator * BASIS_POINTS % self.denominator if self.denominator else 0
+
+
+def get_ratio_band(bands: BandTable, numerator: int, denominator: int) -> RatioBand:
+    band = bands.band_index_exact(numerator, denominator)
+    return RatioBand(numerator, denominator, band, bands.points[band])
+
+
+def get_debt_to_sales_band(current_total_debt, total_sales_per_year, scorecard: Scorecard = None) -> RatioBand:
+    return get_ratio_band((scorecard or DEFAULT_SCORECARD).debt_to_sales_bands, current_total_debt,
+                          total_sales_per_year)
+
+
+def get_debt_to_income_band(current_total_debt, gross_income, scorecard: Scorecard = None) -> RatioBand:
+    return get_ratio_band((scorecard or DEFAULT_SCORECARD).debt_to_income_bands, current_total_debt, gross_income)
+
+
+def get_loan_to_valuation_band(applied_loan_amount, current_market_value, scorecard: Scorecard = None) -> RatioBand:
+    return get_ratio_band((scorecard or DEFAULT_SCORECARD).loan_to_valuation_bands, applied_loan_amount,
+                          current_market_value)
+
+
 # ----------------------------------------------------------------------------------------------------------------------
 
 def analyze_borrow_information():
@@ -1031,7 +1241,7 @@ def display_rejection_reasons(borrower_credit_analysis, include_financial=False,
 
     if borrower_credit_analysis.get_rejection_results()['rejection_reasons']:
         print("Rejection Reasons:")
-        for reason in set(borrower_credit_analysis.get_rejection_results()['rejection_reasons']):
+        for reason in borrower_credit_analysis.get_rejection_results()['rejection_reasons']:
             print(f"- {reason}")
 
 
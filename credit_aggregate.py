@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_aggregate.py
+Description: Portfolio report built in one streaming pass over the scored applications.
+
+PortfolioAggregate keeps only counters, sums and fixed-bin histograms, so its size
+does not depend on the number of applications: approval counts, a score histogram
+per section and for the total, the mean debt-to-sales, debt-to-income and
+loan-to-valuation ratios, the rejection reason counts and the approvals by entity
+type, property location and facility type. Quantiles of total_credit_score are
+read from its histogram. With the default one-point bins they are exact for
+scores inside the histogram range, and approximate (bin edges) outside it.
+Aggregates of different parts of a portfolio merge into the aggregate of the
+whole, so workers can each aggregate their own rows.
+
+Usage:
+    aggregate = PortfolioAggregate()
+    aggregate.add(record, decision)           # credit_batch input record and decision
+    aggregate.add_columns(columns, scores)    # or a score_columns chunk at a time
+    aggregate.merge(other_aggregate)
+    aggregate.to_dict()                       # JSON report
+    aggregate.quantile(0.9)                   # of total_credit_score
+
+    python credit_batch.py applications.csv decisions.csv --report report.json
+    python credit_aggregate.py portfolio.cols --workers 4   # a scored credit_columnar dataset
+"""
+
+import numpy as np
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    BorrowStatus, EntityType, LocationProperty, TypeFacilityApplying, RejectionReason, SECTION_NAMES,
+    entity_type_dic, property_location_dic, type_of_facility_applying_dic,
+    get_debt_to_sales_ratio, get_debt_to_income_ratio, get_loan_to_valuation_ratio,
+)
+from credit_vectorized import (
+    count_rejection_reasons, get_debt_to_sales_ratios, get_debt_to_income_ratios, get_loan_to_valuation_ratios,
+)
+
+SCORE_BINS = 64  # one bin per score from 0 to 63, scores outside go to the underflow or overflow bin
+REPORTED_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+SCORE_NAMES = tuple(f"{name}_score" for name in SECTION_NAMES) + ("total_credit_score",)
+RATIO_NAMES = ("debt_to_sales_ratio", "debt_to_income_ratio", "loan_to_valuation_ratio")
+# input field -> (enum class, options of the input field)
+BREAKDOWNS = {
+    "entity_type": (EntityType, entity_type_dic),
+    "location_of_the_property": (LocationProperty, property_location_dic),
+    "type_of_facility_applying": (TypeFacilityApplying, type_of_facility_applying_dic),
+}
+_REASON_BY_BIT = {int(reason): reason for reason in RejectionReason}
+
+
+class Histogram:
+    """
+    Counts of values in equal-width bins, the first starting at low, plus an
+    underflow and an overflow bin. Histograms with the same bins merge by adding counts.
+    """
+
+    def __init__(self, bins: int = SCORE_BINS, low: int = 0, width: int = 1):
+        self.bins = bins
+        self.low = low
+        self.width = width
+        self.counts = [0] * (bins + 2)
+
+    def _index(self, value) -> int:
+        return min(max(int((value - self.low) // self.width) + 1, 0), self.bins + 1)
+
+    def add(self, value):
+        self.counts[self._index(value)] += 1
+
+    def add_array(self, values):
+        values = np.asarray(values)
+        if not len(values):
+            return
+        indices = np.clip((values - self.low) // self.width + 1, 0, self.bins + 1).astype(np.int64)
+        for index, count in enumerate(np.bincount(indices, minlength=self.bins + 2).tolist()):
+            self.counts[index] += count
+
+    def merge(self, other: "Histogram"):
+        if (self.bins, self.low, self.width) != (other.bins, other.low, other.width):
+            raise ValueError("Only histograms with the same bins can be merged.")
+        self.counts = [count + other_count for count, other_count in zip(self.counts, other.counts)]
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def lower_edge(self, index: int):
+        """Lower edge of bin index; the underflow bin reports low and the overflow bin its lower edge."""
+        return self.low + max(index - 1, 0) * self.width
+
+    def quantile(self, fraction: float):
+        """Nearest-rank quantile, as the lower edge of the bin holding it; None when empty."""
+        total = self.total
+        if not total:
+            return None
+        rank = max(1, min(total, int(np.ceil(fraction * total))))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.lower_edge(index)
+
+    def to_dict(self) -> dict:
+        """{lower edge: count} of the non-empty bins; the underflow bin is reported as "<low"."""
+        histogram = {}
+        for index, count in enumerate(self.counts):
+            if count:
+                histogram[f"<{self.low}" if index == 0 else str(self.lower_edge(index))] = count
+        return histogram
+
+
+class _Mean:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+
+    def merge(self, other: "_Mean"):
+        self.count += other.count
+        self.total += other.total
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+class PortfolioAggregate:
+    """Constant-memory summary of scored applications; see the module docstring."""
+
+    def __init__(self, score_bins: int = SCORE_BINS):
+        self.rows = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.invalid = 0
+        self.score_histograms = {name: Histogram(score_bins) for name in SCORE_NAMES}
+        self.ratio_means = {name: _Mean() for name in RATIO_NAMES}
+        self.reasons = dict.fromkeys(RejectionReason, 0)
+        # breakdown -> enum member -> [applications, accepted]
+        self.breakdowns = {breakdown: {member: [0, 0] for member in enum}
+                           for breakdown, (enum, _) in BREAKDOWNS.items()}
+        # the same counters keyed by the option keys of the input records, for add()
+        self._option_counts = {breakdown: {key: self.breakdowns[breakdown][member] for key, member in options.items()}
+                               for breakdown, (_, options) in BREAKDOWNS.items()}
+
+    # ------------------------------------------ One application at a time ---------------------------------------------
+
+    def add(self, record, decision: dict):
+        """
+        One credit_batch input record and its score_record decision. The breakdowns
+        count every scored application, whatever stage a staged decision stopped at,
+        so their approval rates do not depend on --staged. With staged decisions the
+        ratios are only read for the sections that were scored, and a breakdown field
+        of a later stage that is not a valid option is not counted.
+        """
+        self.rows += 1
+        status = decision["status"]
+        if status == BorrowStatus.ACCEPTED.name:
+            self.accepted += 1
+        elif status == BorrowStatus.REJECTED.name:
+            self.rejected += 1
+        else:
+            self.invalid += 1
+            return
+        accepted = status == BorrowStatus.ACCEPTED.name
+        for name in SCORE_NAMES:
+            if decision[name] is not None:
+                self.score_histograms[name].add(decision[name])
+        flags = decision["reason_flags"]
+        while flags:
+            # IntFlag operations are slow, so the bits are walked as plain integers
+            bit = flags & -flags
+            self.reasons[_REASON_BY_BIT[bit]] += 1
+            flags ^= bit
+
+        for field, option_counts in self._option_counts.items():
+            counts = option_counts.get(str(record.get(field)).strip())
+            if counts is not None:
+                counts[0] += 1
+                counts[1] += accepted
+
+        if decision["financial_score"] is not None:
+            current_total_debt = int(record["current_total_debt"])
+            self._add_ratio("debt_to_sales_ratio",
+                            get_debt_to_sales_ratio(current_total_debt, int(record["total_sales_per_year"])))
+            self._add_ratio("debt_to_income_ratio",
+                            get_debt_to_income_ratio(current_total_debt, int(record["gross_income"])))
+        if decision["facility_score"] is not None:
+            self._add_ratio("loan_to_valuation_ratio", get_loan_to_valuation_ratio(
+                int(record["applied_loan_amount"]), int(record["current_market_value"])))
+
+    def _add_ratio(self, name: str, ratio: float):
+        mean = self.ratio_means[name]
+        mean.count += 1
+        mean.total += ratio
+
+    # ------------------------------------------ Columns ---------------------------------------------------------------
+
+    def add_columns(self, columns: dict, scores):
+        """
+        A chunk of score_columns input columns and its results: a ColumnarScores, or a
+        dict with the credit_shared.OUTPUT_DTYPES columns such as a scored credit_columnar dataset.
+        """
+        def result(name):
+            return np.asarray(scores[name] if isinstance(scores, dict) else getattr(scores, name))
+
+        accepted = result("status") == BorrowStatus.ACCEPTED.value
+        rows = len(accepted)
+        accepted_rows = int(np.count_nonzero(accepted))
+        self.rows += rows
+        self.accepted += accepted_rows
+        self.rejected += rows - accepted_rows
+        for name in SCORE_NAMES:
+            self.score_histograms[name].add_array(result(name))
+        for reason, count in count_rejection_reasons(result("reason_flags")).items():
+            self.reasons[reason] += count
+
+        for field, (enum, _) in BREAKDOWNS.items():
+            values = np.asarray(columns[field], dtype=np.int64)
+            length = max(member.value for member in enum) + 1
+            applications = np.bincount(values, minlength=length)
+            approvals = np.bincount(values, weights=accepted, minlength=length)
+            for member in enum:
+                counts = self.breakdowns[field][member]
+                counts[0] += int(applications[member.value])
+                counts[1] += int(approvals[member.value])
+
+        current_total_debt = columns["current_total_debt"]
+        for name, ratios in (
+                ("debt_to_sales_ratio", get_debt_to_sales_ratios(current_total_debt, columns["total_sales_per_year"])),
+                ("debt_to_income_ratio", get_debt_to_income_ratios(current_total_debt, columns["gross_income"])),
+                ("loan_to_valuation_ratio", get_loan_to_valuation_ratios(columns["applied_loan_amount"],
+                                                                         columns["current_market_value"]))):
+            self.ratio_means[name].count += rows
+            self.ratio_means[name].total += float(np.sum(ratios))
+
+    # ------------------------------------------ Combining and reporting -----------------------------------------------
+
+    def merge(self, other: "PortfolioAggregate") -> "PortfolioAggregate":
+        """Add the applications aggregated by other to this aggregate and return it."""
+        self.rows += other.rows
+        self.accepted += other.accepted
+        self.rejected += other.rejected
+        self.invalid += other.invalid
+        for name, histogram in self.score_histograms.items():
+            histogram.merge(other.score_histograms[name])
+        for name, mean in self.ratio_means.items():
+            mean.merge(other.ratio_means[name])
+        for reason, count in other.reasons.items():
+            self.reasons[reason] += count
+        for breakdown, members in self.breakdowns.items():
+            for member, (applications, approvals) in other.breakdowns[breakdown].items():
+                members[member][0] += applications
+                members[member][1] += approvals
+        return self
+
+    @property
+    def scored(self) -> int:
+        return self.accepted + self.rejected
+
+    @property
+    def approval_rate(self) -> float:
+        return self.accepted / self.scored if self.scored else 0.0
+
+    def quantile(self, fraction: float, name: str = "total_credit_score"):
+        return self.score_histograms[name].quantile(fraction)
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.rows, "accepted": self.accepted, "rejected": self.rejected, "invalid": self.invalid,
+            "approval_rate": self.approval_rate,
+            "total_credit_score_quantiles": {str(fraction): self.quantile(fraction)
+                                             for fraction in REPORTED_QUANTILES},
+            "score_histograms": {name: histogram.to_dict() for name, histogram in self.score_histograms.items()},
+            "mean_ratios": {name: mean.mean for name, mean in self.ratio_means.items()},
+            "rejection_reasons": {reason.name: count for reason, count in self.reasons.items()},
+            "breakdowns": {breakdown: {member.name: {"applications": applications, "accepted": approvals,
+                                                     "approval_rate": approvals / applications if applications
+                                                     else 0.0}
+                                       for member, (applications, approvals) in members.items()}
+                           for breakdown, members in self.breakdowns.items()},
+        }
+
+    def summary(self) -> str:
+        lines = [f"{self.rows} applications: {self.accepted} accepted, {self.rejected} rejected, "
+                 f"{self.invalid} invalid ({self.approval_rate:.1%} approved)",
+                 "total_credit_score quantiles: " + ", ".join(
+                     f"p{fraction * 100:g} {self.quantile(fraction)}" for fraction in REPORTED_QUANTILES)]
+        for name, mean in self.ratio_means.items():
+            lines.append(f"  mean {name:<26}" + ("-" if mean.mean is None else f"{mean.mean:10.2f}"))
+        for breakdown, members in self.breakdowns.items():
+            lines.append(f"  {breakdown}")
+            for member, (applications, approvals) in members.items():
+                rate = approvals / applications if applications else 0.0
+                lines.append(f"    {member.name:<26}{applications:>10}{rate:>10.1%}")
+        return "\n".join(lines)
+
+
+# ------------------------------------------ Pipelines -----------------------------------------------------------------
+
+def aggregating_scorer(scorer, aggregate: PortfolioAggregate):
+    """
+    Wrap a credit_batch scorer so every decision is also added to aggregate along
+    with its input record. Works with any scorer that keeps the input order.
+    """
+    from collections import deque
+
+    def scorer_with_aggregate(records):
+        pending = deque()
+
+        def remember(records):
+            for record in records:
+                pending.append(record)
+                yield record
+
+        for decision in scorer(remember(records)):
+            aggregate.add(pending.popleft(), decision)
+            yield decision
+
+    return scorer_with_aggregate
+
+
+def aggregate_dataset_range(path: str, start: int, stop: int, chunk_size: int) -> PortfolioAggregate:
+    """Aggregate rows [start, stop) of a scored credit_columnar dataset, chunk by chunk."""
+    from credit_columnar import ColumnarDataset
+
+    dataset = ColumnarDataset(path)
+    aggregate = PortfolioAggregate()
+    for chunk_start in range(start, stop, chunk_size):
+        chunk_stop = min(chunk_start + chunk_size, stop)
+        aggregate.add_columns(dataset.columns(chunk_start, chunk_stop),
+                              {name: values[chunk_start:chunk_stop] for name, values in dataset.decisions.items()})
+    return aggregate
+
+
+def aggregate_dataset(path: str, workers: int = 1, chunk_size: int = 1000000) -> PortfolioAggregate:
+    """
+    Aggregate a scored credit_columnar dataset. With several workers each one maps the
+    dataset, aggregates its share of the rows and the partial aggregates are merged.
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from credit_columnar import ColumnarDataset
+
+    workers = workers or os.cpu_count() or 1
+    dataset = ColumnarDataset(path)
+    if not dataset.scored:
+        raise ValueError(f"'{path}' has not been scored; run credit_columnar.score_dataset first.")
+    rows = len(dataset)
+    if workers == 1:
+        return aggregate_dataset_range(path, 0, rows, chunk_size)
+    share = -(-rows // workers) if rows else 1
+    starts = list(range(0, rows, share))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        partials = executor.map(aggregate_dataset_range, [path] * len(starts), starts,
+                                [min(start + share, rows) for start in starts], [chunk_size] * len(starts))
+        aggregate = PortfolioAggregate()
+        for partial in partials:
+            aggregate.merge(partial)
+    return aggregate
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Portfolio report of a scored credit_columnar dataset.")
+    parser.add_argument("dataset", help="dataset directory scored with credit_columnar.py score")
+    parser.add_argument("--workers", type=int, default=1, help="processes aggregating parts of the rows")
+    parser.add_argument("--chunk-size", type=int, default=1000000, help="rows aggregated at once")
+    parser.add_argument("--output", help="also write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    aggregate = aggregate_dataset(args.dataset, args.workers, args.chunk_size)
+    print(aggregate.summary())
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as stream:
+            json.dump(aggregate.to_dict(), stream, indent=2)
+    return aggregate
+
+
+if __name__ == "__main__":
+    main()
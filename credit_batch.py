@@ -0,0 +1,471 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_batch.py
+Description: Headless bulk scoring of loan applications stored as CSV or JSONL.
+
+Records are read one at a time, scored through BorrowerCreditAnalysis and the
+decision is written out straight away, so memory use does not grow with the
+size of the input file.
+
+Usage:
+    python credit_batch.py applications.csv decisions.csv
+    python credit_batch.py applications.jsonl decisions.jsonl --progress-every 100000
+    python credit_batch.py applications.csv decisions.csv --workers 0 --chunk-size 2000
+    python credit_batch.py applications.csv decisions.csv --staged
+    python credit_batch.py applications.csv decisions.csv --metrics metrics.prom
+    python credit_batch.py applications.csv decisions.csv --cache decisions.sqlite
+    python credit_batch.py applications.csv decisions.csv --store history.sqlite
+    python credit_batch.py applications.csv decisions.csv --report report.json
+
+Input fields (enum fields take the same option numbers as the interactive menus):
+    full_name, entity_type, bank_status, number_of_guarantors, age_of_guarantors,
+    borrowing_history, current_total_debt, gross_income, total_sales_per_year,
+    current_market_value, type_of_property, current_property_status,
+    location_of_the_property, type_of_facility_applying, applied_loan_amount
+"""
+
+import csv
+import json
+import sys
+import time
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    Borrower, FinancialDetails, CollateralDetails, FacilityDetails, BorrowerCreditAnalysis, BorrowStatus,
+    CreditDecision, SECTION_NAMES,
+    entity_type_dic, client_bank_status_dic, property_type_dic, property_location_dic,
+    current_property_status_dic, type_of_facility_applying_dic,
+    validate_full_name, validate_borrower_history, validate_number_input,
+    get_debt_to_sales_ratio, get_debt_to_income_ratio, get_loan_to_valuation_ratio,
+    INVALID_NAME_MESSAGE, INVALID_BORROWER_HISTORY_MESSAGE, INVALID_NUMBER_GUARANTOR_MESSAGE,
+    INVALID_TOTAL_DEBT_MESSAGE, INVALID_TOTAL_INCOME_MESSAGE, INVALID_TOTAL_SALES_PER_YEAR_MESSAGE,
+    INVALID_CURRENT_MARKET_VALUE, INVALID_APPLIED_LOAN_AMOUNT_MESSAGE,
+)
+
+INPUT_FIELDS = (
+    "full_name", "entity_type", "bank_status", "number_of_guarantors", "age_of_guarantors", "borrowing_history",
+    "current_total_debt", "gross_income", "total_sales_per_year",
+    "current_market_value", "type_of_property", "current_property_status", "location_of_the_property",
+    "type_of_facility_applying", "applied_loan_amount",
+)
+
+DECISION_FIELDS = ("row", "full_name", "status", "total_credit_score", "borrower_score", "financial_score",
+                   "collateral_score", "facility_score", "rejected_stage", "reason_flags", "rejection_reasons",
+                   "error")
+
+INVALID_STATUS = "INVALID"
+# amounts and counts must fit the int64 columns of credit_vectorized and credit_columnar;
+# larger ones would also overflow the float ratios
+MAX_NUMBER = 2 ** 63 - 1
+CSV_REASON_SEPARATOR = " | "
+
+FORMAT_BY_SUFFIX = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+class InvalidRecordError(ValueError):
+    """Raised when an input record cannot be turned into a credit analysis."""
+    pass
+
+
+# ------------------------------------------ Reading -------------------------------------------------------------------
+
+def detect_format(path: str) -> str:
+    for suffix, file_format in FORMAT_BY_SUFFIX.items():
+        if path.lower().endswith(suffix):
+            return file_format
+    raise ValueError(f"Cannot tell the format of '{path}'. Use a .csv or .jsonl file or pass the format explicitly.")
+
+
+def iter_csv_records(stream):
+    yield from csv.DictReader(stream)
+
+
+class UnreadableRecord(dict):
+    """
+    Stands in for an input line that is not a JSON object. It has no fields, so
+    scoring it raises InvalidRecordError with the parse error and the row comes
+    out INVALID instead of ending the run.
+    """
+
+    def __init__(self, error: str):
+        super().__init__()
+        self.error = error
+
+
+def iter_jsonl_records(stream):
+    for line_number, line in enumerate(stream, start=1):
+        if line.strip():
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                yield UnreadableRecord(f"Line {line_number} is not valid JSON: {error}")
+                continue
+            yield record if isinstance(record, dict) else UnreadableRecord(
+                f"Line {line_number} is not a JSON object.")
+
+
+def read_records(stream, input_format: str):
+    if input_format == "csv":
+        return iter_csv_records(stream)
+    if input_format == "jsonl":
+        return iter_jsonl_records(stream)
+    raise ValueError(f"Unsupported input format '{input_format}'.")
+
+
+# ------------------------------------------ Record decoding -----------------------------------------------------------
+
+def _field_text(record, field: str) -> str:
+    value = record.get(field)
+    if value is None:
+        raise InvalidRecordError(getattr(record, "error", None) or f"Missing field '{field}'.")
+    return str(value).strip()
+
+
+def _number_field(record, field: str, error_message: str) -> int:
+    value = _field_text(record, field)
+    try:
+        # isdigit() also passes digits int() rejects, such as superscripts
+        if validate_number_input(value):
+            number = int(value)
+            if number <= MAX_NUMBER:
+                return number
+    except ValueError:
+        pass
+    raise InvalidRecordError(f"{field}: {error_message}")
+
+
+def _choice_field(record, field: str, options: dict):
+    value = _field_text(record, field)
+    if value not in options:
+        raise InvalidRecordError(f"{field}: Enter one of {', '.join(options)}.")
+    return options[value]
+
+
+def build_borrower(record) -> Borrower:
+    full_name = _field_text(record, "full_name")
+    if not validate_full_name(full_name):
+        raise InvalidRecordError(f"full_name: {INVALID_NAME_MESSAGE}")
+    borrowing_history = _field_text(record, "borrowing_history")
+    if not validate_borrower_history(borrowing_history):
+        raise InvalidRecordError(f"borrowing_history: {INVALID_BORROWER_HISTORY_MESSAGE}")
+    return Borrower(
+        full_name,
+        _choice_field(record, "entity_type", entity_type_dic),
+        _choice_field(record, "bank_status", client_bank_status_dic),
+        _number_field(record, "number_of_guarantors", INVALID_NUMBER_GUARANTOR_MESSAGE),
+        _number_field(record, "age_of_guarantors", INVALID_NUMBER_GUARANTOR_MESSAGE),
+        borrowing_history
+    )
+
+
+def build_financial_details(record) -> FinancialDetails:
+    current_total_debt = _number_field(record, "current_total_debt", INVALID_TOTAL_DEBT_MESSAGE)
+    gross_income = _number_field(record, "gross_income", INVALID_TOTAL_INCOME_MESSAGE)
+    total_sales_per_year = _number_field(record, "total_sales_per_year", INVALID_TOTAL_SALES_PER_YEAR_MESSAGE)
+    return FinancialDetails(
+        current_total_debt, gross_income, total_sales_per_year,
+        get_debt_to_sales_ratio(current_total_debt, total_sales_per_year),
+        get_debt_to_income_ratio(current_total_debt, gross_income)
+    )
+
+
+def build_collateral_details(record) -> CollateralDetails:
+    return CollateralDetails(
+        _number_field(record, "current_market_value", INVALID_CURRENT_MARKET_VALUE),
+        _choice_field(record, "type_of_property", property_type_dic),
+        _choice_field(record, "current_property_status", current_property_status_dic),
+        _choice_field(record, "location_of_the_property", property_location_dic)
+    )
+
+
+def build_facility_details(record, collateral_detail: CollateralDetails) -> FacilityDetails:
+    applied_loan_amount = _number_field(record, "applied_loan_amount", INVALID_APPLIED_LOAN_AMOUNT_MESSAGE)
+    return FacilityDetails(
+        _choice_field(record, "type_of_facility_applying", type_of_facility_applying_dic),
+        applied_loan_amount,
+        get_loan_to_valuation_ratio(applied_loan_amount, collateral_detail.current_market_value)
+    )
+
+
+def build_credit_analysis(record) -> BorrowerCreditAnalysis:
+    """
+    Build the same objects the interactive flow collects through the prompts.
+    Raises InvalidRecordError when a field fails the interactive validation.
+    """
+    collateral_detail = build_collateral_details(record)
+    return BorrowerCreditAnalysis(
+        build_borrower(record),
+        build_financial_details(record),
+        collateral_detail,
+        build_facility_details(record, collateral_detail)
+    )
+
+
+# ------------------------------------------ Scoring -------------------------------------------------------------------
+
+def evaluate_record(record, cache=None) -> CreditDecision:
+    """cache is an optional credit_cache.DecisionCache consulted before the sections are scored."""
+    analysis = build_credit_analysis(record)
+    if cache is not None:
+        return cache.evaluate(analysis)
+    return analysis.evaluate()
+
+
+def evaluate_record_staged(record) -> CreditDecision:
+    """
+    Score the sections in interactive order and stop at the first rejection. The
+    fields of a stage are only decoded and validated once the previous stages passed.
+    """
+    borrower_credit_analysis = BorrowerCreditAnalysis(build_borrower(record))
+    if borrower_credit_analysis.borrower_section().rejected:
+        return borrower_credit_analysis.evaluate_staged()
+
+    borrower_credit_analysis.borrower_financial_details = build_financial_details(record)
+    if borrower_credit_analysis.financial_section().rejected:
+        return borrower_credit_analysis.evaluate_staged()
+
+    borrower_credit_analysis.borrower_collateral_detail = build_collateral_details(record)
+    if borrower_credit_analysis.collateral_section().rejected:
+        return borrower_credit_analysis.evaluate_staged()
+
+    borrower_credit_analysis.borrower_facility_details = build_facility_details(
+        record, borrower_credit_analysis.borrower_collateral_detail)
+    return borrower_credit_analysis.evaluate_staged()
+
+
+def score_record(record, row: int = 0, staged: bool = False, cache=None) -> dict:
+    try:
+        credit_decision = evaluate_record_staged(record) if staged else evaluate_record(record, cache)
+    except InvalidRecordError as error:
+        return invalid_decision_record(record, row, error)
+
+    return decision_record(credit_decision, row, record["full_name"])
+
+
+def invalid_decision_record(record, row: int, error: InvalidRecordError) -> dict:
+    decision = dict.fromkeys(DECISION_FIELDS)
+    decision.update(row=row, full_name=record.get("full_name", ""), status=INVALID_STATUS, rejected_stage="",
+                    rejection_reasons=[], error=str(error))
+    return decision
+
+
+def decision_record(credit_decision: CreditDecision, row: int, full_name) -> dict:
+    """The output record of a decision, with the DECISION_FIELDS."""
+    decision = {"row": row,
+                "full_name": str(full_name).strip(),
+                "status": credit_decision.status.name,
+                "total_credit_score": credit_decision.total_credit_score}
+    for name, section in zip(SECTION_NAMES, credit_decision.sections):
+        decision[f"{name}_score"] = None if section is None else section.score
+    decision["rejected_stage"] = credit_decision.rejected_stage or ""
+    decision["reason_flags"] = int(credit_decision.reasons)
+    decision["rejection_reasons"] = credit_decision.rejection_reasons
+    decision["error"] = ""
+    return decision
+
+
+def score_records(records, staged: bool = False, cache=None):
+    for row, record in enumerate(records, start=1):
+        yield score_record(record, row, staged, cache)
+
+
+# ------------------------------------------ Writing -------------------------------------------------------------------
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return CSV_REASON_SEPARATOR.join(value)
+    return value
+
+
+class DecisionWriter:
+    def __init__(self, stream, output_format: str):
+        if output_format not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported output format '{output_format}'.")
+        self.stream = stream
+        self.output_format = output_format
+        self.csv_writer = None
+        if output_format == "csv":
+            self.csv_writer = csv.writer(stream)
+            self.csv_writer.writerow(DECISION_FIELDS)
+
+    def write(self, decision: dict):
+        if self.csv_writer is not None:
+            self.csv_writer.writerow([_csv_value(decision[field]) for field in DECISION_FIELDS])
+        else:
+            self.stream.write(json.dumps(decision, ensure_ascii=False))
+            self.stream.write("\n")
+
+
+class BatchStats:
+    def __init__(self):
+        self.rows = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.invalid = 0
+        self.elapsed_seconds = 0.0
+        # how many applications reached each stage and passed or were rejected there
+        self.stage_passed = dict.fromkeys(SECTION_NAMES, 0)
+        self.stage_rejected = dict.fromkeys(SECTION_NAMES, 0)
+
+    def count(self, decision: dict):
+        self.rows += 1
+        if decision["status"] == BorrowStatus.ACCEPTED.name:
+            self.accepted += 1
+        elif decision["status"] == BorrowStatus.REJECTED.name:
+            self.rejected += 1
+        else:
+            self.invalid += 1
+            return
+        for name in SECTION_NAMES:
+            if decision[f"{name}_score"] is None:
+                break
+            if decision["rejected_stage"] == name:
+                self.stage_rejected[name] += 1
+                break
+            self.stage_passed[name] += 1
+
+    @property
+    def rows_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.rows / self.elapsed_seconds
+
+    def summary(self) -> str:
+        lines = [f"Scored {self.rows} rows ({self.accepted} accepted, {self.rejected} rejected, "
+                 f"{self.invalid} invalid) in {self.elapsed_seconds:.2f}s - {self.rows_per_second:,.0f} rows/s"]
+        for name in SECTION_NAMES:
+            lines.append(f"  {name:<10} passed {self.stage_passed[name]:>10}  rejected {self.stage_rejected[name]:>10}")
+        return "\n".join(lines)
+
+
+def score_stream(input_stream, output_stream, input_format: str, output_format: str, progress_every: int = 0,
+                 progress_stream=None, scorer=score_records) -> BatchStats:
+    """
+    Score every record of input_stream and write the decisions to output_stream.
+    scorer turns an iterable of records into an iterable of decisions in the same order.
+    """
+    stats = BatchStats()
+    writer = DecisionWriter(output_stream, output_format)
+    started = time.perf_counter()
+    for decision in scorer(read_records(input_stream, input_format)):
+        writer.write(decision)
+        stats.count(decision)
+        if progress_every and stats.rows % progress_every == 0 and progress_stream is not None:
+            stats.elapsed_seconds = time.perf_counter() - started
+            print(f"{stats.rows} rows - {stats.rows_per_second:,.0f} rows/s", file=progress_stream)
+    stats.elapsed_seconds = time.perf_counter() - started
+    return stats
+
+
+def _open_input(path: str):
+    if path == "-":
+        return sys.stdin
+    return open(path, newline="", encoding="utf-8")
+
+
+def _open_output(path: str):
+    if path == "-":
+        return sys.stdout
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+def run_batch(input_path: str, output_path: str, input_format: str = None, output_format: str = None,
+              progress_every: int = 0, progress_stream=None, scorer=score_records) -> BatchStats:
+    input_format = input_format or ("csv" if input_path == "-" else detect_format(input_path))
+    output_format = output_format or ("csv" if output_path == "-" else detect_format(output_path))
+    input_stream = _open_input(input_path)
+    output_stream = _open_output(output_path)
+    try:
+        return score_stream(input_stream, output_stream, input_format, output_format, progress_every,
+                            progress_stream, scorer)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Score loan applications from a CSV or JSONL file.")
+    parser.add_argument("input", help="applications file, or '-' for stdin")
+    parser.add_argument("output", help="decisions file, or '-' for stdout")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="defaults to the input file extension")
+    parser.add_argument("--output-format", choices=("csv", "jsonl"), help="defaults to the output file extension")
+    parser.add_argument("--progress-every", type=int, default=0, metavar="ROWS",
+                        help="print the throughput every ROWS rows")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of scoring processes; 0 uses every CPU (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="records per worker task (default: 1000)")
+    parser.add_argument("--staged", action="store_true",
+                        help="stop scoring an application at the first section that rejects it")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write per-stage timings and counters to PATH (.json for JSON, Prometheus text otherwise)")
+    parser.add_argument("--cache", metavar="PATH",
+                        help="reuse decisions for unchanged applications, kept in the SQLite file PATH")
+    parser.add_argument("--store", metavar="PATH",
+                        help="also keep every application and decision in the SQLite database PATH")
+    parser.add_argument("--report", metavar="PATH",
+                        help="write a JSON portfolio report (approval rates, histograms, breakdowns) to PATH")
+    args = parser.parse_args(argv)
+    if args.metrics and args.workers != 1:
+        parser.error("--metrics times the scoring in this process, so it needs --workers 1.")
+    if args.cache and (args.workers != 1 or args.staged):
+        parser.error("--cache needs --workers 1 and cannot be combined with --staged.")
+
+    cache = None
+    if args.cache:
+        from credit_cache import DecisionCache
+        cache = DecisionCache(path=args.cache)
+
+    def scorer(records):
+        return score_records(records, args.staged, cache)
+
+    if args.workers != 1:
+        from credit_parallel import parallel_scorer
+        scorer = parallel_scorer(args.workers or None, args.chunk_size, args.staged)
+
+    store = None
+    if args.store:
+        from credit_store import DecisionStore, storing_scorer
+        store = DecisionStore(args.store)
+        store.start_run(args.input)
+        scorer = storing_scorer(scorer, store)
+
+    aggregate = None
+    if args.report:
+        from credit_aggregate import PortfolioAggregate, aggregating_scorer
+        aggregate = PortfolioAggregate()
+        scorer = aggregating_scorer(scorer, aggregate)
+
+    registry = None
+    if args.metrics:
+        from credit_metrics import MetricsRegistry, enable_instrumentation
+        registry = enable_instrumentation(MetricsRegistry())
+    try:
+        stats = run_batch(args.input, args.output, args.input_format, args.output_format, args.progress_every,
+                          sys.stderr, scorer)
+    finally:
+        if registry is not None:
+            from credit_metrics import disable_instrumentation
+            disable_instrumentation()
+            registry.write(args.metrics)
+        if cache is not None:
+            cache.close()
+        if store is not None:
+            store.close()
+    if aggregate is not None:
+        with open(args.report, "w", encoding="utf-8") as stream:
+            json.dump(aggregate.to_dict(), stream, indent=2)
+    print(stats.summary(), file=sys.stderr)
+    if cache is not None:
+        cache_stats = cache.stats()
+        print(f"Decision cache: {cache_stats['hit_rate']:.1%} hits ({cache_stats['memory_hits']} memory, "
+              f"{cache_stats['disk_hits']} disk, {cache_stats['misses']} misses)", file=sys.stderr)
+    return stats
+
+
+if __name__ == "__main__":
+    main()
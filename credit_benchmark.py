@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_benchmark.py
+Description: Speed benchmarks for the scoring hot paths and the batch pipeline.
+
+Micro benchmarks time the input validators, the ratio and band functions, every
+section score and calculate_score_and_update_status. The start-up benchmarks time
+a fresh interpreter importing the scoring modules. The pipeline benchmark
+writes synthetic applications to a CSV file and runs credit_batch.run_batch on
+it end to end. Results are written as JSON, and a previous results file can be
+passed with --compare to flag regressions.
+
+Usage:
+    python credit_benchmark.py --output results.json
+    python credit_benchmark.py --sizes 1000 100000 1000000 --output results.json
+    python credit_benchmark.py --output new.json --compare results.json --tolerance 0.15
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from typing import NamedTuple
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    validate_full_name, validate_borrower_history, validate_number_input,
+    get_debt_to_sales_ratio, get_debt_to_income_ratio, get_loan_to_valuation_ratio,
+    get_debt_sales_ratio_score, get_to_income_ratio_score, get_loan_to_valuation_ratio_score,
+)
+from credit_batch import INPUT_FIELDS, build_credit_analysis, run_batch
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+DEFAULT_MIN_TIME = 0.2
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.10
+DEFAULT_STARTUP_RUNS = 5
+
+# modules a short-lived scoring job imports, cheapest first
+STARTUP_MODULES = ("MH6803_Required_Group_Project_code_Group1", "credit_batch", "credit_cli")
+
+FIRST_NAMES = ("John", "Mary", "Wei", "Siti", "Arjun", "Chloé", "José", "Nguyen")
+LAST_NAMES = ("Doe", "Tan", "Lim", "Kumar", "Wong", "Müller", "García", "Ong")
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    group: str
+    unit: str  # "ns/call" or "ms" (lower is better), or "rows/s" (higher is better)
+    value: float
+    iterations: int
+    seconds: float
+
+    @property
+    def higher_is_better(self) -> bool:
+        return self.unit == "rows/s"
+
+
+# ------------------------------------------ Synthetic input -----------------------------------------------------------
+
+def synthetic_record(rng: random.Random) -> dict:
+    """One application in the credit_batch input format, with a realistic mix of outcomes."""
+    market_value = rng.randint(50, 2000) * 1000
+    return {
+        "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "entity_type": str(rng.randint(1, 3)),
+        "bank_status": str(rng.randint(1, 2)),
+        "number_of_guarantors": str(rng.randint(0, 6)),
+        "age_of_guarantors": str(rng.randint(18, 70)),
+        "borrowing_history": rng.choice("AAABBCD"),
+        "current_total_debt": str(rng.randint(0, 500) * 1000),
+        "gross_income": str(rng.randint(20, 1000) * 1000),
+        "total_sales_per_year": str(rng.randint(20, 1000) * 1000),
+        "current_market_value": str(market_value),
+        "type_of_property": str(rng.randint(1, 4)),
+        "current_property_status": str(rng.choice((1, 2, 2, 2))),
+        "location_of_the_property": str(rng.randint(1, 3)),
+        "type_of_facility_applying": str(rng.randint(1, 2)),
+        "applied_loan_amount": str(int(market_value * rng.uniform(0.2, 1.0))),
+    }
+
+
+def synthetic_records(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield synthetic_record(rng)
+
+
+def write_synthetic_csv(path: str, count: int, seed: int = 0):
+    with open(path, "w", newline="", encoding="utf-8") as stream:
+        writer = csv.writer(stream)
+        writer.writerow(INPUT_FIELDS)
+        for record in synthetic_records(count, seed):
+            writer.writerow([record[field] for field in INPUT_FIELDS])
+
+
+# ------------------------------------------ Timing --------------------------------------------------------------------
+
+def time_call(function, min_time: float = DEFAULT_MIN_TIME, repeat: int = DEFAULT_REPEAT):
+    """Return (best seconds per call, calls per repeat) for a function without arguments."""
+    timer = timeit.Timer(function)
+    # calibrate on a tenth of min_time, then size each repeat to last about min_time
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time / 10:
+            break
+        number *= 10
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number, number
+
+
+def micro_benchmarks(seed: int = 0):
+    """(name, group, function) for every hot path, each working on a fixed synthetic application."""
+    record = synthetic_record(random.Random(seed))
+    analysis = build_credit_analysis(record)
+    section_cache = analysis._section_results
+
+    def cold(method):
+        # every call scores the section again instead of reading the cached result
+        def run():
+            section_cache.clear()
+            return method()
+
+        return run
+
+    return [
+        ("validate_full_name", "validators", lambda: validate_full_name(record["full_name"])),
+        ("validate_borrower_history", "validators", lambda: validate_borrower_history(record["borrowing_history"])),
+        ("validate_number_input", "validators", lambda: validate_number_input(record["current_total_debt"])),
+        ("get_debt_to_sales_ratio", "ratios", lambda: get_debt_to_sales_ratio(80000, 100000)),
+        ("get_debt_to_income_ratio", "ratios", lambda: get_debt_to_income_ratio(80000, 100000)),
+        ("get_loan_to_valuation_ratio", "ratios", lambda: get_loan_to_valuation_ratio(90000, 100000)),
+        ("get_debt_sales_ratio_score", "bands", lambda: get_debt_sales_ratio_score(55.0)),
+        ("get_to_income_ratio_score", "bands", lambda: get_to_income_ratio_score(45.0)),
+        ("get_loan_to_valuation_ratio_score", "bands", lambda: get_loan_to_valuation_ratio_score(70.0)),
+        ("get_borrower_information_details_score", "sections",
+         cold(analysis.get_borrower_information_details_score)),
+        ("get_financial_details_score", "sections", cold(analysis.get_financial_details_score)),
+        ("get_collateral_details_score", "sections", cold(analysis.get_collateral_details_score)),
+        ("get_facility_details_score", "sections", cold(analysis.get_facility_details_score)),
+        ("calculate_score_and_update_status", "sections", cold(analysis.calculate_score_and_update_status)),
+        ("build_credit_analysis", "pipeline", lambda: build_credit_analysis(record)),
+    ]
+
+
+def run_micro_benchmarks(min_time: float = DEFAULT_MIN_TIME, repeat: int = DEFAULT_REPEAT, seed: int = 0) -> list:
+    results = []
+    for name, group, function in micro_benchmarks(seed):
+        seconds_per_call, number = time_call(function, min_time, repeat)
+        results.append(BenchmarkResult(name, group, "ns/call", seconds_per_call * 1e9, number,
+                                       seconds_per_call * number))
+    return results
+
+
+def measure_startup(statement: str, runs: int = DEFAULT_STARTUP_RUNS) -> float:
+    """Best wall-clock seconds for a new interpreter to run statement, from this module's directory."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=directory, check=True)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_startup_benchmarks(runs: int = DEFAULT_STARTUP_RUNS) -> list:
+    """Interpreter start-up on its own, then start-up plus importing each scoring module."""
+    results = []
+    for name, statement in [("startup[python]", "pass")] + [(f"startup[{module}]", f"import {module}")
+                                                             for module in STARTUP_MODULES]:
+        seconds = measure_startup(statement, runs)
+        results.append(BenchmarkResult(name, "startup", "ms", seconds * 1000, runs, seconds))
+    return results
+
+
+def run_batch_benchmark(size: int, directory: str, seed: int = 0) -> BenchmarkResult:
+    """End-to-end CSV in, CSV out throughput; the synthetic file is written before the clock starts."""
+    input_path = os.path.join(directory, f"applications_{size}.csv")
+    write_synthetic_csv(input_path, size, seed)
+    try:
+        started = time.perf_counter()
+        stats = run_batch(input_path, os.devnull, output_format="csv")
+        elapsed = time.perf_counter() - started
+    finally:
+        os.remove(input_path)
+    return BenchmarkResult(f"run_batch[{size}]", "batch", "rows/s", stats.rows / elapsed if elapsed else 0.0,
+                           stats.rows, elapsed)
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, min_time: float = DEFAULT_MIN_TIME, repeat: int = DEFAULT_REPEAT,
+                   seed: int = 0, progress_stream=None, startup_runs: int = DEFAULT_STARTUP_RUNS) -> list:
+    results = []
+    for result in run_micro_benchmarks(min_time, repeat, seed):
+        _report(result, progress_stream)
+        results.append(result)
+    for result in run_startup_benchmarks(startup_runs) if startup_runs else []:
+        _report(result, progress_stream)
+        results.append(result)
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            result = run_batch_benchmark(size, directory, seed)
+            _report(result, progress_stream)
+            results.append(result)
+    return results
+
+
+def _report(result: BenchmarkResult, stream):
+    if stream is not None:
+        print(f"{result.name:<42}{result.value:>14,.1f} {result.unit}", file=stream)
+
+
+# ------------------------------------------ Results files -------------------------------------------------------------
+
+def environment() -> dict:
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_results(path: str, results: list):
+    payload = {"environment": environment(), "results": [result._asdict() for result in results]}
+    with open(path, "w", encoding="utf-8") as stream:
+        json.dump(payload, stream, indent=2)
+        stream.write("\n")
+
+
+def read_results(path: str) -> list:
+    with open(path, encoding="utf-8") as stream:
+        payload = json.load(stream)
+    return [BenchmarkResult(**result) for result in payload["results"]]
+
+
+def compare_results(baseline: list, current: list, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """
+    Return (name, baseline value, current value, relative change) for every benchmark
+    that got slower by more than tolerance. Benchmarks missing from either side are ignored.
+    """
+    baseline_by_name = {result.name: result for result in baseline}
+    regressions = []
+    for result in current:
+        before = baseline_by_name.get(result.name)
+        if before is None or before.unit != result.unit or before.value <= 0:
+            continue
+        change = (result.value - before.value) / before.value
+        slower = -change if result.higher_is_better else change
+        if slower > tolerance:
+            regressions.append((result.name, before.value, result.value, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the credit scoring hot paths and batch pipeline.")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file to write")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(DEFAULT_SIZES),
+                        help="batch sizes for the end-to-end benchmark (default: 1000 100000 1000000)")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME,
+                        help="seconds per repeat of each micro benchmark")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="repeats per micro benchmark (best wins)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic applications")
+    parser.add_argument("--startup-runs", type=int, default=DEFAULT_STARTUP_RUNS,
+                        help="interpreter launches per start-up benchmark, 0 to skip them (default: 5)")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file to check for regressions against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="relative slowdown reported as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.min_time, args.repeat, args.seed, sys.stderr, args.startup_runs)
+    write_results(args.output, results)
+    print(f"Results written to {args.output}", file=sys.stderr)
+    if not args.compare:
+        return 0
+    regressions = compare_results(read_results(args.compare), results, args.tolerance)
+    for name, before, after, change in regressions:
+        print(f"REGRESSION {name}: {before:,.1f} -> {after:,.1f} ({change:+.1%})", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_cache.py
+Description: Decision cache for applications that are submitted again unchanged.
+
+A decision is stored under a fingerprint of everything that can change it: the
+normalised application inputs, the section and total thresholds and the tables
+of the scorecard. Changing a threshold or the scorecard therefore changes the key,
+and stale decisions are never served. The full name is not part of the key
+because it does not affect the decision.
+
+Decisions are kept in an in-memory LRU and, optionally, in a SQLite file that
+survives between runs. The file holds at most max_disk_entries decisions and,
+when max_disk_bytes is given, at most that many bytes of used pages; the least
+recently used decisions are evicted first.
+
+Usage:
+    cache = DecisionCache(path="decisions.sqlite")
+    total = cache.calculate_score_and_update_status(analysis)
+    cache.stats()  # hits, misses and hit rates
+
+    python credit_batch.py applications.csv decisions.csv --cache decisions.sqlite
+"""
+
+import hashlib
+import json
+import sqlite3
+import weakref
+from collections import OrderedDict
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    BorrowerCreditAnalysis, BorrowStatus, CreditDecision, RejectionReason, Scorecard, SectionResult,
+)
+
+DEFAULT_MEMORY_ENTRIES = 100000
+DEFAULT_DISK_ENTRIES = 1000000
+DISK_COMMIT_EVERY = 1000
+DISK_EVICTION_FRACTION = 0.1  # share of the file freed at once when it is full
+
+
+# ------------------------------------------ Fingerprints --------------------------------------------------------------
+
+def _canonical_points(points: dict) -> list:
+    return sorted((getattr(key, "name", key), value) for key, value in points.items())
+
+
+def _canonical_bands(bands) -> list:
+    return [bands.base_points, [list(band) for band in bands.bands]]
+
+
+# entries go away with their scorecard, e.g. the ones replaced by credit_config hot reloads
+_scorecard_fingerprints = weakref.WeakKeyDictionary()
+
+
+def scorecard_fingerprint(scorecard: Scorecard) -> str:
+    """Hash of the scorecard tables; scorecards are treated as read-only once built."""
+    cached = _scorecard_fingerprints.get(scorecard)
+    if cached is not None:
+        return cached
+    canonical = [
+        _canonical_points(scorecard.entity_type_points), _canonical_points(scorecard.bank_status_points),
+        list(scorecard.guarantor_points), _canonical_points(scorecard.grade_points),
+        _canonical_points(scorecard.property_type_points), _canonical_points(scorecard.property_location_points),
+        _canonical_points(scorecard.facility_type_points), _canonical_bands(scorecard.debt_to_sales_bands),
+        _canonical_bands(scorecard.debt_to_income_bands), _canonical_bands(scorecard.loan_to_valuation_bands),
+    ]
+    fingerprint = hashlib.blake2b(json.dumps(canonical).encode("utf-8"), digest_size=16).hexdigest()
+    _scorecard_fingerprints[scorecard] = fingerprint
+    return fingerprint
+
+
+def application_fingerprint(analysis: BorrowerCreditAnalysis) -> str:
+    """
+    Stable key of the inputs and thresholds of a complete analysis. Borrowing history
+    grades are compared without regard to case, like the scoring rules do.
+    """
+    borrower = analysis.borrower_information_details
+    financial = analysis.borrower_financial_details
+    collateral = analysis.borrower_collateral_detail
+    facility = analysis.borrower_facility_details
+    canonical = [
+        borrower.entity_type.name, borrower.bank_status.name, borrower.number_of_guarantors,
+        borrower.age_of_guarantors, borrower.borrowing_history.upper(),
+        financial.current_total_debt, financial.gross_income, financial.total_sales_per_year,
+        collateral.current_market_value, collateral.type_of_property.name, collateral.current_property_status.name,
+        collateral.location_of_the_property.name,
+        facility.type_of_facility_applying.name, facility.applied_loan_amount,
+        analysis.min_borrow_info_score, analysis.min_financial_details_score, analysis.min_collateral_score,
+        analysis.min_facility_score, analysis.min_total_credit_score,
+        scorecard_fingerprint(analysis.scorecard),
+    ]
+    return hashlib.blake2b(json.dumps(canonical, separators=(",", ":")).encode("utf-8"),
+                           digest_size=16).hexdigest()
+
+
+def is_complete(analysis: BorrowerCreditAnalysis) -> bool:
+    return None not in (analysis.borrower_information_details, analysis.borrower_financial_details,
+                        analysis.borrower_collateral_detail, analysis.borrower_facility_details)
+
+
+# ------------------------------------------ Serialisation -------------------------------------------------------------
+
+def encode_decision(decision: CreditDecision) -> str:
+    sections = [[section.score, int(section.reasons), section.debt_to_sales_ratio, section.debt_to_income_ratio,
+                 section.loan_to_valuation_ratio] for section in decision.sections]
+    return json.dumps([decision.status.name, decision.total_credit_score, sections, int(decision.reasons)],
+                      separators=(",", ":"))
+
+
+def decode_decision(text: str) -> CreditDecision:
+    status, total_credit_score, sections, reasons = json.loads(text)
+    return CreditDecision(BorrowStatus[status], total_credit_score,
+                          *[SectionResult(score, RejectionReason(section_reasons), *ratios)
+                            for score, section_reasons, *ratios in sections],
+                          RejectionReason(reasons))
+
+
+# ------------------------------------------ Tiers ---------------------------------------------------------------------
+
+class LRUCache:
+    def __init__(self, max_entries: int = DEFAULT_MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class SQLiteDecisionStore:
+    """Decisions on disk, evicted least recently used first once max_entries or max_bytes is reached.
+
+    The byte bound counts the pages in use, so pages freed by an eviction are reused before the file grows again.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_DISK_ENTRIES, max_bytes: int = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS decision_cache ("
+                                "key TEXT PRIMARY KEY, decision TEXT NOT NULL, last_used INTEGER NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS decision_cache_last_used ON decision_cache (last_used)")
+        self.entries, self._clock = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM decision_cache").fetchone()
+        self._uncommitted = 0
+
+    def __len__(self):
+        return self.entries
+
+    def get(self, key: str):
+        row = self.connection.execute("SELECT decision FROM decision_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self.connection.execute("UPDATE decision_cache SET last_used = ? WHERE key = ?", (self._tick(), key))
+        self._written()
+        return row[0]
+
+    def put(self, key: str, value: str):
+        # the rowcount of an upsert is 1 for an update too, so only a real insert grows the entry count
+        inserted = self.connection.execute(
+            "INSERT OR IGNORE INTO decision_cache (key, decision, last_used) VALUES (?, ?, ?)",
+            (key, value, self._tick())).rowcount
+        if inserted:
+            self.entries += 1
+        else:
+            self.connection.execute("UPDATE decision_cache SET decision = ?, last_used = ? WHERE key = ?",
+                                    (value, self._clock, key))
+        if self.entries > self.max_entries:
+            self.evict()
+        while self.max_bytes is not None and self.entries and self.size_bytes() > self.max_bytes:
+            self.evict(self.entries)
+        self._written()
+
+    def size_bytes(self) -> int:
+        """Bytes of the pages in use, the part of the file that eviction can free for reuse."""
+        page_size = self.connection.execute("PRAGMA page_size").fetchone()[0]
+        page_count = self.connection.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self.connection.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def evict(self, entries: int = None):
+        """Drop the least recently used share of the given number of entries (max_entries by default)."""
+        keep = int((self.max_entries if entries is None else entries) * (1 - DISK_EVICTION_FRACTION))
+        self.connection.execute("DELETE FROM decision_cache WHERE key IN "
+                                "(SELECT key FROM decision_cache ORDER BY last_used LIMIT ?)",
+                                (max(1, self.entries - keep),))
+        self.entries = self.connection.execute("SELECT COUNT(*) FROM decision_cache").fetchone()[0]
+
+    def _tick(self) -> int:
+        # a use counter rather than a clock, so the eviction order has no ties
+        self._clock += 1
+        return self._clock
+
+    def _written(self):
+        self._uncommitted += 1
+        if self._uncommitted >= DISK_COMMIT_EVERY:
+            self.commit()
+
+    def commit(self):
+        self.connection.commit()
+        self._uncommitted = 0
+
+    def clear(self):
+        self.connection.execute("DELETE FROM decision_cache")
+        self.commit()
+        self.entries = 0
+
+    def close(self):
+        self.commit()
+        self.connection.close()
+
+
+# ------------------------------------------ Cache ---------------------------------------------------------------------
+
+class DecisionCache:
+    def __init__(self, max_memory_entries: int = DEFAULT_MEMORY_ENTRIES, path: str = None,
+                 max_disk_entries: int = DEFAULT_DISK_ENTRIES, max_disk_bytes: int = None):
+        self.memory = LRUCache(max_memory_entries)
+        self.disk = SQLiteDecisionStore(path, max_disk_entries, max_disk_bytes) if path else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, key: str):
+        decision = self.memory.get(key)
+        if decision is not None:
+            self.memory_hits += 1
+            return decision
+        if self.disk is not None:
+            encoded = self.disk.get(key)
+            if encoded is not None:
+                self.disk_hits += 1
+                decision = decode_decision(encoded)
+                self.memory.put(key, decision)
+                return decision
+        self.misses += 1
+        return None
+
+    def put(self, key: str, decision: CreditDecision):
+        self.memory.put(key, decision)
+        if self.disk is not None:
+            self.disk.put(key, encode_decision(decision))
+
+    def evaluate(self, analysis: BorrowerCreditAnalysis) -> CreditDecision:
+        """analysis.evaluate(), answered from the cache when the same inputs were scored before."""
+        if not is_complete(analysis):
+            return analysis.evaluate()
+        key = application_fingerprint(analysis)
+        decision = self.get(key)
+        if decision is None:
+            decision = analysis.evaluate()
+            self.put(key, decision)
+        return decision
+
+    def calculate_score_and_update_status(self, analysis: BorrowerCreditAnalysis) -> int:
+        """Cached stand-in for analysis.calculate_score_and_update_status()."""
+        decision = self.evaluate(analysis)
+        analysis.borrower_analysis_status = decision.status
+        analysis.total_credit_score = decision.total_credit_score
+        return decision.total_credit_score
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "lookups": lookups,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_hit_rate": self.memory_hits / lookups if lookups else 0.0,
+            "disk_hit_rate": self.disk_hits / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+        }
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_cli.py
+Description: Headless command line entry point for scoring jobs.
+
+Only the module behind the chosen command is imported, so a short-lived scoring
+job does not load the benchmark, the HTTP service, the interactive reports or the
+test suite. Everything after the command is handed to that module's own parser.
+
+Usage:
+    python credit_cli.py score applications.csv decisions.csv [credit_batch options]
+    python credit_cli.py bench --output results.json [credit_benchmark options]
+    python credit_cli.py serve --port 8080 [credit_service options]
+    python credit_cli.py sweep applications.csv --min-total-credit-score 18 19 20
+    python credit_cli.py offers applications.csv offers.csv
+    python credit_cli.py columnar import applications.csv portfolio.cols
+    python credit_cli.py report portfolio.cols --workers 4
+    python credit_cli.py render applications.csv reports.html
+    python credit_cli.py scorecard check scorecard.toml
+    python credit_cli.py score --help
+"""
+
+import sys
+
+# command -> (module with a main(argv), help text)
+COMMANDS = {
+    "score": ("credit_batch", "score applications from a CSV or JSONL file"),
+    "bench": ("credit_benchmark", "benchmark the scoring hot paths and the batch pipeline"),
+    "serve": ("credit_service", "serve decisions over HTTP/JSON on localhost"),
+    "sweep": ("credit_sweep", "approval rates of a portfolio for a grid of thresholds"),
+    "offers": ("credit_max_loan", "largest accepted loan amount per facility type"),
+    "columnar": ("credit_columnar", "import, score and export memory-mapped columnar datasets"),
+    "report": ("credit_aggregate", "portfolio report of a scored columnar dataset"),
+    "render": ("credit_report", "render credit analysis reports as text, CSV or HTML"),
+    "scorecard": ("credit_config", "write or check declarative scorecard files"),
+}
+
+
+def main(argv=None):
+    import argparse
+    from importlib import import_module
+
+    parser = argparse.ArgumentParser(description="Credit analysis scoring jobs.",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog="\n".join(f"  {command:<10}{help_text}"
+                                                      for command, (_, help_text) in COMMANDS.items()))
+    parser.add_argument("command", choices=COMMANDS, help="one of the commands below")
+    parser.add_argument("arguments", nargs=argparse.REMAINDER, help="options of the command (see COMMAND --help)")
+    args = parser.parse_args(argv)
+    module_name, _ = COMMANDS[args.command]
+    return import_module(module_name).main(args.arguments)
+
+
+if __name__ == "__main__":
+    result = main()
+    sys.exit(result if isinstance(result, int) else 0)
@@ -0,0 +1,466 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_columnar.py
+Description: Memory-mapped columnar files for application portfolios and their decisions.
+
+A dataset is a directory with one raw little-endian file per column and a small
+JSON header. Money and guarantor columns are int64 and enum columns are int8 enum
+values, as in credit_shared.INPUT_DTYPES. borrowing_history is stored as int32
+codes into the table of distinct histories kept in the header. Names go into a
+UTF-8 heap with one uint64 end offset per row. The decision columns
+(credit_shared.OUTPUT_DTYPES) sit next to the inputs once the dataset is scored.
+
+Writes only append. The column files are extended first and the header, which
+holds the row count, is replaced last, so a reader never sees a half-written row
+and an interrupted append is cut off the next time the dataset is opened for
+writing. Reads map the files with np.memmap: opening a 50M-row dataset reads the
+header only, and score_columns runs on slices of the mapped columns.
+
+Usage:
+    with ColumnarWriter("portfolio.cols") as writer:
+        writer.append_analysis(analysis)          # or append_columns(columns, full_names)
+    dataset = ColumnarDataset("portfolio.cols")
+    score_columns(**dataset.columns(0, 100000))
+    score_dataset("portfolio.cols", min_total_credit_score=18)   # stores the decision columns
+
+    python credit_columnar.py import applications.csv portfolio.cols
+    python credit_columnar.py score portfolio.cols --min-total-credit-score 18
+    python credit_columnar.py export portfolio.cols decisions.csv
+"""
+
+import json
+import os
+
+import numpy as np
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    BorrowStatus, BorrowerCreditAnalysis,
+    entity_type_dic, client_bank_status_dic, property_type_dic, property_location_dic,
+    current_property_status_dic, type_of_facility_applying_dic,
+)
+from credit_shared import INPUT_DTYPES, OUTPUT_DTYPES
+from credit_vectorized import score_columns
+
+FORMAT_NAME = "credit-columnar"
+FORMAT_VERSION = 1
+HEADER_FILE = "header.json"
+NAME_HEAP_FILE = "full_name.heap"
+NAME_OFFSETS_FILE = "full_name.offsets"
+COLUMN_SUFFIX = ".col"
+NAME_OFFSET_DTYPE = np.dtype("<u8")
+DEFAULT_BUFFER_ROWS = 100000
+DEFAULT_CHUNK_SIZE = 1000000
+
+# stored explicitly little-endian so a dataset can be mapped on any machine
+APPLICATION_DTYPES = {name: np.dtype(dtype).newbyteorder("<") for name, dtype in INPUT_DTYPES.items()}
+DECISION_DTYPES = {name: np.dtype(dtype).newbyteorder("<") for name, dtype in OUTPUT_DTYPES.items()}
+
+# enum column -> {enum value: option key of the credit_batch input format}
+ENUM_OPTION_KEYS = {
+    name: {member.value: key for key, member in options.items()}
+    for name, options in (("entity_type", entity_type_dic), ("bank_status", client_bank_status_dic),
+                          ("type_of_property", property_type_dic),
+                          ("current_property_status", current_property_status_dic),
+                          ("location_of_the_property", property_location_dic),
+                          ("type_of_facility_applying", type_of_facility_applying_dic))
+}
+
+
+class ColumnarFormatError(ValueError):
+    """Raised when a directory does not hold a dataset this module can read."""
+    pass
+
+
+def _column_path(path: str, name: str) -> str:
+    return os.path.join(path, name + COLUMN_SUFFIX)
+
+
+def read_header(path: str) -> dict:
+    try:
+        with open(os.path.join(path, HEADER_FILE), encoding="utf-8") as stream:
+            header = json.load(stream)
+    except FileNotFoundError:
+        raise ColumnarFormatError(f"'{path}' is not a columnar dataset: {HEADER_FILE} is missing.") from None
+    if header.get("format") != FORMAT_NAME or header.get("version") != FORMAT_VERSION:
+        raise ColumnarFormatError(f"'{path}' holds an unsupported dataset format.")
+    return header
+
+
+def _write_header(path: str, header: dict):
+    temporary = os.path.join(path, HEADER_FILE + ".tmp")
+    with open(temporary, "w", encoding="utf-8") as stream:
+        json.dump(header, stream, indent=1)
+        stream.flush()
+        os.fsync(stream.fileno())
+    os.replace(temporary, os.path.join(path, HEADER_FILE))
+
+
+def _map(file_path: str, dtype, rows: int) -> np.ndarray:
+    # mmap cannot map an empty file
+    if rows == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(file_path, dtype=dtype, mode="r", shape=(rows,))
+
+
+# ------------------------------------------ Reading -------------------------------------------------------------------
+
+class ColumnarDataset:
+    """
+    Read-only view of a dataset. arrays[name] and decisions[name] are memory-mapped
+    columns; nothing is read from disk until a column is touched.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        header = read_header(path)
+        self.rows = header["rows"]
+        self.decision_rows = header["decision_rows"]
+        self.histories = np.array(header["histories"] or [""], dtype=str)
+        self.arrays = {name: _map(_column_path(path, name), dtype, self.rows)
+                       for name, dtype in APPLICATION_DTYPES.items()}
+        self.decisions = {name: _map(_column_path(path, name), dtype, self.decision_rows)
+                          for name, dtype in DECISION_DTYPES.items()}
+        self.name_offsets = _map(os.path.join(path, NAME_OFFSETS_FILE), NAME_OFFSET_DTYPE, self.rows)
+        heap_size = int(self.name_offsets[-1]) if self.rows else 0
+        self.name_heap = _map(os.path.join(path, NAME_HEAP_FILE), np.uint8, heap_size)
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def scored(self) -> bool:
+        return self.decision_rows == self.rows
+
+    def full_name(self, index: int) -> str:
+        start = int(self.name_offsets[index - 1]) if index else 0
+        return self.name_heap[start:int(self.name_offsets[index])].tobytes().decode("utf-8")
+
+    def full_names(self, start: int = 0, stop: int = None) -> list:
+        stop = self.rows if stop is None else stop
+        if start >= stop:
+            return []
+        first = int(self.name_offsets[start - 1]) if start else 0
+        ends = (self.name_offsets[start:stop] - np.uint64(first)).tolist()
+        heap = self.name_heap[first:first + ends[-1]].tobytes()
+        return [heap[begin:end].decode("utf-8") for begin, end in zip([0] + ends[:-1], ends)]
+
+    def columns(self, start: int = 0, stop: int = None) -> dict:
+        """Rows [start, stop) as the keyword columns of score_columns; only borrowing_history is copied."""
+        columns = {name: values[start:stop] for name, values in self.arrays.items()}
+        columns["borrowing_history"] = self.histories[columns["borrowing_history"]]
+        return columns
+
+    def records(self, start: int = 0, stop: int = None):
+        """Rows [start, stop) as credit_batch input records."""
+        stop = self.rows if stop is None else stop
+        columns = {name: values[start:stop].tolist() for name, values in self.arrays.items()}
+        histories = self.histories.tolist()
+        for index, full_name in enumerate(self.full_names(start, stop)):
+            record = {"full_name": full_name}
+            for name, values in columns.items():
+                value = values[index]
+                if name in ENUM_OPTION_KEYS:
+                    record[name] = ENUM_OPTION_KEYS[name][value]
+                elif name == "borrowing_history":
+                    record[name] = histories[value]
+                else:
+                    record[name] = str(value)
+            yield record
+
+
+# ------------------------------------------ Writing -------------------------------------------------------------------
+
+class ColumnarWriter:
+    """
+    Appends applications to a dataset, creating it when the directory has none.
+    Rows are buffered and reach the files and the header every buffer_rows rows and on
+    flush() or close(). Data past the row count of the header, left by an interrupted
+    append, is cut off when the writer opens the dataset.
+    """
+
+    def __init__(self, path: str, buffer_rows: int = DEFAULT_BUFFER_ROWS):
+        self.path = path
+        self.buffer_rows = buffer_rows
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, HEADER_FILE)):
+            self.header = read_header(path)
+        else:
+            self.header = {"format": FORMAT_NAME, "version": FORMAT_VERSION, "rows": 0, "decision_rows": 0,
+                           "histories": []}
+        self._history_index = {history: code for code, history in enumerate(self.header["histories"])}
+        self._truncate()
+        self._dirty = False  # files may hold bytes past the header after a failed write
+        self._buffer = {name: [] for name in APPLICATION_DTYPES}
+        self._names = []
+
+    def __len__(self):
+        return self.header["rows"] + len(self._names)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _truncate(self):
+        rows = self.header["rows"]
+        heap_size = 0
+        offsets_path = os.path.join(self.path, NAME_OFFSETS_FILE)
+        if rows:
+            with open(offsets_path, "rb") as stream:
+                stream.seek((rows - 1) * NAME_OFFSET_DTYPE.itemsize)
+                heap_size = int(np.frombuffer(stream.read(NAME_OFFSET_DTYPE.itemsize), dtype=NAME_OFFSET_DTYPE)[0])
+        sizes = {NAME_HEAP_FILE: heap_size, NAME_OFFSETS_FILE: rows * NAME_OFFSET_DTYPE.itemsize}
+        sizes.update((name + COLUMN_SUFFIX, rows * dtype.itemsize) for name, dtype in APPLICATION_DTYPES.items())
+        sizes.update((name + COLUMN_SUFFIX, self.header["decision_rows"] * dtype.itemsize)
+                     for name, dtype in DECISION_DTYPES.items())
+        for file_name, size in sizes.items():
+            with open(os.path.join(self.path, file_name), "ab") as stream:
+                stream.truncate(size)
+
+    def _history_code(self, borrowing_history: str) -> int:
+        code = self._history_index.get(borrowing_history)
+        if code is None:
+            code = self._history_index[borrowing_history] = len(self.header["histories"])
+            self.header["histories"].append(borrowing_history)
+        return code
+
+    def append(self, full_name: str, **fields):
+        """One application given as score_columns values: enum values, integers and the history string."""
+        for name, values in self._buffer.items():
+            value = fields[name]
+            values.append(self._history_code(value) if name == "borrowing_history" else value)
+        self._names.append(full_name)
+        if len(self._names) >= self.buffer_rows:
+            self.flush()
+
+    def append_analysis(self, analysis: BorrowerCreditAnalysis):
+        borrower = analysis.borrower_information_details
+        financial = analysis.borrower_financial_details
+        collateral = analysis.borrower_collateral_detail
+        facility = analysis.borrower_facility_details
+        self.append(borrower.full_name, entity_type=borrower.entity_type.value,
+                    bank_status=borrower.bank_status.value, number_of_guarantors=borrower.number_of_guarantors,
+                    age_of_guarantors=borrower.age_of_guarantors, borrowing_history=borrower.borrowing_history,
+                    current_total_debt=financial.current_total_debt, gross_income=financial.gross_income,
+                    total_sales_per_year=financial.total_sales_per_year,
+                    current_market_value=collateral.current_market_value,
+                    type_of_property=collateral.type_of_property.value,
+                    current_property_status=collateral.current_property_status.value,
+                    location_of_the_property=collateral.location_of_the_property.value,
+                    type_of_facility_applying=facility.type_of_facility_applying.value,
+                    applied_loan_amount=facility.applied_loan_amount)
+
+    def append_columns(self, columns: dict, full_names: list):
+        """Many applications at once, as score_columns columns plus their names."""
+        self.flush()
+        histories, codes = np.unique(np.asarray(columns["borrowing_history"], dtype=str), return_inverse=True)
+        history_codes = np.array([self._history_code(history) for history in histories.tolist()], dtype=np.int32)
+        arrays = {name: np.asarray(columns[name]) for name in APPLICATION_DTYPES if name != "borrowing_history"}
+        arrays["borrowing_history"] = history_codes[codes.reshape(-1)]
+        self._write_rows(arrays, full_names)
+
+    @staticmethod
+    def _checked_columns(arrays: dict, dtypes: dict, rows: int) -> dict:
+        """Every column converted to its file dtype, once all of them are known to have rows values."""
+        checked = {}
+        for name, dtype in dtypes.items():
+            try:
+                values = np.asarray(arrays[name]).astype(dtype, copy=False)
+            except (KeyError, TypeError, ValueError) as error:
+                raise ValueError(f"Column '{name}' cannot be stored as {dtype}: {error}") from error
+            if values.shape != (rows,):
+                raise ValueError(f"Column '{name}' has shape {values.shape}, expected ({rows},).")
+            checked[name] = values
+        return checked
+
+    def _discard_uncommitted(self):
+        # bytes of an earlier failed write whose truncation failed as well
+        if self._dirty:
+            self._truncate()
+            self._dirty = False
+
+    def _append_files(self, blobs: dict, count: str, rows: int):
+        """
+        Append to the files and commit by adding rows to header[count]. A failed write is
+        cut back to the header straight away, or before the next write if that fails too.
+        """
+        self._dirty = True
+        try:
+            for file_name, blob in blobs.items():
+                with open(os.path.join(self.path, file_name), "ab") as stream:
+                    stream.write(blob)
+            header = dict(self.header, **{count: self.header[count] + rows})
+            _write_header(self.path, header)
+        except BaseException:
+            try:
+                self._truncate()
+                self._dirty = False
+            except OSError:
+                pass
+            raise
+        self.header = header
+        self._dirty = False
+
+    def _write_rows(self, arrays: dict, full_names: list):
+        rows = len(full_names)
+        if not rows:
+            return
+        columns = self._checked_columns(arrays, APPLICATION_DTYPES, rows)
+        self._discard_uncommitted()
+        encoded = [full_name.encode("utf-8") for full_name in full_names]
+        heap_start = os.path.getsize(os.path.join(self.path, NAME_HEAP_FILE))
+        offsets = heap_start + np.cumsum([len(name) for name in encoded], dtype=np.uint64)
+        blobs = {name + COLUMN_SUFFIX: values.tobytes() for name, values in columns.items()}
+        blobs[NAME_HEAP_FILE] = b"".join(encoded)
+        blobs[NAME_OFFSETS_FILE] = offsets.astype(NAME_OFFSET_DTYPE).tobytes()
+        self._append_files(blobs, "rows", rows)
+
+    def append_decisions(self, outputs: dict):
+        """Decision columns for the next unscored rows, e.g. the outputs of score_shared."""
+        rows = len(outputs["status"])
+        if self.header["decision_rows"] + rows > len(self):
+            raise ValueError("There are more decisions than applications.")
+        self.flush()
+        columns = self._checked_columns(outputs, DECISION_DTYPES, rows)
+        self._discard_uncommitted()
+        self._append_files({name + COLUMN_SUFFIX: values.tobytes() for name, values in columns.items()},
+                           "decision_rows", rows)
+
+    def clear_decisions(self):
+        """Drop the stored decisions, before scoring the dataset again."""
+        self.header["decision_rows"] = 0
+        _write_header(self.path, self.header)
+        self._truncate()
+
+    def flush(self):
+        if self._names:
+            # a buffer that cannot be written is dropped, so close() does not fail on it again
+            buffer, names = self._buffer, self._names
+            self._buffer = {name: [] for name in APPLICATION_DTYPES}
+            self._names = []
+            self._write_rows(buffer, names)
+        elif not os.path.exists(os.path.join(self.path, HEADER_FILE)):
+            _write_header(self.path, self.header)
+
+    def close(self):
+        self.flush()
+
+
+# ------------------------------------------ Scoring -------------------------------------------------------------------
+
+def score_dataset(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, scorecard=None, **thresholds) -> dict:
+    """
+    Score every row of the dataset at path chunk by chunk, straight from the mapped
+    columns, and store the decisions in place of any earlier ones. Returns the
+    number of rows accepted and rejected.
+    """
+    dataset = ColumnarDataset(path)
+    counts = {status.name: 0 for status in (BorrowStatus.ACCEPTED, BorrowStatus.REJECTED)}
+    with ColumnarWriter(path) as writer:
+        writer.clear_decisions()
+        for start in range(0, len(dataset), chunk_size):
+            scores = score_columns(**dataset.columns(start, start + chunk_size), scorecard=scorecard, **thresholds)
+            writer.append_decisions({name: getattr(scores, name) for name in DECISION_DTYPES})
+            accepted = int(np.count_nonzero(scores.status == BorrowStatus.ACCEPTED.value))
+            counts[BorrowStatus.ACCEPTED.name] += accepted
+            counts[BorrowStatus.REJECTED.name] += len(scores) - accepted
+    return counts
+
+
+# ------------------------------------------ Converters ----------------------------------------------------------------
+
+def import_records(records, path: str, buffer_rows: int = DEFAULT_BUFFER_ROWS) -> tuple:
+    """
+    Append credit_batch input records to the dataset at path. Records that fail
+    credit_batch's validation are skipped. Returns (rows written, [(row, error)]).
+    """
+    from credit_batch import build_credit_analysis, InvalidRecordError
+
+    errors = []
+    written = 0
+    with ColumnarWriter(path, buffer_rows) as writer:
+        for row, record in enumerate(records, 1):
+            try:
+                analysis = build_credit_analysis(record)
+            except InvalidRecordError as error:
+                errors.append((row, str(error)))
+                continue
+            writer.append_analysis(analysis)
+            written += 1
+    return written, errors
+
+
+def export_records(path: str, stream, output_format: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Write the dataset at path as credit_batch input records, followed by the decision
+    columns when it has been scored. Returns the number of rows written.
+    """
+    import csv
+    from credit_batch import INPUT_FIELDS
+
+    dataset = ColumnarDataset(path)
+    decision_fields = list(DECISION_DTYPES) if dataset.scored else []
+    if output_format == "csv":
+        writer = csv.DictWriter(stream, fieldnames=list(INPUT_FIELDS) + decision_fields)
+        writer.writeheader()
+        write = writer.writerow
+    elif output_format == "jsonl":
+        def write(record):
+            stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+    else:
+        raise ValueError(f"Unsupported output format '{output_format}'.")
+    for start in range(0, len(dataset), chunk_size):
+        stop = min(start + chunk_size, len(dataset))
+        decisions = {name: dataset.decisions[name][start:stop].tolist() for name in decision_fields}
+        for index, record in enumerate(dataset.records(start, stop)):
+            for name, values in decisions.items():
+                record[name] = BorrowStatus(values[index]).name if name == "status" else values[index]
+            write(record)
+    return len(dataset)
+
+
+def main(argv=None):
+    import argparse
+    import sys
+    from credit_batch import detect_format, read_records
+    from credit_sweep import DEFAULT_THRESHOLDS
+
+    parser = argparse.ArgumentParser(description="Memory-mapped columnar application datasets.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="append a CSV or JSONL file to a dataset")
+    import_parser.add_argument("input", help="applications file (CSV or JSONL)")
+    import_parser.add_argument("dataset", help="dataset directory, created when missing")
+    import_parser.add_argument("--input-format", choices=("csv", "jsonl"), help="defaults to the file extension")
+    import_parser.add_argument("--buffer-rows", type=int, default=DEFAULT_BUFFER_ROWS)
+    score_parser = commands.add_parser("score", help="score a dataset and store the decisions in it")
+    score_parser.add_argument("dataset")
+    score_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    for name, default in DEFAULT_THRESHOLDS.items():
+        score_parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    export_parser = commands.add_parser("export", help="write a dataset out as CSV or JSONL")
+    export_parser.add_argument("dataset")
+    export_parser.add_argument("output", help="CSV or JSONL file")
+    export_parser.add_argument("--output-format", choices=("csv", "jsonl"), help="defaults to the file extension")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        with open(args.input, newline="", encoding="utf-8") as stream:
+            written, errors = import_records(read_records(stream, args.input_format or detect_format(args.input)),
+                                             args.dataset, args.buffer_rows)
+        for row, error in errors:
+            print(f"row {row}: {error}", file=sys.stderr)
+        print(f"{written} applications appended, {len(errors)} invalid")
+        return written, errors
+    if args.command == "score":
+        counts = score_dataset(args.dataset, args.chunk_size,
+                               **{name: getattr(args, name) for name in DEFAULT_THRESHOLDS})
+        print(", ".join(f"{count} {status.lower()}" for status, count in counts.items()))
+        return counts
+    with open(args.output, "w", newline="", encoding="utf-8") as stream:
+        rows = export_records(args.dataset, stream, args.output_format or detect_format(args.output))
+    print(f"{rows} applications exported")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,564 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_config.py
+Description: Declarative scorecard files compiled to closures, with hot reload.
+
+A scorecard file (JSON, or TOML for a .toml suffix) holds the section and total
+thresholds, the categorical points, the ratio bands and the reject rules. Any
+top-level table that is left out keeps the value of DEFAULT_SCORECARD and the
+BorrowerCreditAnalysis defaults, so a file only needs to say what it changes.
+
+compile_config() validates the file once and builds a CompiledScorecard. Its
+section functions are closures over the lookup tables: the borrower and collateral
+sections index the Scorecard section cubes, the financial and facility sections
+bisect the band edges and index a table of (score, reasons) per band pair, and the
+reasons of disabled reject rules are masked out of every table up front. Scoring
+never looks at the configuration again.
+
+ScorecardReloader keeps the compiled scorecard of a file in `current` and replaces
+it with a single assignment when the file changes. A batch reads `current` once and
+is scored with that version to the end, so a reload never waits for in-flight
+scoring and never mixes two versions in one batch. A file that fails to load is
+reported in last_error and the previous version stays in service.
+
+Usage:
+    compiled = load_scorecard("scorecard.toml")
+    decision = compiled.evaluate(borrower, financial_details, collateral_detail, facility_details)
+
+    reloader = ScorecardReloader("scorecard.toml").start(interval=1.0)
+    decisions = reloader.score_batch(records)
+
+    python credit_config.py default scorecard.json
+    python credit_config.py check scorecard.toml
+    python credit_service.py --scorecard scorecard.toml --reload-interval 1
+
+Format (JSON shown; TOML uses the same tables):
+    {"version": "2024-06",
+     "thresholds": {"min_borrow_info_score": 15, "min_financial_details_score": 7, "min_collateral_score": 5,
+                    "min_facility_score": 4, "min_total_credit_score": 20},
+     "points": {"entity_type": {"SOLE_PROPRIETORSHIP": 3, ...}, "bank_status": {...},
+                "guarantors": [1, 5, 4, 3, 2, 1], "borrowing_history": {"A": 1, "B": 2, "C": 3},
+                "type_of_property": {...}, "location_of_the_property": {...}, "type_of_facility_applying": {...}},
+     "bands": {"debt_to_sales": {"base_points": 1, "edges": [{"edge": 40, "points": 3}, ...,
+                                                            {"edge": 70, "points": 0, "strict": true}]},
+               "debt_to_income": {...}, "loan_to_valuation": {...}},
+     "reject_rules": {"borrowing_history": true, "guarantor_age": {"min": 21, "max": 65}, "no_guarantors": true,
+                      "under_construction": true, "debt_to_sales": true, "debt_to_income": true,
+                      "loan_to_valuation": true}}
+"""
+
+import json
+import os
+import threading
+from bisect import bisect_right
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    BandTable, BorrowStatus, ClientBankStatus, CreditDecision, EntityType, LocationProperty, RejectionReason,
+    Scorecard, SectionResult, TypeFacilityApplying, TypeProperty, DEFAULT_SCORECARD, NO_REJECTION,
+)
+from credit_batch import (
+    InvalidRecordError, build_borrower, build_collateral_details, build_facility_details, build_financial_details,
+    decision_record, invalid_decision_record,
+)
+
+DEFAULT_THRESHOLDS = {
+    "min_borrow_info_score": 15,
+    "min_financial_details_score": 7,
+    "min_collateral_score": 5,
+    "min_facility_score": 4,
+    "min_total_credit_score": 20,
+}
+
+# guarantor ages outside this range are rejected by the guarantor_age rule
+DEFAULT_GUARANTOR_AGE = {"min": 21, "max": 65}
+
+# reject rule -> the reason it sets; a disabled rule never sets its reason
+REJECT_RULES = {
+    "borrowing_history": RejectionReason.BORROWING_HISTORY,
+    "guarantor_age": RejectionReason.GUARANTOR_AGE,
+    "no_guarantors": RejectionReason.NO_GUARANTORS,
+    "under_construction": RejectionReason.UNDER_CONSTRUCTION,
+    "debt_to_sales": RejectionReason.DEBT_TO_SALES,
+    "debt_to_income": RejectionReason.DEBT_TO_INCOME,
+    "loan_to_valuation": RejectionReason.LOAN_TO_VALUATION,
+}
+
+# points table -> (enum, Scorecard keyword)
+ENUM_POINTS = {
+    "entity_type": (EntityType, "entity_type_points"),
+    "bank_status": (ClientBankStatus, "bank_status_points"),
+    "type_of_property": (TypeProperty, "property_type_points"),
+    "location_of_the_property": (LocationProperty, "property_location_points"),
+    "type_of_facility_applying": (TypeFacilityApplying, "facility_type_points"),
+}
+
+# ratio -> Scorecard keyword
+RATIO_BANDS = {
+    "debt_to_sales": "debt_to_sales_bands",
+    "debt_to_income": "debt_to_income_bands",
+    "loan_to_valuation": "loan_to_valuation_bands",
+}
+
+CONFIG_SECTIONS = ("version", "thresholds", "points", "bands", "reject_rules")
+POINTS_TABLES = tuple(ENUM_POINTS) + ("guarantors", "borrowing_history")
+DEFAULT_RELOAD_INTERVAL = 1.0
+
+
+class ScorecardConfigError(ValueError):
+    """Raised when a scorecard file cannot be read or does not describe a valid scorecard."""
+    pass
+
+
+# ------------------------------------------ Reading -------------------------------------------------------------------
+
+def read_config(path: str) -> dict:
+    """The raw configuration of a .json or .toml scorecard file."""
+    try:
+        if path.lower().endswith(".toml"):
+            import tomllib
+            with open(path, "rb") as stream:
+                config = tomllib.load(stream)
+        else:
+            with open(path, encoding="utf-8") as stream:
+                config = json.load(stream)
+    except OSError as error:
+        raise ScorecardConfigError(f"Cannot read scorecard '{path}': {error}") from error
+    except ValueError as error:
+        # json.JSONDecodeError and tomllib.TOMLDecodeError are both ValueErrors
+        raise ScorecardConfigError(f"Cannot parse scorecard '{path}': {error}") from error
+    if not isinstance(config, dict):
+        raise ScorecardConfigError(f"Scorecard '{path}' must hold a table at the top level.")
+    return config
+
+
+def config_from_scorecard(scorecard: Scorecard = DEFAULT_SCORECARD, thresholds: dict = None,
+                          version: str = "default") -> dict:
+    """The configuration that compiles back to scorecard, with every rule enabled."""
+    points = {name: {member.name: getattr(scorecard, keyword)[member] for member in enum_class}
+              for name, (enum_class, keyword) in ENUM_POINTS.items()}
+    points["guarantors"] = list(scorecard.guarantor_points)
+    points["borrowing_history"] = dict(scorecard.grade_points)
+    bands = {}
+    for name, keyword in RATIO_BANDS.items():
+        table = getattr(scorecard, keyword)
+        bands[name] = {"base_points": table.base_points,
+                       "edges": [{"edge": edge, "points": band_points, "strict": strict}
+                                 for edge, band_points, strict in table.bands]}
+    reject_rules = {name: True for name in REJECT_RULES}
+    reject_rules["guarantor_age"] = dict(DEFAULT_GUARANTOR_AGE)
+    return {"version": version, "thresholds": dict(thresholds or DEFAULT_THRESHOLDS), "points": points,
+            "bands": bands, "reject_rules": reject_rules}
+
+
+# ------------------------------------------ Validation ----------------------------------------------------------------
+
+def _table(config: dict, name: str) -> dict:
+    value = config.get(name, {})
+    if not isinstance(value, dict):
+        raise ScorecardConfigError(f"'{name}' must be a table.")
+    return value
+
+
+def _check_keys(table: dict, allowed, where: str):
+    unknown = sorted(set(table) - set(allowed))
+    if unknown:
+        raise ScorecardConfigError(f"Unknown {where} {', '.join(map(repr, unknown))}; expected {', '.join(allowed)}.")
+
+
+def _integer(value, where: str) -> int:
+    # bool is an int subclass, but true/false are never meant as points
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ScorecardConfigError(f"{where} must be an integer, not {value!r}.")
+    return value
+
+
+def _number(value, where: str):
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        raise ScorecardConfigError(f"{where} must be a number, not {value!r}.")
+    return value
+
+
+def _enum_points(table, enum_class, where: str) -> dict:
+    if not isinstance(table, dict):
+        raise ScorecardConfigError(f"{where} must be a table of {enum_class.__name__} names.")
+    names = [member.name for member in enum_class]
+    _check_keys(table, names, f"{where} keys")
+    missing = [name for name in names if name not in table]
+    if missing:
+        raise ScorecardConfigError(f"{where} has no points for {', '.join(missing)}.")
+    return {enum_class[name]: _integer(table[name], f"{where}.{name}") for name in names}
+
+
+def _guarantor_points(points, where: str) -> tuple:
+    if not isinstance(points, list) or not points:
+        raise ScorecardConfigError(f"{where} must be a non-empty list of points by number of guarantors.")
+    return tuple(_integer(value, f"{where}[{index}]") for index, value in enumerate(points))
+
+
+def _grade_points(table, where: str) -> dict:
+    if not isinstance(table, dict):
+        raise ScorecardConfigError(f"{where} must be a table of grades.")
+    grade_points = {}
+    for grade, points in table.items():
+        if not grade.isalpha() or grade != grade.upper():
+            raise ScorecardConfigError(f"{where} grade {grade!r} must be upper-case letters.")
+        grade_points[grade] = _integer(points, f"{where}.{grade}")
+    return grade_points
+
+
+def _band_table(table, where: str) -> BandTable:
+    if not isinstance(table, dict):
+        raise ScorecardConfigError(f"{where} must be a table with base_points and edges.")
+    _check_keys(table, ("base_points", "edges"), f"{where} keys")
+    edges = table.get("edges", [])
+    if not isinstance(edges, list):
+        raise ScorecardConfigError(f"{where}.edges must be a list.")
+    bands = []
+    for index, band in enumerate(edges):
+        band_where = f"{where}.edges[{index}]"
+        if not isinstance(band, dict) or "edge" not in band or "points" not in band:
+            raise ScorecardConfigError(f"{band_where} must have an edge and points.")
+        _check_keys(band, ("edge", "points", "strict"), f"{band_where} keys")
+        strict = band.get("strict", False)
+        if not isinstance(strict, bool):
+            raise ScorecardConfigError(f"{band_where}.strict must be true or false.")
+        bands.append((_number(band["edge"], f"{band_where}.edge"), _integer(band["points"], f"{band_where}.points"),
+                      strict))
+    try:
+        return BandTable(_integer(table.get("base_points", 0), f"{where}.base_points"), bands)
+    except ValueError as error:
+        raise ScorecardConfigError(f"{where}: {error}") from error
+
+
+def _reject_rules(table: dict) -> tuple:
+    """(enabled rule names, guarantor age (min, max) or None)."""
+    _check_keys(table, REJECT_RULES, "reject rules")
+    enabled = set()
+    guarantor_age = None
+    for name in REJECT_RULES:
+        rule = table.get(name, DEFAULT_GUARANTOR_AGE if name == "guarantor_age" else True)
+        if name == "guarantor_age" and rule is True:
+            rule = DEFAULT_GUARANTOR_AGE
+        if name == "guarantor_age" and isinstance(rule, dict):
+            _check_keys(rule, ("min", "max"), "reject_rules.guarantor_age keys")
+            guarantor_age = (_integer(rule.get("min", DEFAULT_GUARANTOR_AGE["min"]), "reject_rules.guarantor_age.min"),
+                             _integer(rule.get("max", DEFAULT_GUARANTOR_AGE["max"]), "reject_rules.guarantor_age.max"))
+            if guarantor_age[0] > guarantor_age[1]:
+                raise ScorecardConfigError("reject_rules.guarantor_age.min must not be above max.")
+            rule = True
+        if not isinstance(rule, bool):
+            raise ScorecardConfigError(f"reject_rules.{name} must be true or false.")
+        if rule:
+            enabled.add(name)
+    return enabled, guarantor_age
+
+
+def _thresholds(table: dict) -> dict:
+    _check_keys(table, DEFAULT_THRESHOLDS, "thresholds")
+    return {name: _integer(table.get(name, default), f"thresholds.{name}")
+            for name, default in DEFAULT_THRESHOLDS.items()}
+
+
+def build_scorecard(config: dict) -> Scorecard:
+    """The Scorecard of the points and bands of config; missing tables come from DEFAULT_SCORECARD."""
+    defaults = config_from_scorecard(DEFAULT_SCORECARD)
+    points = _table(config, "points")
+    _check_keys(points, POINTS_TABLES, "points tables")
+    bands = _table(config, "bands")
+    _check_keys(bands, RATIO_BANDS, "bands")
+    keywords = {}
+    for name, (enum_class, keyword) in ENUM_POINTS.items():
+        keywords[keyword] = _enum_points(points.get(name, defaults["points"][name]), enum_class, f"points.{name}")
+    keywords["guarantor_points"] = _guarantor_points(points.get("guarantors", defaults["points"]["guarantors"]),
+                                                     "points.guarantors")
+    keywords["grade_points"] = _grade_points(points.get("borrowing_history", defaults["points"]["borrowing_history"]),
+                                             "points.borrowing_history")
+    for name, keyword in RATIO_BANDS.items():
+        keywords[keyword] = _band_table(bands.get(name, defaults["bands"][name]), f"bands.{name}")
+    return Scorecard(**keywords)
+
+
+# ------------------------------------------ Compiling -----------------------------------------------------------------
+
+def _masked_cube(cube, mask: int) -> tuple:
+    return tuple(SectionResult(result.score, result.reasons & mask) if result.reasons & ~mask else result
+                 for result in cube)
+
+
+def _pair_table(first_points, second_points, threshold: int, first_reason, second_reason, score_reason) -> tuple:
+    """
+    (score, reasons) of every pair of points, first_points major. A band worth 0 points
+    sets its reason, as in evaluate_financial_section and evaluate_facility_section;
+    NO_REJECTION stands for a disabled rule.
+    """
+    table = []
+    for first in first_points:
+        for second in second_points:
+            reasons = NO_REJECTION
+            if first == 0:
+                reasons |= first_reason
+            if second == 0:
+                reasons |= second_reason
+            if first + second >= threshold:
+                reasons |= score_reason
+            table.append((first + second, reasons))
+    return tuple(table)
+
+
+class CompiledScorecard:
+    """
+    A scorecard configuration turned into section functions. borrower_section,
+    financial_section, collateral_section and facility_section take the same details
+    objects as BorrowerCreditAnalysis and return the same SectionResult; evaluate
+    returns the CreditDecision of BorrowerCreditAnalysis.evaluate().
+
+    scorecard is the Scorecard of the points and bands. It scores like this object
+    only when every reject rule is enabled with the default guarantor ages
+    (default_rules), because the other scoring paths do not know about the rules.
+    """
+
+    def __init__(self, config: dict):
+        config = dict(config)
+        _check_keys(config, CONFIG_SECTIONS, "scorecard sections")
+        self.version = str(config.get("version", ""))
+        self.thresholds = _thresholds(_table(config, "thresholds"))
+        self.scorecard = build_scorecard(config)
+        enabled, guarantor_age = _reject_rules(_table(config, "reject_rules"))
+        self.enabled_rules = frozenset(enabled)
+        self.guarantor_age = guarantor_age
+        self.default_rules = (self.enabled_rules == set(REJECT_RULES) and
+                              guarantor_age == (DEFAULT_GUARANTOR_AGE["min"], DEFAULT_GUARANTOR_AGE["max"]))
+        self._compile()
+
+    def _compile(self):
+        scorecard = self.scorecard
+        thresholds = self.thresholds
+        disabled = NO_REJECTION
+        for name, reason in REJECT_RULES.items():
+            if name not in self.enabled_rules:
+                disabled |= reason
+        mask = ~disabled
+
+        # -- borrower: the cube cell of the categorical inputs, with the age bit of the configured range
+        borrower_cube = _masked_cube(scorecard.borrower_cube(thresholds["min_borrow_info_score"]), mask)
+        borrower_cell = scorecard.borrower_cell
+        min_age, max_age = self.guarantor_age or (0, 0)
+        check_age = self.guarantor_age is not None
+
+        if check_age:
+            def borrower_section(borrower) -> SectionResult:
+                age = borrower.age_of_guarantors
+                return borrower_cube[borrower_cell(borrower) & -2 | (age < min_age or age > max_age)]
+        else:
+            def borrower_section(borrower) -> SectionResult:
+                return borrower_cube[borrower_cell(borrower) & -2]
+
+        # -- financial: one bisect per ratio, then one lookup of the band pair
+        sales_edges = scorecard.debt_to_sales_bands.edges
+        income_edges = scorecard.debt_to_income_bands.edges
+        income_bands = len(scorecard.debt_to_income_bands.points)
+        financial_table = _pair_table(
+            scorecard.debt_to_sales_bands.points, scorecard.debt_to_income_bands.points,
+            thresholds["min_financial_details_score"], RejectionReason.DEBT_TO_SALES & mask,
+            RejectionReason.DEBT_TO_INCOME & mask, RejectionReason.FINANCIAL_SCORE)
+
+        def financial_section(financial_details) -> SectionResult:
+            debt = financial_details.current_total_debt
+            sales = financial_details.total_sales_per_year
+            income = financial_details.gross_income
+            # the same expressions as get_debt_to_sales_ratio and get_debt_to_income_ratio
+            debt_to_sales_ratio = float(debt / sales) * 100 if sales else 0.0
+            debt_to_income_ratio = float(debt / income) * 100 if income else 0.0
+            score, reasons = financial_table[bisect_right(sales_edges, debt_to_sales_ratio) * income_bands +
+                                             bisect_right(income_edges, debt_to_income_ratio)]
+            return SectionResult(score, reasons, debt_to_sales_ratio, debt_to_income_ratio)
+
+        # -- collateral: the cube cell, as in evaluate_collateral_section
+        collateral_cube = _masked_cube(scorecard.collateral_cube(thresholds["min_collateral_score"]), mask)
+        collateral_cell = scorecard.collateral_cell
+
+        def collateral_section(collateral_detail) -> SectionResult:
+            return collateral_cube[collateral_cell(collateral_detail)]
+
+        # -- facility: facility type points crossed with the loan-to-valuation bands
+        valuation_edges = scorecard.loan_to_valuation_bands.edges
+        valuation_bands = len(scorecard.loan_to_valuation_bands.points)
+        # facility type points are indexed by enum value and never reject on their own
+        facility_table = _pair_table(
+            scorecard.facility_type_table, scorecard.loan_to_valuation_bands.points,
+            thresholds["min_facility_score"], NO_REJECTION, RejectionReason.LOAN_TO_VALUATION & mask,
+            RejectionReason.FACILITY_SCORE)
+
+        def facility_section(facility_details, collateral_detail) -> SectionResult:
+            market_value = collateral_detail.current_market_value
+            loan_to_valuation_ratio = (float(facility_details.applied_loan_amount / market_value) * 100
+                                       if market_value else 0.0)
+            score, reasons = facility_table[facility_details.type_of_facility_applying._value_ * valuation_bands +
+                                            bisect_right(valuation_edges, loan_to_valuation_ratio)]
+            return SectionResult(score, reasons, loan_to_valuation_ratio=loan_to_valuation_ratio)
+
+        min_total_credit_score = thresholds["min_total_credit_score"]
+        total_score = RejectionReason.TOTAL_SCORE._value_
+        rejected, accepted = BorrowStatus.REJECTED, BorrowStatus.ACCEPTED
+        # every combination of reasons, so they are ORed as plain ints instead of through Flag.__or__
+        all_reasons = tuple(RejectionReason(value) for value in range(total_score << 1))
+
+        def evaluate(borrower, financial_details, collateral_detail, facility_details) -> CreditDecision:
+            borrower_result = borrower_section(borrower)
+            financial_result = financial_section(financial_details)
+            collateral_result = collateral_section(collateral_detail)
+            facility_result = facility_section(facility_details, collateral_detail)
+            total_credit_score = (borrower_result.score + financial_result.score + collateral_result.score +
+                                  facility_result.score)
+            reasons = (borrower_result.reasons._value_ | financial_result.reasons._value_ |
+                       collateral_result.reasons._value_ | facility_result.reasons._value_)
+            if total_credit_score >= min_total_credit_score:
+                reasons |= total_score
+            # final_status: any reason, the total one included, rejects
+            return CreditDecision(rejected if reasons else accepted, total_credit_score, borrower_result,
+                                  financial_result, collateral_result, facility_result, all_reasons[reasons])
+
+        self.borrower_section = borrower_section
+        self.financial_section = financial_section
+        self.collateral_section = collateral_section
+        self.facility_section = facility_section
+        self.evaluate = evaluate
+
+    def evaluate_analysis(self, analysis) -> CreditDecision:
+        """Score the details of a BorrowerCreditAnalysis with this scorecard instead of its own."""
+        return self.evaluate(analysis.borrower_information_details, analysis.borrower_financial_details,
+                             analysis.borrower_collateral_detail, analysis.borrower_facility_details)
+
+    def evaluate_record(self, record) -> CreditDecision:
+        """Score a credit_batch input record; raises InvalidRecordError like credit_batch.evaluate_record."""
+        collateral_detail = build_collateral_details(record)
+        return self.evaluate(build_borrower(record), build_financial_details(record), collateral_detail,
+                             build_facility_details(record, collateral_detail))
+
+    def score_records(self, records):
+        """Decision records in the credit_batch output layout."""
+        evaluate_record = self.evaluate_record
+        for row, record in enumerate(records, start=1):
+            try:
+                yield decision_record(evaluate_record(record), row, record["full_name"])
+            except InvalidRecordError as error:
+                yield invalid_decision_record(record, row, error)
+
+    def score_batch(self, records: list) -> list:
+        return list(self.score_records(records))
+
+
+def compile_config(config: dict) -> CompiledScorecard:
+    return CompiledScorecard(config)
+
+
+def load_scorecard(path: str) -> CompiledScorecard:
+    return CompiledScorecard(read_config(path))
+
+
+# ------------------------------------------ Hot reload ----------------------------------------------------------------
+
+class ScorecardReloader:
+    """
+    The compiled scorecard of a file, replaced when the file changes. Readers take
+    `current` once per unit of work; reloading compiles the new version before the
+    swap, so scoring never waits on it. The file is considered changed when its
+    modification time or size differs from the last load.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.reloads = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._signature = self._file_signature()
+        # the first load has no previous version to fall back on, so its error propagates
+        self.current = load_scorecard(path)
+
+    def _file_signature(self):
+        try:
+            status = os.stat(self.path)
+        except OSError:
+            return None
+        return status.st_mtime_ns, status.st_size
+
+    def reload(self) -> bool:
+        """Load the file again; return False and keep the current version when it is invalid."""
+        with self._lock:
+            signature = self._file_signature()
+            try:
+                compiled = load_scorecard(self.path)
+            except ScorecardConfigError as error:
+                self.last_error = error
+                self._signature = signature
+                return False
+            self._signature = signature
+            self.last_error = None
+            self.current = compiled
+            self.reloads += 1
+            return True
+
+    def reload_if_changed(self) -> bool:
+        if self._file_signature() == self._signature:
+            return False
+        return self.reload()
+
+    def score_batch(self, records: list) -> list:
+        return self.current.score_batch(records)
+
+    def start(self, interval: float = DEFAULT_RELOAD_INTERVAL) -> "ScorecardReloader":
+        """Check the file every interval seconds on a daemon thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, args=(interval,), name="scorecard-reloader",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self, interval: float):
+        while not self._stop.wait(interval):
+            self.reload_if_changed()
+
+
+# ------------------------------------------ Command line --------------------------------------------------------------
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write or check declarative scorecard files.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    default_parser = subparsers.add_parser("default", help="write the built-in scorecard as JSON")
+    default_parser.add_argument("output", nargs="?", help="JSON file to write (default: standard output)")
+    check_parser = subparsers.add_parser("check", help="validate and compile a .json or .toml scorecard")
+    check_parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "default":
+        text = json.dumps(config_from_scorecard(), indent=2) + "\n"
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as stream:
+                stream.write(text)
+        else:
+            print(text, end="")
+        return None
+    try:
+        compiled = load_scorecard(args.path)
+    except ScorecardConfigError as error:
+        parser.exit(1, f"{error}\n")
+    disabled = sorted(set(REJECT_RULES) - compiled.enabled_rules)
+    print(f"Scorecard '{compiled.version}' is valid. Thresholds: "
+          + ", ".join(f"{name}={value}" for name, value in compiled.thresholds.items())
+          + (f". Disabled rules: {', '.join(disabled)}" if disabled else ""))
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_max_loan.py
+Description: Largest applied loan amount that is still accepted, per facility type.
+
+Once the borrower, financial and collateral details are known, the loan amount
+only moves the loan-to-valuation ratio, and so only the LTV band points. For each
+facility type, the solver walks the LTV bands from the highest down and takes the
+first band whose points keep the facility section and the total below their
+thresholds. It then inverts the ratio at that band's upper edge. The result is
+exact for get_loan_to_valuation_ratio's floating point arithmetic: the amount
+found is accepted and one more is rejected. No amounts are tried.
+
+Usage:
+    max_approvable_loans(borrower, financial_details, collateral_detail)
+    # e.g. {TypeFacilityApplying.REVOLVING_CREDIT: 1986941, TypeFacilityApplying.TERM_LOAN: 2649255}
+    # for a 3,311,569 property; None when no amount is accepted
+
+    max_approvable_loan_columns(**columns)  # {TypeFacilityApplying: int64 array} for a portfolio
+
+    python credit_max_loan.py applications.csv offers.csv
+"""
+
+import math
+
+import numpy as np
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    Borrower, FinancialDetails, CollateralDetails, Scorecard, TypeFacilityApplying, DEFAULT_SCORECARD,
+    evaluate_borrower_section, evaluate_financial_section, evaluate_collateral_section, get_loan_to_valuation_ratio,
+)
+from credit_vectorized import get_loan_to_valuation_ratios, score_columns
+
+UNLIMITED = math.inf  # any amount is accepted: with no market value the LTV ratio is always 0
+NO_LOAN_COLUMN = -1
+UNLIMITED_COLUMN = np.iinfo(np.int64).max
+
+
+def ltv_bands(scorecard: Scorecard) -> list:
+    """(lower edge, upper edge, points) of every LTV band; a ratio r is in a band when lower <= r < upper."""
+    bands = scorecard.loan_to_valuation_bands
+    bounds = (-math.inf,) + bands.edges + (math.inf,)
+    return [(bounds[index], bounds[index + 1], points) for index, points in enumerate(bands.points)]
+
+
+def allowed_band_points(points: int, facility_type_points: int, other_sections_score, min_facility_score: int,
+                        min_total_credit_score: int):
+    """Whether an LTV band scoring points leaves the application accepted (elementwise for arrays)."""
+    facility_score = facility_type_points + points
+    return ((points != 0) & (facility_score < min_facility_score) &
+            (other_sections_score + facility_score < min_total_credit_score))
+
+
+# ------------------------------------------ Inverting the ratio -------------------------------------------------------
+
+def largest_amount_below(ratio: float, current_market_value: int) -> int:
+    """Largest integer amount whose get_loan_to_valuation_ratio is below ratio (market value > 0)."""
+    amount = math.floor(ratio * current_market_value / 100)
+    # the division above and the one in get_loan_to_valuation_ratio round differently by at most a step
+    while get_loan_to_valuation_ratio(amount, current_market_value) >= ratio:
+        amount -= 1
+    while get_loan_to_valuation_ratio(amount + 1, current_market_value) < ratio:
+        amount += 1
+    return amount
+
+
+def largest_amounts_below(ratio: float, current_market_value: np.ndarray) -> np.ndarray:
+    """largest_amount_below for a column of market values, all > 0."""
+    amount = np.floor(ratio * current_market_value.astype(np.float64) / 100).astype(np.int64)
+    while True:
+        too_large = get_loan_to_valuation_ratios(amount, current_market_value) >= ratio
+        if not too_large.any():
+            break
+        amount -= too_large
+    while True:
+        too_small = get_loan_to_valuation_ratios(amount + 1, current_market_value) < ratio
+        if not too_small.any():
+            break
+        amount += too_small
+    return amount
+
+
+# ------------------------------------------ One application -----------------------------------------------------------
+
+def max_approvable_loan(other_sections_score: int, current_market_value: int,
+                        type_of_facility_applying: TypeFacilityApplying, scorecard: Scorecard = None,
+                        min_facility_score: int = 4, min_total_credit_score: int = 20):
+    """
+    Largest accepted applied_loan_amount given the total of the other three section
+    scores, which must not reject. None when no amount is accepted, UNLIMITED when every one is.
+    """
+    scorecard = scorecard or DEFAULT_SCORECARD
+    facility_type_points = scorecard.facility_type_score(type_of_facility_applying)
+    bands = ltv_bands(scorecard)
+    if current_market_value == 0:
+        points = scorecard.loan_to_valuation_score(0.0)
+        allowed = allowed_band_points(points, facility_type_points, other_sections_score, min_facility_score,
+                                      min_total_credit_score)
+        return UNLIMITED if allowed else None
+    for lower, upper, points in reversed(bands):
+        if upper <= 0 or not allowed_band_points(points, facility_type_points, other_sections_score,
+                                                 min_facility_score, min_total_credit_score):
+            continue
+        if upper == math.inf:
+            return UNLIMITED
+        amount = largest_amount_below(upper, current_market_value)
+        if amount >= 0 and get_loan_to_valuation_ratio(amount, current_market_value) >= lower:
+            return amount
+    return None
+
+
+def max_approvable_loans(borrower: Borrower, financial_details: FinancialDetails,
+                         collateral_detail: CollateralDetails, scorecard: Scorecard = None,
+                         min_borrow_info_score: int = 15, min_financial_details_score: int = 7,
+                         min_collateral_score: int = 5, min_facility_score: int = 4,
+                         min_total_credit_score: int = 20) -> dict:
+    """{TypeFacilityApplying: max_approvable_loan} for an application without its facility details."""
+    scorecard = scorecard or DEFAULT_SCORECARD
+    sections = (evaluate_borrower_section(borrower, scorecard, min_borrow_info_score),
+                evaluate_financial_section(financial_details, scorecard, min_financial_details_score),
+                evaluate_collateral_section(collateral_detail, scorecard, min_collateral_score))
+    if any(section.rejected for section in sections):
+        return dict.fromkeys(TypeFacilityApplying)
+    other_sections_score = sum(section.score for section in sections)
+    return {facility_type: max_approvable_loan(other_sections_score, collateral_detail.current_market_value,
+                                               facility_type, scorecard, min_facility_score, min_total_credit_score)
+            for facility_type in TypeFacilityApplying}
+
+
+# ------------------------------------------ Portfolios ----------------------------------------------------------------
+
+def max_approvable_loan_columns(entity_type, bank_status, number_of_guarantors, age_of_guarantors, borrowing_history,
+                                current_total_debt, gross_income, total_sales_per_year,
+                                current_market_value, type_of_property, current_property_status,
+                                location_of_the_property, type_of_facility_applying=None, applied_loan_amount=None,
+                                min_borrow_info_score=15, min_financial_details_score=7, min_collateral_score=5,
+                                min_facility_score=4, min_total_credit_score=20, scorecard: Scorecard = None) -> dict:
+    """
+    max_approvable_loans over score_columns style columns; the facility columns are ignored.
+    Returns {TypeFacilityApplying: int64 array} with NO_LOAN_COLUMN and UNLIMITED_COLUMN
+    standing for None and UNLIMITED.
+    """
+    scorecard = scorecard or DEFAULT_SCORECARD
+    current_market_value = np.asarray(current_market_value, dtype=np.int64)
+    rows = len(current_market_value)
+    # the facility section does not affect the other three, so any facility will do here
+    scores = score_columns(entity_type, bank_status, number_of_guarantors, age_of_guarantors, borrowing_history,
+                           current_total_debt, gross_income, total_sales_per_year, current_market_value,
+                           type_of_property, current_property_status, location_of_the_property,
+                           np.full(rows, TypeFacilityApplying.TERM_LOAN.value), np.zeros(rows, dtype=np.int64),
+                           min_borrow_info_score, min_financial_details_score, min_collateral_score,
+                           min_facility_score, min_total_credit_score, scorecard)
+    eligible = ~(scores.borrower_rejected | scores.financial_rejected | scores.collateral_rejected)
+    other_sections_score = scores.borrower_score + scores.financial_score + scores.collateral_score
+    no_market_value = current_market_value == 0
+    market_value = np.where(no_market_value, 1, current_market_value)
+    zero_ratio_points = scorecard.loan_to_valuation_score(0.0)
+    bands = ltv_bands(scorecard)
+
+    loans = {}
+    for facility_type in TypeFacilityApplying:
+        facility_type_points = scorecard.facility_type_score(facility_type)
+        loan = np.full(rows, NO_LOAN_COLUMN, dtype=np.int64)
+        unsolved = eligible & ~no_market_value
+        for lower, upper, points in reversed(bands):
+            if upper <= 0:
+                continue
+            allowed = unsolved & allowed_band_points(points, facility_type_points, other_sections_score,
+                                                     min_facility_score, min_total_credit_score)
+            if not allowed.any():
+                continue
+            if upper == math.inf:
+                loan[allowed] = UNLIMITED_COLUMN
+                unsolved &= ~allowed
+                continue
+            amount = largest_amounts_below(upper, market_value[allowed])
+            in_band = (amount >= 0) & (get_loan_to_valuation_ratios(amount, market_value[allowed]) >= lower)
+            solved = np.flatnonzero(allowed)[in_band]
+            loan[solved] = amount[in_band]
+            unsolved[solved] = False
+        loan[eligible & no_market_value & allowed_band_points(
+            zero_ratio_points, facility_type_points, other_sections_score, min_facility_score,
+            min_total_credit_score)] = UNLIMITED_COLUMN
+        loans[facility_type] = loan
+    return loans
+
+
+def main(argv=None):
+    import argparse
+    import csv
+    from credit_batch import (
+        detect_format, read_records, build_borrower, build_financial_details, build_collateral_details,
+        InvalidRecordError,
+    )
+
+    parser = argparse.ArgumentParser(description="Largest accepted loan amount per facility type.")
+    parser.add_argument("input", help="applications file (CSV or JSONL); the facility fields are not needed")
+    parser.add_argument("output", help="CSV file with one line per application")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="defaults to the input file extension")
+    args = parser.parse_args(argv)
+
+    fieldnames = ["row", "full_name"] + [f"max_{facility_type.name.lower()}" for facility_type in TypeFacilityApplying]
+    fieldnames.append("error")
+    with open(args.input, newline="", encoding="utf-8") as input_stream, \
+            open(args.output, "w", newline="", encoding="utf-8") as output_stream:
+        writer = csv.DictWriter(output_stream, fieldnames=fieldnames)
+        writer.writeheader()
+        for row, record in enumerate(read_records(input_stream, args.input_format or detect_format(args.input)), 1):
+            line = {"row": row, "full_name": record.get("full_name")}
+            try:
+                loans = max_approvable_loans(build_borrower(record), build_financial_details(record),
+                                             build_collateral_details(record))
+            except InvalidRecordError as error:
+                line["error"] = str(error)
+            else:
+                for facility_type, loan in loans.items():
+                    line[f"max_{facility_type.name.lower()}"] = "" if loan is None else \
+                        "unlimited" if loan == UNLIMITED else loan
+            writer.writerow(line)
+
+
+if __name__ == "__main__":
+    main()
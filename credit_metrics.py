@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_metrics.py
+Description: Optional per-stage timing and counters for the scoring pipeline.
+
+enable_instrumentation() swaps the instrumented functions and methods for timed
+wrappers and disable_instrumentation() puts the originals back, so nothing is
+measured, and nothing costs extra, while it is off. Each stage records its call,
+reject and error counts, the cumulative time and the latencies of its most
+recent calls. Stages nest: get_financial_details_score includes the time of
+financial_section, which includes the ratio functions.
+
+Usage:
+    registry = enable_instrumentation()
+    ...  # score applications
+    disable_instrumentation()
+    print(registry.to_prometheus())
+
+    python credit_batch.py applications.csv decisions.csv --metrics metrics.prom
+"""
+
+import json
+import math
+import time
+from collections import deque
+from typing import NamedTuple
+
+LATENCY_SAMPLES = 10000
+EXPORTED_QUANTILES = (0.5, 0.9, 0.99)
+METRIC_PREFIX = "credit_stage"
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), math.ceil(fraction * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+class StageMetrics:
+    def __init__(self, name: str, samples: int = LATENCY_SAMPLES):
+        self.name = name
+        self.calls = 0
+        self.rejected = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.latencies = deque(maxlen=samples)
+
+    def record(self, seconds: float, rejected: bool = False):
+        self.calls += 1
+        self.total_seconds += seconds
+        self.latencies.append(seconds)
+        if rejected:
+            self.rejected += 1
+
+    def snapshot(self) -> dict:
+        latencies = sorted(self.latencies)
+        snapshot = {"calls": self.calls, "rejected": self.rejected, "errors": self.errors,
+                    "total_seconds": self.total_seconds,
+                    "mean_seconds": self.total_seconds / self.calls if self.calls else 0.0}
+        for quantile in EXPORTED_QUANTILES:
+            snapshot[f"p{quantile * 100:g}_seconds"] = percentile(latencies, quantile)
+        return snapshot
+
+
+class MetricsRegistry:
+    def __init__(self, samples: int = LATENCY_SAMPLES):
+        self.samples = samples
+        self.stages = {}
+
+    def stage(self, name: str) -> StageMetrics:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = StageMetrics(name, self.samples)
+        return stage
+
+    def reset(self):
+        self.stages.clear()
+
+    def snapshot(self) -> dict:
+        return {name: stage.snapshot() for name, stage in self.stages.items()}
+
+    def to_json(self) -> str:
+        return json.dumps({"stages": self.snapshot()}, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format: one summary and two counters per stage."""
+        name = METRIC_PREFIX
+        lines = [f"# HELP {name}_seconds Time spent in each scoring stage.",
+                 f"# TYPE {name}_seconds summary"]
+        for stage in self.stages.values():
+            latencies = sorted(stage.latencies)
+            for quantile in EXPORTED_QUANTILES:
+                lines.append(f'{name}_seconds{{stage="{stage.name}",quantile="{quantile:g}"}} '
+                             f'{percentile(latencies, quantile):.9g}')
+            lines.append(f'{name}_seconds_sum{{stage="{stage.name}"}} {stage.total_seconds:.9g}')
+            lines.append(f'{name}_seconds_count{{stage="{stage.name}"}} {stage.calls}')
+        for counter, help_text in (("rejected", "Calls whose result rejected the application."),
+                                   ("errors", "Calls that raised an exception.")):
+            lines.append(f"# HELP {name}_{counter}_total {help_text}")
+            lines.append(f"# TYPE {name}_{counter}_total counter")
+            for stage in self.stages.values():
+                lines.append(f'{name}_{counter}_total{{stage="{stage.name}"}} {getattr(stage, counter)}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Write the metrics to path, as JSON for a .json file and Prometheus text otherwise."""
+        with open(path, "w", encoding="utf-8") as stream:
+            stream.write(self.to_json() + "\n" if path.lower().endswith(".json") else self.to_prometheus())
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ------------------------------------------ Instrumentation -----------------------------------------------------------
+
+class InstrumentationPoint(NamedTuple):
+    owner: object  # module or class holding the function
+    attribute: str
+    stage: str
+    rejected: object = None  # rejected(args, result) -> bool, or None when the stage never rejects
+
+
+def _analysis_rejected(analysis) -> bool:
+    from MH6803_Required_Group_Project_code_Group1 import BorrowStatus
+    return analysis.borrower_analysis_status == BorrowStatus.REJECTED
+
+
+def _section_rejected(args, result) -> bool:
+    return result.rejected
+
+
+def default_points() -> list:
+    """The interactive steps, the section scores and the batch decoding stages."""
+    import MH6803_Required_Group_Project_code_Group1 as credit
+    import credit_batch
+
+    analysis = credit.BorrowerCreditAnalysis
+    return [
+        InstrumentationPoint(credit, "process_borrower_details", "process_borrower_details",
+                             lambda args, result: _analysis_rejected(result[1])),
+        InstrumentationPoint(credit, "process_financial_details", "process_financial_details",
+                             lambda args, result: _analysis_rejected(result[1])),
+        InstrumentationPoint(credit, "process_collateral_details", "process_collateral_details",
+                             lambda args, result: _analysis_rejected(result[1])),
+        InstrumentationPoint(credit, "process_facility_details", "process_facility_details",
+                             lambda args, result: _analysis_rejected(result)),
+        # borrower_analysis_status sticks once a section rejects, so each stage asks its own (cached) section
+        InstrumentationPoint(analysis, "get_borrower_information_details_score",
+                             "get_borrower_information_details_score",
+                             lambda args, result: args[0].borrower_section().rejected),
+        InstrumentationPoint(analysis, "get_financial_details_score", "get_financial_details_score",
+                             lambda args, result: args[0].financial_section().rejected),
+        InstrumentationPoint(analysis, "get_collateral_details_score", "get_collateral_details_score",
+                             lambda args, result: args[0].collateral_section().rejected),
+        InstrumentationPoint(analysis, "get_facility_details_score", "get_facility_details_score",
+                             lambda args, result: args[0].facility_section().rejected),
+        InstrumentationPoint(credit, "evaluate_borrower_section", "borrower_section", _section_rejected),
+        InstrumentationPoint(credit, "evaluate_financial_section", "financial_section", _section_rejected),
+        InstrumentationPoint(credit, "evaluate_collateral_section", "collateral_section", _section_rejected),
+        InstrumentationPoint(credit, "evaluate_facility_section", "facility_section", _section_rejected),
+        InstrumentationPoint(credit, "get_debt_to_sales_ratio", "ratios"),
+        InstrumentationPoint(credit, "get_debt_to_income_ratio", "ratios"),
+        InstrumentationPoint(credit, "get_loan_to_valuation_ratio", "ratios"),
+        InstrumentationPoint(credit, "format_currency", "format_currency"),
+        InstrumentationPoint(credit_batch, "build_borrower", "decode_borrower"),
+        InstrumentationPoint(credit_batch, "build_financial_details", "decode_financial"),
+        InstrumentationPoint(credit_batch, "build_collateral_details", "decode_collateral"),
+        InstrumentationPoint(credit_batch, "build_facility_details", "decode_facility"),
+        InstrumentationPoint(credit_batch, "score_record", "score_record",
+                             lambda args, result: result["status"] == "REJECTED"),
+    ]
+
+
+_originals = {}  # (owner, attribute) -> the function that was there before enable_instrumentation
+
+
+def _timed(function, stage: StageMetrics, rejected):
+    perf_counter = time.perf_counter
+
+    def timed(*args, **kwargs):
+        started = perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        except Exception:
+            stage.errors += 1
+            raise
+        stage.record(perf_counter() - started, rejected is not None and rejected(args, result))
+        return result
+
+    timed.__name__ = function.__name__
+    timed.__qualname__ = function.__qualname__
+    timed.__doc__ = function.__doc__
+    timed.__wrapped__ = function
+    return timed
+
+
+def instrumentation_enabled() -> bool:
+    return bool(_originals)
+
+
+def enable_instrumentation(registry: MetricsRegistry = REGISTRY, points=None) -> MetricsRegistry:
+    """Start timing every point (default_points() when None); calling it again while on changes nothing."""
+    for point in default_points() if points is None else points:
+        key = (point.owner, point.attribute)
+        if key in _originals:
+            continue
+        original = getattr(point.owner, point.attribute)
+        _originals[key] = original
+        setattr(point.owner, point.attribute, _timed(original, registry.stage(point.stage), point.rejected))
+    return registry
+
+
+def disable_instrumentation():
+    while _originals:
+        (owner, attribute), original = _originals.popitem()
+        setattr(owner, attribute, original)
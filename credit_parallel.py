@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_parallel.py
+Description: Multi-core scoring of application records with a process pool.
+
+Records are grouped into chunks, each chunk is scored in a worker process and the
+decisions are handed back in input order. Only a bounded number of chunks is in
+flight at any time, so the input can be arbitrarily large and the output starts
+streaming as soon as the first chunk is done.
+
+Usage:
+    python credit_batch.py applications.csv decisions.csv --workers 8 --chunk-size 2000
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from credit_batch import score_record
+
+DEFAULT_CHUNK_SIZE = 1000
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+
+def iter_chunks(records, chunk_size: int):
+    """Yield (first row number, list of records) for consecutive slices of records."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    records = iter(records)
+    first_row = 1
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield first_row, chunk
+        first_row += len(chunk)
+
+
+def score_chunk(first_row: int, records: list, staged: bool = False) -> list:
+    return [score_record(record, row, staged) for row, record in enumerate(records, start=first_row)]
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def score_records_parallel(records, workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                           chunks_in_flight: int = None, staged: bool = False):
+    """
+    Drop-in replacement for credit_batch.score_records that spreads the chunks over
+    a process pool. Decisions come out in the same order as the input records.
+    """
+    workers = workers or default_workers()
+    chunks_in_flight = chunks_in_flight or workers * CHUNKS_IN_FLIGHT_PER_WORKER
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for first_row, chunk in iter_chunks(records, chunk_size):
+            pending.append(executor.submit(score_chunk, first_row, chunk, staged))
+            if len(pending) >= chunks_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def parallel_scorer(workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE, staged: bool = False):
+    """Scorer for credit_batch.score_stream / run_batch."""
+
+    def scorer(records):
+        return score_records_parallel(records, workers, chunk_size, staged=staged)
+
+    return scorer
@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_records.py
+Description: Compact record types for large batches of applications.
+
+BorrowerRecord, FinancialRecord, CollateralRecord and FacilityRecord are frozen,
+__dict__-free versions of Borrower, FinancialDetails, CollateralDetails and
+FacilityDetails. They keep the same attribute names, so BorrowerCreditAnalysis can
+score them directly.
+
+ApplicationBatch stores a whole batch column by column in typed arrays: enums as
+one-byte codes, amounts as 8-byte integers, names in a single UTF-8 heap and
+borrowing histories as codes into a small table of distinct values.
+
+Usage:
+    python credit_records.py --records 100000   # bytes per record, before and after
+"""
+
+import argparse
+import gc
+import tracemalloc
+from array import array
+from typing import NamedTuple
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    Borrower, FinancialDetails, CollateralDetails, FacilityDetails, BorrowerCreditAnalysis,
+    EntityType, ClientBankStatus, TypeProperty, CurrentPropertyStatus, LocationProperty, TypeFacilityApplying,
+    get_debt_to_sales_ratio, get_debt_to_income_ratio, get_loan_to_valuation_ratio,
+)
+
+
+class BorrowerRecord(NamedTuple):
+    full_name: str
+    entity_type: EntityType
+    bank_status: ClientBankStatus
+    number_of_guarantors: int
+    age_of_guarantors: int
+    borrowing_history: str
+
+    @classmethod
+    def from_borrower(cls, borrower: Borrower) -> "BorrowerRecord":
+        return cls(borrower.full_name, borrower.entity_type, borrower.bank_status, borrower.number_of_guarantors,
+                   borrower.age_of_guarantors, borrower.borrowing_history)
+
+    def to_borrower(self) -> Borrower:
+        return Borrower(*self)
+
+
+class FinancialRecord(NamedTuple):
+    current_total_debt: int
+    gross_income: int
+    total_sales_per_year: int
+    debt_to_sales_ration: float
+    debt_to_income_ratio: float
+
+    @classmethod
+    def from_financial_details(cls, financial_details: FinancialDetails) -> "FinancialRecord":
+        return cls(financial_details.current_total_debt, financial_details.gross_income,
+                   financial_details.total_sales_per_year, financial_details.debt_to_sales_ration,
+                   financial_details.debt_to_income_ratio)
+
+    def to_financial_details(self) -> FinancialDetails:
+        return FinancialDetails(*self)
+
+
+class CollateralRecord(NamedTuple):
+    current_market_value: int
+    type_of_property: TypeProperty
+    current_property_status: CurrentPropertyStatus
+    location_of_the_property: LocationProperty
+
+    @classmethod
+    def from_collateral_details(cls, collateral_detail: CollateralDetails) -> "CollateralRecord":
+        return cls(collateral_detail.current_market_value, collateral_detail.type_of_property,
+                   collateral_detail.current_property_status, collateral_detail.location_of_the_property)
+
+    def to_collateral_details(self) -> CollateralDetails:
+        return CollateralDetails(*self)
+
+
+class FacilityRecord(NamedTuple):
+    type_of_facility_applying: TypeFacilityApplying
+    applied_loan_amount: int
+    loan_to_valuation: float
+
+    @classmethod
+    def from_facility_details(cls, facility_details: FacilityDetails) -> "FacilityRecord":
+        return cls(facility_details.type_of_facility_applying, facility_details.applied_loan_amount,
+                   facility_details.loan_to_valuation)
+
+    def to_facility_details(self) -> FacilityDetails:
+        return FacilityDetails(*self)
+
+
+class ApplicationRecord(NamedTuple):
+    """The four details of one application, as frozen records."""
+    borrower: BorrowerRecord
+    financial: FinancialRecord
+    collateral: CollateralRecord
+    facility: FacilityRecord
+
+    @classmethod
+    def from_analysis(cls, analysis: BorrowerCreditAnalysis) -> "ApplicationRecord":
+        return cls(BorrowerRecord.from_borrower(analysis.borrower_information_details),
+                   FinancialRecord.from_financial_details(analysis.borrower_financial_details),
+                   CollateralRecord.from_collateral_details(analysis.borrower_collateral_detail),
+                   FacilityRecord.from_facility_details(analysis.borrower_facility_details))
+
+    def to_analysis(self, **analysis_options) -> BorrowerCreditAnalysis:
+        """analysis_options are passed to BorrowerCreditAnalysis, e.g. min_total_credit_score."""
+        return BorrowerCreditAnalysis(self.borrower.to_borrower(), self.financial.to_financial_details(),
+                                      self.collateral.to_collateral_details(), self.facility.to_facility_details(),
+                                      **analysis_options)
+
+    def to_scoring_analysis(self, **analysis_options) -> BorrowerCreditAnalysis:
+        """Analysis that scores the frozen records themselves, without converting them back."""
+        return BorrowerCreditAnalysis(*self, **analysis_options)
+
+
+# ------------------------------------------ Struct of arrays ----------------------------------------------------------
+
+# column name -> enum class; stored as one-byte enum values
+ENUM_COLUMNS = {
+    "entity_type": EntityType,
+    "bank_status": ClientBankStatus,
+    "type_of_property": TypeProperty,
+    "current_property_status": CurrentPropertyStatus,
+    "location_of_the_property": LocationProperty,
+    "type_of_facility_applying": TypeFacilityApplying,
+}
+INTEGER_COLUMNS = ("number_of_guarantors", "age_of_guarantors", "current_total_debt", "gross_income",
+                   "total_sales_per_year", "current_market_value", "applied_loan_amount")
+RATIO_COLUMNS = ("debt_to_sales_ration", "debt_to_income_ratio", "loan_to_valuation")
+
+
+class ApplicationBatch:
+    """
+    Struct-of-arrays container for many applications. Row i can be read back as the
+    original classes (analysis(i)) or as frozen records (record(i)); columns() exposes
+    the numeric columns as NumPy arrays without copying them.
+    """
+
+    def __init__(self):
+        self.enum_codes = {name: array("b") for name in ENUM_COLUMNS}
+        self.integers = {name: array("q") for name in INTEGER_COLUMNS}
+        self.ratios = {name: array("d") for name in RATIO_COLUMNS}
+        self.name_heap = bytearray()
+        self.name_offsets = array("Q", [0])
+        self.history_codes = array("i")  # int32 codes, as in credit_shared and credit_columnar
+        self.history_values = []
+        self._history_index = {}
+
+    def __len__(self):
+        return len(self.history_codes)
+
+    def append(self, borrower, financial_details, collateral_detail, facility_details):
+        """Accepts the original classes or the frozen records."""
+        self.enum_codes["entity_type"].append(borrower.entity_type.value)
+        self.enum_codes["bank_status"].append(borrower.bank_status.value)
+        self.enum_codes["type_of_property"].append(collateral_detail.type_of_property.value)
+        self.enum_codes["current_property_status"].append(collateral_detail.current_property_status.value)
+        self.enum_codes["location_of_the_property"].append(collateral_detail.location_of_the_property.value)
+        self.enum_codes["type_of_facility_applying"].append(facility_details.type_of_facility_applying.value)
+
+        self.integers["number_of_guarantors"].append(borrower.number_of_guarantors)
+        self.integers["age_of_guarantors"].append(borrower.age_of_guarantors)
+        self.integers["current_total_debt"].append(financial_details.current_total_debt)
+        self.integers["gross_income"].append(financial_details.gross_income)
+        self.integers["total_sales_per_year"].append(financial_details.total_sales_per_year)
+        self.integers["current_market_value"].append(collateral_detail.current_market_value)
+        self.integers["applied_loan_amount"].append(facility_details.applied_loan_amount)
+
+        self.ratios["debt_to_sales_ration"].append(financial_details.debt_to_sales_ration)
+        self.ratios["debt_to_income_ratio"].append(financial_details.debt_to_income_ratio)
+        self.ratios["loan_to_valuation"].append(facility_details.loan_to_valuation)
+
+        self.name_heap += borrower.full_name.encode("utf-8")
+        self.name_offsets.append(len(self.name_heap))
+        history_code = self._history_index.get(borrower.borrowing_history)
+        if history_code is None:
+            history_code = self._history_index[borrower.borrowing_history] = len(self.history_values)
+            self.history_values.append(borrower.borrowing_history)
+        self.history_codes.append(history_code)
+
+    def append_analysis(self, analysis: BorrowerCreditAnalysis):
+        self.append(analysis.borrower_information_details, analysis.borrower_financial_details,
+                    analysis.borrower_collateral_detail, analysis.borrower_facility_details)
+
+    @classmethod
+    def from_analyses(cls, analyses) -> "ApplicationBatch":
+        batch = cls()
+        for analysis in analyses:
+            batch.append_analysis(analysis)
+        return batch
+
+    def full_name(self, index: int) -> str:
+        return self.name_heap[self.name_offsets[index]:self.name_offsets[index + 1]].decode("utf-8")
+
+    def record(self, index: int) -> ApplicationRecord:
+        enum_codes = self.enum_codes
+        integers = self.integers
+        ratios = self.ratios
+        return ApplicationRecord(
+            BorrowerRecord(self.full_name(index), EntityType(enum_codes["entity_type"][index]),
+                           ClientBankStatus(enum_codes["bank_status"][index]),
+                           integers["number_of_guarantors"][index], integers["age_of_guarantors"][index],
+                           self.history_values[self.history_codes[index]]),
+            FinancialRecord(integers["current_total_debt"][index], integers["gross_income"][index],
+                            integers["total_sales_per_year"][index], ratios["debt_to_sales_ration"][index],
+                            ratios["debt_to_income_ratio"][index]),
+            CollateralRecord(integers["current_market_value"][index],
+                             TypeProperty(enum_codes["type_of_property"][index]),
+                             CurrentPropertyStatus(enum_codes["current_property_status"][index]),
+                             LocationProperty(enum_codes["location_of_the_property"][index])),
+            FacilityRecord(TypeFacilityApplying(enum_codes["type_of_facility_applying"][index]),
+                           integers["applied_loan_amount"][index], ratios["loan_to_valuation"][index]))
+
+    def analysis(self, index: int, **analysis_options) -> BorrowerCreditAnalysis:
+        return self.record(index).to_analysis(**analysis_options)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.record(index)
+
+    @property
+    def nbytes(self) -> int:
+        columns = list(self.enum_codes.values()) + list(self.integers.values()) + list(self.ratios.values())
+        total = sum(column.itemsize * len(column) for column in columns)
+        total += len(self.name_heap) + self.name_offsets.itemsize * len(self.name_offsets)
+        total += self.history_codes.itemsize * len(self.history_codes)
+        return total
+
+    def columns(self) -> dict:
+        """Zero-copy NumPy views in the layout taken by credit_vectorized.score_columns."""
+        import numpy as np
+
+        columns = {name: np.frombuffer(codes, dtype=np.int8) for name, codes in self.enum_codes.items()}
+        for name in ("number_of_guarantors", "age_of_guarantors", "current_total_debt", "gross_income",
+                     "total_sales_per_year", "current_market_value", "applied_loan_amount"):
+            columns[name] = np.frombuffer(self.integers[name], dtype=np.int64)
+        history_values = np.array(self.history_values or [""], dtype=str)
+        columns["borrowing_history"] = history_values[np.frombuffer(self.history_codes, dtype=np.int32)]
+        return columns
+
+
+# ------------------------------------------ Memory measurement --------------------------------------------------------
+
+def _sample_analysis(index: int) -> BorrowerCreditAnalysis:
+    current_total_debt = 20000 + index % 50000
+    current_market_value = 200000 + index % 1000
+    applied_loan_amount = 100000 + index % 70000
+    return BorrowerCreditAnalysis(
+        Borrower(f"Borrower Number {index}", EntityType.COMPANY_LIMITED, ClientBankStatus.EXISTING_TO_A_BANK,
+                 1 + index % 4, 25 + index % 40, "ABC"[index % 3]),
+        FinancialDetails(current_total_debt, 100000, 150000, get_debt_to_sales_ratio(current_total_debt, 150000),
+                         get_debt_to_income_ratio(current_total_debt, 100000)),
+        CollateralDetails(current_market_value, TypeProperty.RESIDENTIAL_LANDED, CurrentPropertyStatus.COMPLETED,
+                          LocationProperty.URBAN),
+        FacilityDetails(TypeFacilityApplying.TERM_LOAN, applied_loan_amount,
+                        get_loan_to_valuation_ratio(applied_loan_amount, current_market_value)))
+
+
+def _allocated_bytes(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def measure_bytes_per_record(count: int) -> dict:
+    """
+    Bytes per application held in memory by each representation. Every variant owns
+    its own copy of the names and amounts, so the numbers are comparable.
+    """
+    analyses = [_sample_analysis(index) for index in range(count)]
+    return {
+        "BorrowerCreditAnalysis objects": _allocated_bytes(
+            lambda: [_sample_analysis(index) for index in range(count)]) / count,
+        "ApplicationRecord tuples": _allocated_bytes(
+            lambda: [ApplicationRecord.from_analysis(_sample_analysis(index)) for index in range(count)]) / count,
+        "ApplicationBatch arrays": _allocated_bytes(lambda: ApplicationBatch.from_analyses(analyses)) / count,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure memory per application for each record layout.")
+    parser.add_argument("--records", type=int, default=100000)
+    args = parser.parse_args(argv)
+    for layout, bytes_per_record in measure_bytes_per_record(args.records).items():
+        print(f"{layout:<32}{bytes_per_record:>10,.0f} bytes/record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_report.py
+Description: Bulk rendering of credit analysis reports as text, CSV or HTML.
+
+display_credit_analysis_result prints a report one line at a time and formats
+every amount with locale.currency, which looks the locale conventions up again on
+each call. ReportRenderer reads the conventions once into a CurrencyFormatter,
+builds the section header lines once per title, and renders many analyses into
+one buffered stream. The text layout is the same as
+display_credit_analysis_result. CSV gives one line per analysis, and HTML gives
+one table per analysis. With workers > 1, chunks of analyses are rendered on a
+thread pool and written out in input order.
+
+Usage:
+    with open("reports.txt", "w", encoding="utf-8") as stream:
+        render_reports(analyses, stream, "text")         # or "csv", "html"
+
+    renderer = ReportRenderer("html", currency=CurrencyFormatter(EN_US_CONVENTIONS))
+
+    python credit_report.py applications.csv reports.html --workers 4
+    python credit_report.py applications.csv reports.txt --compare   # against display_credit_analysis_result
+"""
+
+import csv
+import html
+import io
+
+from MH6803_Required_Group_Project_code_Group1 import BorrowerCreditAnalysis, REPORT_LOCALE
+
+REPORT_FORMATS = ("text", "csv", "html")
+DEFAULT_CHUNK_SIZE = 1000  # analyses rendered into one string before it is written
+WRITE_BUFFER_BYTES = 1 << 20
+FORMAT_BY_SUFFIX = {".txt": "text", ".csv": "csv", ".html": "html", ".htm": "html"}
+SECTION_WIDTH = 50
+LABEL_WIDTH = 30
+
+# the monetary conventions of localeconv() for en_US, the REPORT_LOCALE
+EN_US_CONVENTIONS = {
+    "currency_symbol": "$", "mon_decimal_point": ".", "mon_thousands_sep": ",", "mon_grouping": [3, 3, 0],
+    "positive_sign": "", "negative_sign": "-", "frac_digits": 2, "p_cs_precedes": 1, "n_cs_precedes": 1,
+    "p_sep_by_space": 0, "n_sep_by_space": 0, "p_sign_posn": 1, "n_sign_posn": 1,
+}
+
+
+# ------------------------------------------ Currency ------------------------------------------------------------------
+
+def _grouping_sizes(grouping: list):
+    """Group sizes from the right, as the locale module reads mon_grouping: 0 repeats the last size."""
+    last = None
+    for size in grouping:
+        if size == 127 or size == 0 and last is None:  # CHAR_MAX: no further grouping
+            return
+        if size == 0:
+            while True:
+                yield last
+        yield size
+        last = size
+
+
+def _group_digits(digits: str, grouping: list, separator: str) -> str:
+    if not separator:
+        return digits
+    groups = []
+    for size in _grouping_sizes(grouping):
+        if len(digits) <= size:
+            break
+        groups.append(digits[-size:])
+        digits = digits[:-size]
+    groups.append(digits)
+    return separator.join(reversed(groups))
+
+
+class CurrencyFormatter:
+    """
+    locale.currency(amount, grouping=True) for one set of monetary conventions,
+    with the sign, symbol and separators worked out once instead of on every call.
+    """
+
+    def __init__(self, conventions: dict):
+        digits = conventions["frac_digits"]
+        if digits == 127:
+            raise ValueError("Currency formatting is not possible using the 'C' locale.")
+        self.digits = digits
+        self.decimal_point = conventions["mon_decimal_point"]
+        self.grouping = list(conventions["mon_grouping"])
+        self.separator = conventions["mon_thousands_sep"]
+        # plain thousands grouping can go through the format mini-language
+        self._fast = self.grouping in ([3, 0], [3, 3, 0]) and len(self.separator) == 1
+        # (text before, text after) the number, for positive and negative amounts
+        self.templates = tuple(self._template(conventions, sign).split("{}") for sign in ("p", "n"))
+
+    @staticmethod
+    def _template(conventions: dict, prefix: str) -> str:
+        """The layout of a positive ("p") or negative ("n") amount, with {} for the number."""
+        amount = "<{}>"
+        symbol = conventions["currency_symbol"]
+        space = " " if conventions[f"{prefix}_sep_by_space"] else ""
+        amount = symbol + space + amount if conventions[f"{prefix}_cs_precedes"] else amount + space + symbol
+        sign = conventions["positive_sign" if prefix == "p" else "negative_sign"]
+        position = conventions[f"{prefix}_sign_posn"]
+        if position == 0:
+            amount = "(" + amount + ")"
+        elif position == 2:
+            amount = amount + sign
+        elif position == 3:
+            amount = amount.replace("<", sign)
+        elif position == 4:
+            amount = amount.replace(">", sign)
+        else:
+            amount = sign + amount
+        return amount.replace("<", "").replace(">", "")
+
+    def _number(self, amount) -> str:
+        if self._fast:
+            number = f"{abs(amount):,.{self.digits}f}"
+            if self.separator != "," or self.decimal_point != ".":
+                number = number.translate({ord(","): self.separator, ord("."): self.decimal_point})
+            return number
+        whole, _, fraction = f"{abs(amount):.{self.digits}f}".partition(".")
+        number = _group_digits(whole, self.grouping, self.separator)
+        return number + self.decimal_point + fraction if fraction else number
+
+    def __call__(self, amount) -> str:
+        before, after = self.templates[amount < 0]
+        return before + self._number(amount) + after
+
+
+_currency_formatters = {}
+
+
+def currency_formatter(locale_name: str = REPORT_LOCALE) -> CurrencyFormatter:
+    """The CurrencyFormatter of a locale, read from localeconv() once per locale name."""
+    formatter = _currency_formatters.get(locale_name)
+    if formatter is None:
+        import locale
+        previous = locale.setlocale(locale.LC_MONETARY)
+        try:
+            locale.setlocale(locale.LC_MONETARY, locale_name)
+            formatter = _currency_formatters[locale_name] = CurrencyFormatter(locale.localeconv())
+        finally:
+            locale.setlocale(locale.LC_MONETARY, previous)
+    return formatter
+
+
+# ------------------------------------------ Rendering -----------------------------------------------------------------
+
+class ReportRenderer:
+    """
+    Renders analyses in one of REPORT_FORMATS. render() returns the reports of a list
+    of analyses as one string; write() renders and writes them chunk by chunk.
+    """
+
+    def __init__(self, report_format: str = "text", currency=None):
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported report format '{report_format}'.")
+        self.report_format = report_format
+        self.currency = currency or currency_formatter()
+        self._headers = {}
+        self._render = getattr(self, f"_render_{report_format}")
+
+    def _sections(self, analysis: BorrowerCreditAnalysis) -> list:
+        analysis.calculate_score_and_update_status()
+        return analysis.report_sections(self.currency)
+
+    def header(self, first_analysis: BorrowerCreditAnalysis = None) -> str:
+        """
+        What goes before the first report: the HTML document head, or the CSV header
+        line, whose labels are taken from first_analysis.
+        """
+        if self.report_format == "csv" and first_analysis is not None:
+            stream = io.StringIO()
+            csv.writer(stream).writerow([label for _, details in self._sections(first_analysis) for label in details])
+            return stream.getvalue()
+        if self.report_format == "html":
+            return ("<!DOCTYPE html>\n<html>\n<head><meta charset=\"utf-8\"><title>Credit analysis reports</title>"
+                    "</head>\n<body>\n")
+        return ""
+
+    def footer(self) -> str:
+        return "</body>\n</html>\n" if self.report_format == "html" else ""
+
+    def _section_header(self, section_title: str) -> str:
+        header = self._headers.get(section_title)
+        if header is None:
+            if self.report_format == "html":
+                header = f"<tr><th colspan=\"2\">{html.escape(section_title)}</th></tr>\n"
+            else:
+                header = "=" * SECTION_WIDTH + "\n" + f" {section_title} ".center(SECTION_WIDTH, "=") + "\n"
+            self._headers[section_title] = header
+        return header
+
+    def _render_text(self, analyses: list) -> str:
+        parts = []
+        footer = "-" * SECTION_WIDTH + "\n"
+        for analysis in analyses:
+            for section_title, details in self._sections(analysis):
+                parts.append(self._section_header(section_title))
+                parts.extend(f"{label:<{LABEL_WIDTH}}: {value}\n" for label, value in details.items())
+                parts.append(footer)
+        return "".join(parts)
+
+    def _render_csv(self, analyses: list) -> str:
+        stream = io.StringIO()
+        writer = csv.writer(stream)
+        for analysis in analyses:
+            row = []
+            for _, details in self._sections(analysis):
+                row.extend(details.values())
+            writer.writerow(row)
+        return stream.getvalue()
+
+    def _render_html(self, analyses: list) -> str:
+        parts = []
+        escape = html.escape
+        for analysis in analyses:
+            sections = self._sections(analysis)
+            parts.append("<table class=\"credit-analysis\">\n")
+            for section_title, details in sections:
+                parts.append(self._section_header(section_title))
+                parts.extend(f"<tr><td>{escape(label)}</td><td>{escape(str(value))}</td></tr>\n"
+                             for label, value in details.items())
+            parts.append("</table>\n")
+        return "".join(parts)
+
+    def render(self, analyses: list) -> str:
+        return self._render(analyses)
+
+    def write(self, analyses, stream, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 1) -> int:
+        """
+        Render every analysis and write them to stream, with the header and footer.
+        Returns the number of analyses rendered.
+        """
+        from itertools import chain
+        from credit_parallel import iter_chunks
+
+        chunks = (chunk for _, chunk in iter_chunks(analyses, chunk_size))
+        first_chunk = next(chunks, [])
+        stream.write(self.header(first_chunk[0] if first_chunk else None))
+        chunks = chain([first_chunk], chunks) if first_chunk else ()
+        count = 0
+        if workers == 1:
+            for chunk in chunks:
+                stream.write(self.render(chunk))
+                count += len(chunk)
+        else:
+            from collections import deque
+            from concurrent.futures import ThreadPoolExecutor
+
+            # only a few chunks are rendered ahead of the writer, so memory stays bounded
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append((len(chunk), executor.submit(self.render, chunk)))
+                    if len(pending) > 2 * workers:
+                        rendered, future = pending.popleft()
+                        stream.write(future.result())
+                        count += rendered
+                for rendered, future in pending:
+                    stream.write(future.result())
+                    count += rendered
+        stream.write(self.footer())
+        return count
+
+
+def render_reports(analyses, stream, report_format: str = "text", currency=None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   workers: int = 1) -> int:
+    return ReportRenderer(report_format, currency).write(analyses, stream, chunk_size, workers)
+
+
+def measure_throughput(analyses: list, report_format: str = "text", currency=None, workers: int = 1) -> float:
+    """Reports rendered per second into memory, so the disk does not count."""
+    import time
+
+    started = time.perf_counter()
+    render_reports(analyses, io.StringIO(), report_format, currency, workers=workers)
+    return len(analyses) / (time.perf_counter() - started)
+
+
+def measure_display_throughput(analyses: list) -> float:
+    """Reports per second of display_credit_analysis_result, with its output captured in memory."""
+    import contextlib
+    import time
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for analysis in analyses:
+            analysis.calculate_score_and_update_status()
+            analysis.display_credit_analysis_result()
+    return len(analyses) / (time.perf_counter() - started)
+
+
+def main(argv=None):
+    import argparse
+    import locale
+    import sys
+    import time
+    from credit_batch import detect_format, read_records, build_credit_analysis, InvalidRecordError
+
+    parser = argparse.ArgumentParser(description="Render credit analysis reports for a file of applications.")
+    parser.add_argument("input", help="applications file (CSV or JSONL)")
+    parser.add_argument("output", help="report file (.txt, .csv or .html)")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="defaults to the input file extension")
+    parser.add_argument("--format", choices=REPORT_FORMATS, help="defaults to the output file extension")
+    parser.add_argument("--workers", type=int, default=1, help="rendering threads (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="reports rendered per write")
+    parser.add_argument("--locale", default=REPORT_LOCALE, help=f"locale of the amounts (default: {REPORT_LOCALE})")
+    parser.add_argument("--compare", action="store_true",
+                        help="also time display_credit_analysis_result on the same applications")
+    args = parser.parse_args(argv)
+    report_format = args.format or next((report_format for suffix, report_format in FORMAT_BY_SUFFIX.items()
+                                         if args.output.lower().endswith(suffix)), None)
+    if report_format is None:
+        parser.error(f"Cannot tell the report format of '{args.output}'; pass --format.")
+    try:
+        currency = currency_formatter(args.locale)
+    except locale.Error:
+        parser.error(f"The locale '{args.locale}' is not installed; pass another one with --locale.")
+
+    with open(args.input, newline="", encoding="utf-8") as stream:
+        analyses = []
+        invalid = 0
+        for record in read_records(stream, args.input_format or detect_format(args.input)):
+            try:
+                analyses.append(build_credit_analysis(record))
+            except InvalidRecordError:
+                invalid += 1
+
+    started = time.perf_counter()
+    with open(args.output, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as stream:
+        count = render_reports(analyses, stream, report_format, currency, args.chunk_size, args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"{count} reports in {elapsed:.2f}s - {count / elapsed if elapsed else 0:,.0f} reports/s "
+          f"({invalid} invalid applications skipped)", file=sys.stderr)
+    if args.compare:
+        print(f"display_credit_analysis_result: {measure_display_throughput(analyses):,.0f} reports/s",
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
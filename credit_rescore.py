@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_rescore.py
+Description: Incremental rescoring of a scored portfolio after a scorecard or threshold change.
+
+A ScoredPortfolio keeps, next to every decision, the intermediate results it was
+made from: the three ratios, the points of every lookup and band, the section
+scores, the total and the rejection reasons. rescore() compares the old and the
+new scorecard table by table, finds the rows whose inputs fall on a changed
+entry, band interval or threshold window, and recomputes only those sections of
+only those rows. Ratio ranges are looked up in the ratios sorted once, so moving
+a band edge touches just the rows between the old and the new edge.
+
+Usage:
+    portfolio = ScoredPortfolio(columns_from_analyses(analyses))
+    report = portfolio.rescore(new_scorecard, min_total_credit_score=19)
+    report.touched, report.status_changed  # rows recomputed, rows whose status flipped
+
+    portfolio.save("portfolio.npz"); ScoredPortfolio.load("portfolio.npz")
+"""
+
+import json
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    BandTable, BorrowStatus, CurrentPropertyStatus, DEFAULT_SCORECARD, RejectionReason, Scorecard, SECTION_NAMES,
+)
+from credit_vectorized import (
+    REASON_FLAG_DTYPE, _reason_bits, compile_scorecard, encode_borrowing_history, get_band_scores,
+    get_debt_to_income_ratios, get_debt_to_sales_ratios, get_loan_to_valuation_ratios,
+)
+from credit_sweep import DEFAULT_THRESHOLDS
+
+SECTION_THRESHOLDS = {
+    "borrower": "min_borrow_info_score",
+    "financial": "min_financial_details_score",
+    "collateral": "min_collateral_score",
+    "facility": "min_facility_score",
+}
+SECTION_SCORE_REASONS = {
+    "borrower": RejectionReason.BORROWER_SCORE,
+    "financial": RejectionReason.FINANCIAL_SCORE,
+    "collateral": RejectionReason.COLLATERAL_SCORE,
+    "facility": RejectionReason.FACILITY_SCORE,
+}
+# section -> (point components summed into its score)
+SECTION_COMPONENTS = {
+    "borrower": ("entity_type_points", "bank_status_points", "guarantor_points", "grade_points"),
+    "financial": ("debt_to_sales_points", "debt_to_income_points"),
+    "collateral": ("property_type_points", "property_location_points"),
+    "facility": ("facility_type_points", "loan_to_valuation_points"),
+}
+# band -> (ratio column, points component, section, reason when the band scores 0)
+BANDS = {
+    "debt_to_sales_bands": ("debt_to_sales_ratio", "debt_to_sales_points", "financial",
+                            RejectionReason.DEBT_TO_SALES),
+    "debt_to_income_bands": ("debt_to_income_ratio", "debt_to_income_points", "financial",
+                             RejectionReason.DEBT_TO_INCOME),
+    "loan_to_valuation_bands": ("loan_to_valuation_ratio", "loan_to_valuation_points", "facility",
+                                RejectionReason.LOAN_TO_VALUATION),
+}
+# enum lookup table -> (input column, points component, section)
+TABLES = {
+    "entity_type_table": ("entity_type", "entity_type_points", "borrower"),
+    "bank_status_table": ("bank_status", "bank_status_points", "borrower"),
+    "property_type_table": ("type_of_property", "property_type_points", "collateral"),
+    "property_location_table": ("location_of_the_property", "property_location_points", "collateral"),
+    "facility_type_table": ("type_of_facility_applying", "facility_type_points", "facility"),
+}
+ALL_REASONS = sum(RejectionReason)
+ARRAYS = ("number_of_guarantors", "grade_index", "entity_type", "bank_status", "type_of_property",
+          "location_of_the_property", "type_of_facility_applying",
+          "debt_to_sales_ratio", "debt_to_income_ratio", "loan_to_valuation_ratio",
+          "entity_type_points", "bank_status_points", "guarantor_points", "grade_points",
+          "debt_to_sales_points", "debt_to_income_points", "property_type_points", "property_location_points",
+          "facility_type_points", "loan_to_valuation_points",
+          "borrower_score", "financial_score", "collateral_score", "facility_score", "total_credit_score",
+          "reason_flags", "status")
+
+
+class RescoreReport(NamedTuple):
+    rows: int
+    sections: tuple  # sections whose tables or threshold changed, plus "total"
+    touched_rows: np.ndarray
+    status_changed_rows: np.ndarray
+
+    @property
+    def touched(self) -> int:
+        return len(self.touched_rows)
+
+    @property
+    def status_changed(self) -> int:
+        return len(self.status_changed_rows)
+
+
+# ------------------------------------------ Change detection ----------------------------------------------------------
+
+def changed_ratio_ranges(old: BandTable, new: BandTable) -> list:
+    """[low, high) ratio ranges, merged, over which old and new score different points."""
+    bounds = [-math.inf] + sorted(set(old.edges) | set(new.edges)) + [math.inf]
+    ranges = []
+    for low, high in zip(bounds, bounds[1:]):
+        # every ratio in [low, high) falls in the same band of both tables
+        if low == -math.inf:
+            changed = old.points[0] != new.points[0]
+        else:
+            changed = old.score(low) != new.score(low)
+        if not changed:
+            continue
+        if ranges and ranges[-1][1] == low:
+            ranges[-1] = (ranges[-1][0], high)
+        else:
+            ranges.append((low, high))
+    return ranges
+
+
+def changed_table_entries(old: tuple, new: tuple) -> np.ndarray:
+    return np.array([value for value in range(max(len(old), len(new)))
+                     if old[value:value + 1] != new[value:value + 1]], dtype=np.int64)
+
+
+def threshold_window(scores: np.ndarray, old: int, new: int) -> np.ndarray:
+    """Rows whose score is at or above one threshold and below the other."""
+    if old == new:
+        return np.zeros(0, dtype=np.int64)
+    low, high = min(old, new), max(old, new)
+    return np.flatnonzero((scores >= low) & (scores < high))
+
+
+def _guarantor_table(scorecard: Scorecard, length: int) -> np.ndarray:
+    return np.array([scorecard.guarantor_score(guarantors) for guarantors in range(length)], dtype=np.int64)
+
+
+# ------------------------------------------ Portfolio -----------------------------------------------------------------
+
+class ScoredPortfolio:
+    """
+    Columns as taken by credit_vectorized.score_columns, scored with every intermediate result kept.
+    Each attribute named in ARRAYS is an array with one entry per row.
+    """
+
+    def __init__(self, columns: dict = None, scorecard: Scorecard = None, **thresholds):
+        self.scorecard = scorecard or DEFAULT_SCORECARD
+        self.thresholds = dict(DEFAULT_THRESHOLDS, **thresholds)
+        self._sorted_ratios = {}
+        if columns is not None:
+            self._score(columns)
+
+    def __len__(self):
+        return len(self.status)
+
+    def _score(self, columns: dict):
+        scorecard = self.scorecard
+        tables = compile_scorecard(scorecard)
+        for column in ("entity_type", "bank_status", "type_of_property", "location_of_the_property",
+                       "type_of_facility_applying", "number_of_guarantors"):
+            setattr(self, column, np.asarray(columns[column], dtype=np.int64))
+        age_of_guarantors = np.asarray(columns["age_of_guarantors"], dtype=np.int64)
+        self.grades, self.grade_index = np.unique(np.char.upper(np.asarray(columns["borrowing_history"], dtype=str)),
+                                                  return_inverse=True)
+        self.grade_index = self.grade_index.reshape(-1)
+        self.debt_to_sales_ratio = get_debt_to_sales_ratios(columns["current_total_debt"],
+                                                            columns["total_sales_per_year"])
+        self.debt_to_income_ratio = get_debt_to_income_ratios(columns["current_total_debt"], columns["gross_income"])
+        self.loan_to_valuation_ratio = get_loan_to_valuation_ratios(columns["applied_loan_amount"],
+                                                                    columns["current_market_value"])
+
+        self.entity_type_points = tables.entity_type_points[self.entity_type]
+        self.bank_status_points = tables.bank_status_points[self.bank_status]
+        self.guarantor_points = tables.guarantor_points[np.clip(self.number_of_guarantors, 0,
+                                                                scorecard.max_guarantor_index)]
+        self.grade_points, grade_invalid = encode_borrowing_history(columns["borrowing_history"], scorecard)
+        self.property_type_points = tables.property_type_points[self.type_of_property]
+        self.property_location_points = tables.property_location_points[self.location_of_the_property]
+        self.facility_type_points = tables.facility_type_points[self.type_of_facility_applying]
+        for band, (ratio, component, _, _) in BANDS.items():
+            setattr(self, component, get_band_scores(getattr(scorecard, band), getattr(self, ratio)))
+
+        # reasons no scorecard or threshold change can alter
+        self.reason_flags = (
+            _reason_bits(grade_invalid, RejectionReason.BORROWING_HISTORY) |
+            _reason_bits((age_of_guarantors < 21) | (age_of_guarantors > 65), RejectionReason.GUARANTOR_AGE) |
+            _reason_bits(self.number_of_guarantors < 1, RejectionReason.NO_GUARANTORS) |
+            _reason_bits(np.asarray(columns["current_property_status"]) ==
+                         CurrentPropertyStatus.UNDER_CONSTRUCTION.value, RejectionReason.UNDER_CONSTRUCTION))
+        all_rows = np.arange(len(self.reason_flags))
+        for section in SECTION_NAMES:
+            self._rescore_section(section, all_rows)
+        self._rescore_total(all_rows)
+
+    # ------------------------------------------ Recomputing rows ------------------------------------------------------
+
+    def _set_reasons(self, rows: np.ndarray, reasons: RejectionReason, bits: np.ndarray):
+        self.reason_flags[rows] = (self.reason_flags[rows] & REASON_FLAG_DTYPE(ALL_REASONS ^ int(reasons))) | bits
+
+    def _rescore_section(self, section: str, rows: np.ndarray):
+        components = SECTION_COMPONENTS[section]
+        scores = getattr(self, components[0])[rows].copy()
+        for component in components[1:]:
+            scores += getattr(self, component)[rows]
+        if len(rows) == len(self.reason_flags):
+            setattr(self, f"{section}_score", scores)
+        else:
+            getattr(self, f"{section}_score")[rows] = scores
+        reason = SECTION_SCORE_REASONS[section]
+        self._set_reasons(rows, reason, _reason_bits(scores >= self.thresholds[SECTION_THRESHOLDS[section]], reason))
+        for ratio, component, band_section, zero_reason in BANDS.values():
+            if band_section == section:
+                self._set_reasons(rows, zero_reason, _reason_bits(getattr(self, component)[rows] == 0, zero_reason))
+
+    def _rescore_total(self, rows: np.ndarray):
+        total = self.borrower_score[rows] + self.financial_score[rows] + self.collateral_score[rows] + \
+            self.facility_score[rows]
+        if len(rows) == len(self.reason_flags):
+            self.total_credit_score = total
+            self.status = np.empty(len(rows), dtype=np.int8)
+        else:
+            self.total_credit_score[rows] = total
+        self._set_reasons(rows, RejectionReason.TOTAL_SCORE,
+                          _reason_bits(total >= self.thresholds["min_total_credit_score"], RejectionReason.TOTAL_SCORE))
+        self.status[rows] = np.where(self.reason_flags[rows] != 0, BorrowStatus.REJECTED.value,
+                                     BorrowStatus.ACCEPTED.value)
+
+    def _rows_in_ratio_range(self, ratio: str, low: float, high: float) -> np.ndarray:
+        if ratio not in self._sorted_ratios:
+            order = np.argsort(getattr(self, ratio), kind="stable")
+            self._sorted_ratios[ratio] = (order, getattr(self, ratio)[order])
+        order, sorted_ratios = self._sorted_ratios[ratio]
+        start, stop = np.searchsorted(sorted_ratios, (low, high), side="left")
+        return order[start:stop]
+
+    # ------------------------------------------ Rescoring -------------------------------------------------------------
+
+    def rescore(self, scorecard: Scorecard = None, **thresholds) -> RescoreReport:
+        """
+        Switch to scorecard and/or new thresholds, recomputing only the sections of the
+        rows the change can affect. Returns which rows were touched and which flipped status.
+        """
+        unknown = set(thresholds) - set(DEFAULT_THRESHOLDS)
+        if unknown:
+            raise ValueError(f"Unknown thresholds: {', '.join(sorted(unknown))}.")
+        old, new = self.scorecard, scorecard or self.scorecard
+        old_thresholds, self.thresholds = self.thresholds, dict(self.thresholds, **thresholds)
+        self.scorecard = new
+        section_rows = {section: [] for section in SECTION_NAMES}
+
+        for table, (column, component, section) in TABLES.items():
+            changed = changed_table_entries(getattr(old, table), getattr(new, table))
+            if len(changed):
+                section_rows[section].append(self._update_points(
+                    np.flatnonzero(np.isin(getattr(self, column), changed)), component,
+                    np.array(getattr(new, table), dtype=np.int64)[getattr(self, column)]))
+        if old.guarantor_points != new.guarantor_points:
+            length = max(len(old.guarantor_points), len(new.guarantor_points))
+            changed = np.flatnonzero(_guarantor_table(old, length) != _guarantor_table(new, length))
+            guarantors = np.clip(self.number_of_guarantors, 0, length - 1)
+            section_rows["borrower"].append(self._update_points(
+                np.flatnonzero(np.isin(guarantors, changed)), "guarantor_points",
+                _guarantor_table(new, length)[guarantors]))
+        if old.grade_points != new.grade_points:
+            old_points = np.array([old.grade_history_score(grade) for grade in self.grades], dtype=np.int64)
+            new_points = np.array([new.grade_history_score(grade) for grade in self.grades], dtype=np.int64)
+            section_rows["borrower"].append(self._update_points(
+                np.flatnonzero(np.isin(self.grade_index, np.flatnonzero(old_points != new_points))), "grade_points",
+                new_points[self.grade_index]))
+        for band, (ratio, component, section, _) in BANDS.items():
+            for low, high in changed_ratio_ranges(getattr(old, band), getattr(new, band)):
+                rows = self._rows_in_ratio_range(ratio, low, high)
+                getattr(self, component)[rows] = get_band_scores(getattr(new, band), getattr(self, ratio)[rows])
+                section_rows[section].append(rows)
+
+        for section, threshold in SECTION_THRESHOLDS.items():
+            section_rows[section].append(threshold_window(getattr(self, f"{section}_score"),
+                                                          old_thresholds[threshold], self.thresholds[threshold]))
+        status_before = self.status.copy()
+        total_rows = [threshold_window(self.total_credit_score, old_thresholds["min_total_credit_score"],
+                                       self.thresholds["min_total_credit_score"])]
+        sections = []
+        for section, rows in section_rows.items():
+            rows = np.unique(np.concatenate(rows)) if rows else np.zeros(0, dtype=np.int64)
+            if len(rows):
+                self._rescore_section(section, rows)
+                total_rows.append(rows)
+                sections.append(section)
+        touched = np.unique(np.concatenate(total_rows))
+        if len(touched):
+            self._rescore_total(touched)
+        if len(total_rows[0]):
+            sections.append("total")
+        status_changed = touched[self.status[touched] != status_before[touched]]
+        return RescoreReport(len(self), tuple(sections), touched, status_changed)
+
+    def _update_points(self, rows: np.ndarray, component: str, new_points: np.ndarray) -> np.ndarray:
+        getattr(self, component)[rows] = new_points[rows]
+        return rows
+
+    # ------------------------------------------ Persistence -----------------------------------------------------------
+
+    def save(self, path: str):
+        from credit_cache import scorecard_fingerprint
+        np.savez(path, grades=self.grades, **{name: getattr(self, name) for name in ARRAYS},
+                 meta=np.array(json.dumps({"thresholds": self.thresholds,
+                                           "scorecard": scorecard_fingerprint(self.scorecard)})))
+
+    @classmethod
+    def load(cls, path: str, scorecard: Scorecard = None):
+        """Load a saved portfolio; scorecard must be the one it was saved with."""
+        from credit_cache import scorecard_fingerprint
+        with np.load(path) as saved:
+            meta = json.loads(str(saved["meta"]))
+            portfolio = cls(None, scorecard, **meta["thresholds"])
+            if meta["scorecard"] != scorecard_fingerprint(portfolio.scorecard):
+                raise ValueError(f"{path} was scored with a different scorecard.")
+            portfolio.grades = saved["grades"]
+            for name in ARRAYS:
+                setattr(portfolio, name, saved[name])
+        return portfolio
+
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_service.py
+Description: Local HTTP/JSON scoring service built on asyncio.
+
+Other processes on the same machine POST applications and get the decisions back
+without paying the Python start-up for every call. Requests that arrive within
+the batching window are scored together as one micro-batch. The service only
+binds to loopback addresses.
+
+Usage:
+    python credit_service.py --port 8080 --max-batch-size 64 --max-delay-ms 2
+    python credit_service.py --scorecard scorecard.toml --reload-interval 1
+
+    POST /score   one application (JSON object), a JSON list of applications or
+                  {"applications": [...]}; applications use the credit_batch input fields
+    GET  /stats   request, decision and batch counters with p50/p99 latency
+    GET  /health  liveness check
+
+With --scorecard the decisions come from a credit_config scorecard file, which is
+checked for changes every --reload-interval seconds and swapped in between batches.
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import time
+from collections import deque
+
+from credit_batch import score_records
+from credit_metrics import percentile
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_DELAY_MS = 2.0
+LATENCY_SAMPLES = 10000
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ServiceError(Exception):
+    """A request that is answered with an HTTP error status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+# ------------------------------------------ Counters ------------------------------------------------------------------
+
+class ServiceStats:
+    """Throughput counters and the latencies of the most recent requests."""
+
+    def __init__(self, samples: int = LATENCY_SAMPLES):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.decisions = 0
+        self.batches = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=samples)
+
+    def record_request(self, seconds: float):
+        self.requests += 1
+        self.latencies.append(seconds)
+
+    def record_batch(self, size: int):
+        self.batches += 1
+        self.decisions += size
+
+    def snapshot(self) -> dict:
+        uptime = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+        return {
+            "uptime_seconds": uptime,
+            "requests": self.requests,
+            "decisions": self.decisions,
+            "batches": self.batches,
+            "errors": self.errors,
+            "mean_batch_size": self.decisions / self.batches if self.batches else 0.0,
+            "requests_per_second": self.requests / uptime if uptime > 0 else 0.0,
+            "decisions_per_second": self.decisions / uptime if uptime > 0 else 0.0,
+            "latency_p50_ms": percentile(latencies, 0.50) * 1000,
+            "latency_p99_ms": percentile(latencies, 0.99) * 1000,
+        }
+
+
+# ------------------------------------------ Micro-batching ------------------------------------------------------------
+
+def score_batch(records: list) -> list:
+    return list(score_records(records))
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent submit() calls into batches for scorer. A batch is scored
+    once it holds max_batch_size records or max_delay seconds after its first
+    record arrived, whichever comes first.
+    """
+
+    def __init__(self, scorer=score_batch, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_delay: float = DEFAULT_MAX_DELAY_MS / 1000, stats: ServiceStats = None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        self.scorer = scorer
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.stats = stats or ServiceStats()
+        self._pending = []  # (records, future) waiting for the next batch
+        self._pending_size = 0
+        self._flush_handle = None
+
+    async def submit(self, records: list) -> list:
+        future = asyncio.get_running_loop().create_future()
+        if not records:
+            future.set_result([])
+            return await future
+        self._pending.append((records, future))
+        self._pending_size += len(records)
+        if self._pending_size >= self.max_batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.max_delay, self.flush)
+        return await future
+
+    def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending, self._pending_size = self._pending, [], 0
+        if not pending:
+            return
+        records = [record for request_records, _ in pending for record in request_records]
+        try:
+            decisions = self.scorer(records)
+        except Exception as error:
+            if len(pending) == 1:
+                if not pending[0][1].done():
+                    pending[0][1].set_exception(error)
+                return
+            # one bad request must not fail the others that share its batch
+            for request_records, future in pending:
+                self._score_alone(request_records, future)
+            return
+        self.stats.record_batch(len(records))
+        start = 0
+        for request_records, future in pending:
+            end = start + len(request_records)
+            request_decisions = decisions[start:end]
+            # rows are numbered within each request, not within the batch
+            for row, decision in enumerate(request_decisions, start=1):
+                decision["row"] = row
+            if not future.done():
+                future.set_result(request_decisions)
+            start = end
+
+    def _score_alone(self, records: list, future: asyncio.Future):
+        try:
+            decisions = self.scorer(records)
+        except Exception as error:
+            if not future.done():
+                future.set_exception(error)
+            return
+        self.stats.record_batch(len(records))
+        for row, decision in enumerate(decisions, start=1):
+            decision["row"] = row
+        if not future.done():
+            future.set_result(decisions)
+
+
+# ------------------------------------------ HTTP ----------------------------------------------------------------------
+
+def parse_applications(body: bytes):
+    """Return (records, single) for a /score request body."""
+    try:
+        payload = json.loads(body or b"null")
+    except ValueError as error:
+        raise ServiceError(400, f"Invalid JSON: {error}")
+    if isinstance(payload, dict) and "applications" in payload:
+        payload = payload["applications"]
+    elif isinstance(payload, dict):
+        return [payload], True
+    if not isinstance(payload, list) or not all(isinstance(record, dict) for record in payload):
+        raise ServiceError(400, "Expected an application object or a list of application objects.")
+    return payload, False
+
+
+class ScoringService:
+    def __init__(self, batcher: MicroBatcher = None):
+        self.batcher = batcher or MicroBatcher()
+        self.stats = self.batcher.stats
+
+    async def handle(self, method: str, path: str, body: bytes):
+        """Return (HTTP status, JSON payload) for one request."""
+        path = path.split("?", 1)[0]
+        if path == "/score":
+            if method != "POST":
+                raise ServiceError(405, "Use POST /score.")
+            records, single = parse_applications(body)
+            decisions = await self.batcher.submit(records)
+            return 200, decisions[0] if single else {"decisions": decisions}
+        if path == "/stats" and method == "GET":
+            return 200, self.stats.snapshot()
+        if path == "/health" and method == "GET":
+            return 200, {"status": "ok"}
+        raise ServiceError(404, f"No route for {method} {path}.")
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                started = time.perf_counter()
+                method, path, version = (request_line.decode("latin-1").split() + ["", "", ""])[:3]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get("connection", "").lower() != "close" and version == "HTTP/1.1")
+                try:
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY_BYTES:
+                        raise ServiceError(413, "Request body too large.")
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.handle(method, path, body)
+                except ServiceError as error:
+                    self.stats.errors += 1
+                    status, payload = error.status, {"error": str(error)}
+                except ValueError as error:
+                    self.stats.errors += 1
+                    status, payload = 400, {"error": str(error)}
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as error:
+                    # a failing scorer answers this request and leaves the connection usable
+                    self.stats.errors += 1
+                    status, payload = 500, {"error": f"{type(error).__name__}: {error}"}
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if path.startswith("/score"):
+                    self.stats.record_request(time.perf_counter() - started)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+
+
+async def start_service(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                        batcher: MicroBatcher = None) -> asyncio.AbstractServer:
+    """Start listening and return the server; port 0 picks a free port."""
+    if not is_loopback(host):
+        raise ValueError(f"The scoring service only binds to localhost, not '{host}'.")
+    service = ScoringService(batcher)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    server.service = service
+    return server
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                max_delay_ms: float = DEFAULT_MAX_DELAY_MS, scorer=score_batch):
+    server = await start_service(host, port, MicroBatcher(scorer, max_batch_size=max_batch_size,
+                                                          max_delay=max_delay_ms / 1000))
+    address = server.sockets[0].getsockname()
+    print(f"Scoring service listening on http://{address[0]}:{address[1]}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve credit decisions over HTTP/JSON on localhost.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"loopback address to bind (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"default: {DEFAULT_PORT}")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help=f"applications scored together at most (default: {DEFAULT_MAX_BATCH_SIZE})")
+    parser.add_argument("--max-delay-ms", type=float, default=DEFAULT_MAX_DELAY_MS,
+                        help=f"how long a request waits for others to join its batch (default: {DEFAULT_MAX_DELAY_MS})")
+    parser.add_argument("--scorecard", help="score with a credit_config .json or .toml scorecard file")
+    parser.add_argument("--reload-interval", type=float, default=1.0,
+                        help="seconds between checks of the scorecard file for changes (default: 1.0)")
+    args = parser.parse_args(argv)
+    scorer, reloader = score_batch, None
+    if args.scorecard:
+        from credit_config import ScorecardReloader
+        reloader = ScorecardReloader(args.scorecard).start(args.reload_interval)
+        scorer = reloader.score_batch
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch_size, args.max_delay_ms, scorer))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if reloader is not None:
+            reloader.stop()
+
+
+if __name__ == "__main__":
+    main()
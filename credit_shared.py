@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_shared.py
+Description: Parallel columnar scoring over shared memory, with no records sent to the workers.
+
+SharedBatch copies the input columns of a batch once into
+multiprocessing.shared_memory blocks and allocates the output columns (status,
+section scores, total and reason flags) next to them. The workers attach to the
+blocks when they start. Each task is just a (start, stop) row range: the worker
+scores that slice of the shared inputs with credit_vectorized.score_columns and
+writes the results into the same slice of the shared outputs. Only the block
+names and the row ranges are pickled.
+
+Usage:
+    with SharedBatch(columns_from_analyses(analyses)) as batch:
+        outputs = score_shared(batch, workers=8)   # {"status": array, "borrower_score": array, ...}
+
+    python credit_shared.py --records 200000 --workers 4   # against pools that pickle the data
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from MH6803_Required_Group_Project_code_Group1 import BorrowStatus
+from credit_vectorized import COLUMN_NAMES, REASON_FLAG_DTYPE, score_columns
+
+DEFAULT_CHUNK_SIZE = 50000
+
+# borrowing_history is shared as codes into a table of its distinct values
+INPUT_DTYPES = {
+    "entity_type": np.int8, "bank_status": np.int8, "number_of_guarantors": np.int64, "age_of_guarantors": np.int64,
+    "borrowing_history": np.int32, "current_total_debt": np.int64, "gross_income": np.int64,
+    "total_sales_per_year": np.int64, "current_market_value": np.int64, "type_of_property": np.int8,
+    "current_property_status": np.int8, "location_of_the_property": np.int8, "type_of_facility_applying": np.int8,
+    "applied_loan_amount": np.int64,
+}
+OUTPUT_DTYPES = {
+    "status": np.int8, "borrower_score": np.int64, "financial_score": np.int64, "collateral_score": np.int64,
+    "facility_score": np.int64, "total_credit_score": np.int64, "reason_flags": REASON_FLAG_DTYPE,
+}
+
+
+class SharedBatch:
+    """
+    Input and output columns of a batch in shared memory. The creating process owns
+    the blocks and unlinks them on close(); workers attach with SharedBatch.attach(spec).
+    """
+
+    def __init__(self, columns: dict = None, spec: dict = None):
+        self._blocks = []
+        self.arrays = {}
+        self.owner = spec is None
+        if spec is None:
+            rows = len(columns[COLUMN_NAMES[0]])
+            self.histories, codes = np.unique(np.asarray(columns["borrowing_history"], dtype=str),
+                                              return_inverse=True)
+            self.rows = rows
+            for name, dtype in INPUT_DTYPES.items():
+                values = codes.reshape(-1) if name == "borrowing_history" else columns[name]
+                self._allocate(name, dtype)[:] = values
+            for name, dtype in OUTPUT_DTYPES.items():
+                self._allocate(name, dtype)[:] = 0
+        else:
+            self.rows = spec["rows"]
+            self.histories = np.asarray(spec["histories"], dtype=str)
+            for name, (block_name, dtype) in spec["blocks"].items():
+                block = SharedMemory(name=block_name)
+                self._blocks.append(block)
+                self.arrays[name] = np.ndarray((self.rows,), dtype=dtype, buffer=block.buf)
+
+    @classmethod
+    def attach(cls, spec: dict):
+        return cls(spec=spec)
+
+    def __len__(self):
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _allocate(self, name: str, dtype) -> np.ndarray:
+        dtype = np.dtype(dtype)
+        block = SharedMemory(create=True, size=max(1, self.rows * dtype.itemsize))
+        self._blocks.append(block)
+        array = self.arrays[name] = np.ndarray((self.rows,), dtype=dtype, buffer=block.buf)
+        return array
+
+    def spec(self) -> dict:
+        """What a worker needs to attach: block names, dtypes and the history table."""
+        names = iter(block.name for block in self._blocks)
+        return {"rows": self.rows, "histories": self.histories.tolist(),
+                "blocks": {name: (next(names), array.dtype.str) for name, array in self.arrays.items()}}
+
+    def score_range(self, start: int, stop: int, scorecard=None, **thresholds) -> int:
+        """Score rows [start, stop) in place."""
+        inputs = {name: self.arrays[name][start:stop] for name in INPUT_DTYPES}
+        inputs["borrowing_history"] = self.histories[inputs["borrowing_history"]]
+        scores = score_columns(**inputs, scorecard=scorecard, **thresholds)
+        for name in OUTPUT_DTYPES:
+            self.arrays[name][start:stop] = getattr(scores, name)
+        return stop - start
+
+    def outputs(self) -> dict:
+        """Copies of the output columns, safe to use after close()."""
+        return {name: self.arrays[name].copy() for name in OUTPUT_DTYPES}
+
+    def close(self):
+        # views into the blocks must go before the blocks can be closed
+        self.arrays = {}
+        for block in self._blocks:
+            block.close()
+            if self.owner:
+                block.unlink()
+        self._blocks = []
+
+
+# ------------------------------------------ Workers -------------------------------------------------------------------
+
+_worker_batch = None
+_worker_options = {}
+
+
+def _attach_worker(spec: dict, options: dict):
+    global _worker_batch, _worker_options
+    _worker_batch = SharedBatch.attach(spec)
+    _worker_options = options
+
+
+def _score_worker_range(start: int, stop: int) -> int:
+    return _worker_batch.score_range(start, stop, **_worker_options)
+
+
+def row_ranges(rows: int, chunk_size: int) -> list:
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    return [(start, min(start + chunk_size, rows)) for start in range(0, rows, chunk_size)]
+
+
+def score_shared(batch: SharedBatch, workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE, scorecard=None,
+                 **thresholds) -> dict:
+    """
+    Score every row of batch with a pool of workers attached to its blocks and return
+    the output columns. workers=1 scores in this process.
+    """
+    ranges = row_ranges(len(batch), chunk_size)
+    options = dict(thresholds, scorecard=scorecard)
+    if workers == 1:
+        for start, stop in ranges:
+            batch.score_range(start, stop, **options)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_worker,
+                                 initargs=(batch.spec(), options)) as executor:
+            for _ in executor.map(_score_worker_range, [start for start, _ in ranges], [stop for _, stop in ranges]):
+                pass
+    return batch.outputs()
+
+
+# ------------------------------------------ Pickling baseline ---------------------------------------------------------
+
+def _score_analyses(analyses: list) -> list:
+    decisions = [analysis.evaluate() for analysis in analyses]
+    return [(decision.status.value, decision.total_credit_score, int(decision.reasons)) for decision in decisions]
+
+
+def score_pickled(analyses: list, workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> list:
+    """The baseline: chunks of BorrowerCreditAnalysis objects pickled to a pool, (status, total, flags) back."""
+    chunks = [analyses[start:start + chunk_size] for start in range(0, len(analyses), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [decision for chunk in executor.map(_score_analyses, chunks) for decision in chunk]
+
+
+def _score_column_slice(columns: dict) -> dict:
+    scores = score_columns(**columns)
+    return {name: getattr(scores, name) for name in OUTPUT_DTYPES}
+
+
+def score_pickled_columns(columns: dict, workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """
+    Vectorized workers fed by pickling: every task carries a slice of the input columns
+    and returns its output columns, which isolates the cost of moving the data.
+    """
+    columns = {name: np.asarray(values) for name, values in columns.items()}
+    slices = [{name: values[start:stop] for name, values in columns.items()}
+              for start, stop in row_ranges(len(columns[COLUMN_NAMES[0]]), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_score_column_slice, slices))
+    return {name: np.concatenate([result[name] for result in results]) if results else np.zeros(0, dtype)
+            for name, dtype in OUTPUT_DTYPES.items()}
+
+
+def main(argv=None):
+    import argparse
+    import time
+    from credit_batch import build_credit_analysis
+    from credit_benchmark import synthetic_records
+    from credit_vectorized import columns_from_analyses
+
+    parser = argparse.ArgumentParser(description="Shared-memory parallel scoring against a pickling process pool.")
+    parser.add_argument("--records", type=int, default=200000, help="synthetic applications (default: 200000)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per task")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    analyses = [build_credit_analysis(record) for record in synthetic_records(args.records, args.seed)]
+    columns = columns_from_analyses(analyses)
+    timings = {}
+
+    started = time.perf_counter()
+    pickled = score_pickled(analyses, args.workers, args.chunk_size)
+    timings["pickled pool"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    pickled_columns = score_pickled_columns(columns, args.workers, args.chunk_size)
+    timings["pickled columns"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with SharedBatch(columns) as batch:
+        outputs = score_shared(batch, args.workers, args.chunk_size)
+    timings["shared memory"] = time.perf_counter() - started
+
+    if [status for status, _, _ in pickled] != outputs["status"].tolist() or \
+            pickled_columns["status"].tolist() != outputs["status"].tolist():
+        raise SystemExit("The two modes disagree.")
+    for mode, seconds in timings.items():
+        print(f"{mode:<18}{seconds:>10.3f} s{args.records / seconds:>14,.0f} rows/s")
+    accepted = int((outputs["status"] == BorrowStatus.ACCEPTED.value).sum())
+    print(f"{accepted} of {args.records} accepted")
+    return timings
+
+
+if __name__ == "__main__":
+    main()
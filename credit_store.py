@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_store.py
+Description: SQLite store of scored applications and their decisions.
+
+Every scored application is kept with its input fields, section scores, total,
+status and rejection reasons, so past decisions can be looked up without scoring
+them again. Rows are buffered and written with executemany in large transactions
+on a WAL-mode database; status, total score and borrower name are indexed.
+
+Usage:
+    with DecisionStore("decisions.sqlite") as store:
+        run_id = store.start_run("applications.csv")
+        store.write(decision, record)
+    DecisionStore("decisions.sqlite").query(status="REJECTED", limit=10)
+
+    python credit_batch.py applications.csv decisions.csv --store decisions.sqlite
+    python credit_store.py decisions.sqlite --status REJECTED --name "John Doe"
+"""
+
+import sqlite3
+import time
+from collections import deque
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    BorrowerCreditAnalysis, SECTION_NAMES,
+    entity_type_dic, client_bank_status_dic, property_type_dic, property_location_dic,
+    current_property_status_dic, type_of_facility_applying_dic,
+)
+from credit_batch import INPUT_FIELDS, CSV_REASON_SEPARATOR, decision_record
+
+DEFAULT_BUFFER_ROWS = 10000
+DEFAULT_TRANSACTION_ROWS = 200000
+
+DECISION_COLUMNS = ("status", "total_credit_score") + tuple(f"{name}_score" for name in SECTION_NAMES) + (
+    "rejected_stage", "reason_flags", "rejection_reasons", "error")
+# full_name is both an input field and a decision field, so it is stored once
+STORED_COLUMNS = ("run_id", "row") + INPUT_FIELDS + DECISION_COLUMNS
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS runs ("
+    "run_id INTEGER PRIMARY KEY, source TEXT, started_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS decisions ("
+    "run_id INTEGER NOT NULL REFERENCES runs (run_id), row INTEGER NOT NULL, "
+    + ", ".join(f"{field} TEXT" for field in INPUT_FIELDS) + ", "
+    "status TEXT NOT NULL, total_credit_score INTEGER, "
+    + ", ".join(f"{name}_score INTEGER" for name in SECTION_NAMES) + ", "
+    "rejected_stage TEXT, reason_flags INTEGER, rejection_reasons TEXT, error TEXT)",
+    "CREATE INDEX IF NOT EXISTS decisions_status ON decisions (status)",
+    "CREATE INDEX IF NOT EXISTS decisions_total_credit_score ON decisions (total_credit_score)",
+    "CREATE INDEX IF NOT EXISTS decisions_full_name ON decisions (full_name)",
+)
+
+_INSERT = f"INSERT INTO decisions ({', '.join(STORED_COLUMNS)}) VALUES ({', '.join('?' * len(STORED_COLUMNS))})"
+
+
+def _option_keys(options: dict) -> dict:
+    return {member: key for key, member in options.items()}
+
+
+_ENUM_OPTION_KEYS = {
+    "entity_type": _option_keys(entity_type_dic),
+    "bank_status": _option_keys(client_bank_status_dic),
+    "type_of_property": _option_keys(property_type_dic),
+    "current_property_status": _option_keys(current_property_status_dic),
+    "location_of_the_property": _option_keys(property_location_dic),
+    "type_of_facility_applying": _option_keys(type_of_facility_applying_dic),
+}
+
+
+def record_from_analysis(analysis: BorrowerCreditAnalysis) -> dict:
+    """The credit_batch input record of an analysis built by the interactive flow."""
+    record = {}
+    for details in (analysis.borrower_information_details, analysis.borrower_financial_details,
+                    analysis.borrower_collateral_detail, analysis.borrower_facility_details):
+        for field in INPUT_FIELDS:
+            if hasattr(details, field):
+                value = getattr(details, field)
+                record[field] = _ENUM_OPTION_KEYS[field][value] if field in _ENUM_OPTION_KEYS else str(value)
+    return record
+
+
+class DecisionStore:
+    def __init__(self, path: str, buffer_rows: int = DEFAULT_BUFFER_ROWS,
+                 transaction_rows: int = DEFAULT_TRANSACTION_ROWS):
+        self.path = path
+        self.buffer_rows = buffer_rows
+        self.transaction_rows = transaction_rows
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+        self.connection.commit()
+        self.run_id = None
+        self._buffer = []
+        self._uncommitted = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ------------------------------------------ Writing ---------------------------------------------------------------
+
+    def start_run(self, source: str = None) -> int:
+        """Start a new run; the decisions written from now on belong to it."""
+        self.flush()
+        self.run_id = self.connection.execute("INSERT INTO runs (source, started_at) VALUES (?, ?)",
+                                              (source, time.time())).lastrowid
+        return self.run_id
+
+    def write(self, decision: dict, record: dict = None):
+        """Buffer one credit_batch decision together with the input record it was scored from."""
+        if self.run_id is None:
+            self.start_run()
+        record = record or {}
+        reasons = decision["rejection_reasons"]
+        self._buffer.append(
+            (self.run_id, decision["row"])
+            + tuple(decision["full_name"] if field == "full_name" else _text(record.get(field))
+                    for field in INPUT_FIELDS)
+            + (decision["status"], decision["total_credit_score"])
+            + tuple(decision[f"{name}_score"] for name in SECTION_NAMES)
+            + (decision["rejected_stage"], decision.get("reason_flags"),
+               CSV_REASON_SEPARATOR.join(reasons) if reasons else "", decision["error"]))
+        if len(self._buffer) >= self.buffer_rows:
+            self.flush(commit=False)
+
+    def write_analysis(self, analysis: BorrowerCreditAnalysis, row: int = 0):
+        """
+        Store the decision an interactively built analysis makes with its own thresholds
+        and scorecard. An analysis still missing details was stopped early, so it is
+        evaluated stage by stage like the interactive flow.
+        """
+        details = (analysis.borrower_information_details, analysis.borrower_financial_details,
+                   analysis.borrower_collateral_detail, analysis.borrower_facility_details)
+        credit_decision = analysis.evaluate() if None not in details else analysis.evaluate_staged()
+        full_name = analysis.borrower_information_details.full_name if details[0] is not None else ""
+        self.write(decision_record(credit_decision, row, full_name), record_from_analysis(analysis))
+
+    def flush(self, commit: bool = True):
+        if self._buffer:
+            self.connection.executemany(_INSERT, self._buffer)
+            self._uncommitted += len(self._buffer)
+            self._buffer = []
+        if commit or self._uncommitted >= self.transaction_rows:
+            self.connection.commit()
+            self._uncommitted = 0
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    # ------------------------------------------ Reading ---------------------------------------------------------------
+
+    def query(self, status: str = None, full_name: str = None, min_total: int = None, max_total: int = None,
+              run_id: int = None, limit: int = None) -> list:
+        """Stored decisions as dicts, filtered on the indexed columns."""
+        self.flush()
+        conditions, parameters = [], []
+        for condition, value in (("status = ?", status), ("full_name = ?", full_name),
+                                 ("total_credit_score >= ?", min_total), ("total_credit_score <= ?", max_total),
+                                 ("run_id = ?", run_id)):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        sql = f"SELECT {', '.join(STORED_COLUMNS)} FROM decisions"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY run_id, row"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        return [dict(zip(STORED_COLUMNS, values)) for values in self.connection.execute(sql, parameters)]
+
+    def count_by_status(self, run_id: int = None) -> dict:
+        self.flush()
+        sql = "SELECT status, COUNT(*) FROM decisions"
+        parameters = ()
+        if run_id is not None:
+            sql += " WHERE run_id = ?"
+            parameters = (run_id,)
+        return dict(self.connection.execute(sql + " GROUP BY status", parameters).fetchall())
+
+
+def _text(value):
+    return None if value is None else str(value).strip()
+
+
+def storing_scorer(scorer, store: DecisionStore):
+    """
+    Wrap a credit_batch scorer so every decision is also written to store along
+    with its input record. Works with any scorer that keeps the input order.
+    """
+
+    def scorer_with_store(records):
+        pending = deque()
+
+        def remember(records):
+            for record in records:
+                pending.append(record)
+                yield record
+
+        for decision in scorer(remember(records)):
+            store.write(decision, pending.popleft())
+            yield decision
+
+    return scorer_with_store
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Look up stored credit decisions.")
+    parser.add_argument("database", help="SQLite file written by credit_batch.py --store")
+    parser.add_argument("--status", choices=("ACCEPTED", "REJECTED", "INVALID"))
+    parser.add_argument("--name", help="borrower full name")
+    parser.add_argument("--min-total", type=int)
+    parser.add_argument("--max-total", type=int)
+    parser.add_argument("--run", type=int, help="run id")
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args(argv)
+    with DecisionStore(args.database) as store:
+        rows = store.query(args.status, args.name, args.min_total, args.max_total, args.run, args.limit)
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_sweep.py
+Description: What-if analysis of the score thresholds over a whole portfolio.
+
+The portfolio is scored once with credit_vectorized. The thresholds only decide
+which scores reject, so rows without a threshold-independent rejection reason
+(grade, guarantors, ratios, construction) are grouped by their four section
+scores. Every point of the grid is then decided with vectorized comparisons over
+those groups instead of over every row. Threshold reasons are counted from the
+sorted section scores with one binary search per grid point.
+
+Usage:
+    result = sweep_thresholds(scores, {"min_total_credit_score": range(15, 25),
+                                       "min_collateral_score": [4, 5, 6]})
+    result.rows()  # one dict per grid point: thresholds, accepted, approval_rate, reasons
+
+    python credit_sweep.py applications.csv --min-total-credit-score 18 19 20 --min-collateral-score 5 6
+"""
+
+from itertools import product
+
+import numpy as np
+
+from MH6803_Required_Group_Project_code_Group1 import RejectionReason
+from credit_vectorized import ColumnarScores, count_rejection_reasons
+
+# threshold name -> (section score attribute of ColumnarScores, reason set when the score reaches it)
+THRESHOLDS = {
+    "min_borrow_info_score": ("borrower_score", RejectionReason.BORROWER_SCORE),
+    "min_financial_details_score": ("financial_score", RejectionReason.FINANCIAL_SCORE),
+    "min_collateral_score": ("collateral_score", RejectionReason.COLLATERAL_SCORE),
+    "min_facility_score": ("facility_score", RejectionReason.FACILITY_SCORE),
+    "min_total_credit_score": ("total_credit_score", RejectionReason.TOTAL_SCORE),
+}
+DEFAULT_THRESHOLDS = {"min_borrow_info_score": 15, "min_financial_details_score": 7, "min_collateral_score": 5,
+                      "min_facility_score": 4, "min_total_credit_score": 20}
+THRESHOLD_REASONS = RejectionReason(0)
+for _, _reason in THRESHOLDS.values():
+    THRESHOLD_REASONS |= _reason
+# reasons the thresholds cannot change: grade, guarantors, ratios and construction status
+FIXED_REASONS = RejectionReason(sum(reason for reason in RejectionReason if not reason & THRESHOLD_REASONS))
+GRID_CHUNK = 256  # grid points compared against the score groups at once
+
+
+class SweepResult:
+    """
+    Outcome of sweep_thresholds. thresholds[name], accepted and reasons[reason] are
+    arrays with one entry per grid point.
+    """
+
+    def __init__(self, rows: int, thresholds: dict, accepted: np.ndarray, reasons: dict):
+        self.rows_scored = rows
+        self.thresholds = thresholds
+        self.accepted = accepted
+        self.reasons = reasons
+
+    def __len__(self):
+        return len(self.accepted)
+
+    @property
+    def approval_rate(self) -> np.ndarray:
+        return self.accepted / self.rows_scored if self.rows_scored else np.zeros(len(self.accepted))
+
+    def rows(self) -> list:
+        approval_rate = self.approval_rate
+        result = []
+        for point in range(len(self)):
+            row = {name: int(values[point]) for name, values in self.thresholds.items()}
+            row["accepted"] = int(self.accepted[point])
+            row["approval_rate"] = float(approval_rate[point])
+            row.update((reason.name, int(counts[point])) for reason, counts in self.reasons.items())
+            result.append(row)
+        return result
+
+
+def threshold_grid(grid: dict) -> dict:
+    """Cartesian product of the given threshold values; thresholds left out keep their defaults."""
+    unknown = set(grid) - set(THRESHOLDS)
+    if unknown:
+        raise ValueError(f"Unknown thresholds: {', '.join(sorted(unknown))}.")
+    values = [list(grid.get(name, [DEFAULT_THRESHOLDS[name]])) for name in THRESHOLDS]
+    points = np.array(list(product(*values)), dtype=np.int64).reshape(-1, len(THRESHOLDS))
+    return {name: points[:, index] for index, name in enumerate(THRESHOLDS)}
+
+
+def _score_groups(scores: ColumnarScores, eligible: np.ndarray):
+    """Distinct (borrower, financial, collateral, facility) scores of the eligible rows and their counts."""
+    sections = [np.asarray(getattr(scores, THRESHOLDS[name][0]))[eligible] for name in list(THRESHOLDS)[:4]]
+    if not len(sections[0]):
+        return [np.zeros(0, dtype=np.int64)] * 5, np.zeros(0, dtype=np.int64)
+    stacked = np.stack(sections, axis=1)
+    groups, counts = np.unique(stacked, axis=0, return_counts=True)
+    columns = [groups[:, index] for index in range(4)]
+    return columns + [groups.sum(axis=1)], counts
+
+
+def sweep_thresholds(scores: ColumnarScores, grid: dict) -> SweepResult:
+    """
+    Approval counts and rejection reason counts for every combination of the threshold
+    values in grid, e.g. {"min_total_credit_score": [18, 19, 20], "min_collateral_score": [5, 6]}.
+    """
+    thresholds = threshold_grid(grid)
+    points = len(next(iter(thresholds.values())))
+    flags = np.asarray(scores.reason_flags)
+    fixed_flags = flags & int(FIXED_REASONS)
+
+    # accepted: rows without a fixed reason whose every score stays below its threshold
+    group_scores, group_counts = _score_groups(scores, fixed_flags == 0)
+    accepted = np.zeros(points, dtype=np.int64)
+    for start in range(0, points, GRID_CHUNK):
+        stop = min(start + GRID_CHUNK, points)
+        passes = np.ones((stop - start, len(group_counts)), dtype=bool)
+        for name, group_score in zip(THRESHOLDS, group_scores):
+            passes &= group_score[np.newaxis, :] < thresholds[name][start:stop, np.newaxis]
+        accepted[start:stop] = passes @ group_counts
+
+    # reasons: fixed ones do not depend on the grid, threshold ones are counted from sorted scores
+    reasons = {}
+    for reason, count in count_rejection_reasons(fixed_flags).items():
+        if reason & FIXED_REASONS:
+            reasons[reason] = np.full(points, count, dtype=np.int64)
+    for name, (attribute, reason) in THRESHOLDS.items():
+        sorted_scores = np.sort(np.asarray(getattr(scores, attribute)))
+        reasons[reason] = len(sorted_scores) - np.searchsorted(sorted_scores, thresholds[name], side="left")
+    return SweepResult(len(flags), thresholds, accepted, reasons)
+
+
+def main(argv=None):
+    import argparse
+    import csv
+    import sys
+    from credit_batch import detect_format, read_records, build_credit_analysis, InvalidRecordError
+    from credit_vectorized import columns_from_analyses, score_columns
+
+    parser = argparse.ArgumentParser(description="Approval rates of a portfolio for a grid of thresholds.")
+    parser.add_argument("input", help="applications file (CSV or JSONL)")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="defaults to the input file extension")
+    for name, default in DEFAULT_THRESHOLDS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, nargs="+", default=[default], metavar="SCORE",
+                            help=f"values to try (default: {default})")
+    args = parser.parse_args(argv)
+
+    analyses = []
+    invalid = 0
+    with open(args.input, newline="", encoding="utf-8") as stream:
+        for record in read_records(stream, args.input_format or detect_format(args.input)):
+            try:
+                analyses.append(build_credit_analysis(record))
+            except InvalidRecordError:
+                invalid += 1
+    print(f"{len(analyses)} applications swept ({invalid} invalid applications skipped)", file=sys.stderr)
+    result = sweep_thresholds(score_columns(**columns_from_analyses(analyses)),
+                              {name: getattr(args, name) for name in THRESHOLDS})
+    rows = result.rows()
+    writer = csv.DictWriter(sys.stdout, fieldnames=list(rows[0]) if rows else [])
+    writer.writeheader()
+    writer.writerows(rows)
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_validation.py
+Description: Column-at-a-time validation of incoming applications.
+
+validate_columns checks every field of a whole batch in one pass per column and
+records every failure, not just the first one, as one bit per field and row. Text
+fields are matched with precompiled ASCII patterns and only fall back to the
+Unicode rules of validate_full_name and validate_number_input for values that are
+not plain ASCII. The verdicts agree exactly with the single-value validators and
+with the checks credit_batch.build_credit_analysis makes, so the rows that pass
+can be scored and the others quarantined without stopping the batch.
+
+Usage:
+    report = validate_records(records)
+    valid, quarantined = partition_records(records, report)
+
+    python credit_validation.py applications.csv --errors errors.csv
+"""
+
+import re
+from array import array
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    FULL_NAME_PATTERN, BORROWER_HISTORY_PATTERN, validate_number_input,
+    entity_type_dic, client_bank_status_dic, property_type_dic, property_location_dic,
+    current_property_status_dic, type_of_facility_applying_dic,
+    INVALID_NAME_MESSAGE, INVALID_BORROWER_HISTORY_MESSAGE, INVALID_NUMBER_GUARANTOR_MESSAGE,
+    INVALID_TOTAL_DEBT_MESSAGE, INVALID_TOTAL_INCOME_MESSAGE, INVALID_TOTAL_SALES_PER_YEAR_MESSAGE,
+    INVALID_CURRENT_MARKET_VALUE, INVALID_APPLIED_LOAN_AMOUNT_MESSAGE,
+)
+from credit_batch import INPUT_FIELDS, MAX_NUMBER
+
+# FULL_NAME_PATTERN restricted to ASCII input: there \w is [A-Za-z0-9_] and \d is [0-9]
+ASCII_FULL_NAME_PATTERN = re.compile(r"^[A-Za-z]+(?: [A-Za-z]+)*$")
+
+FIELD_BITS = {field: 1 << index for index, field in enumerate(INPUT_FIELDS)}
+MASK_TYPECODE = "L"  # at least 32 bits, enough for one bit per input field
+
+
+# ------------------------------------------ Single values -------------------------------------------------------------
+
+def is_valid_full_name(name: str) -> bool:
+    if name.isascii():
+        return ASCII_FULL_NAME_PATTERN.match(name) is not None
+    return FULL_NAME_PATTERN.match(name) is not None
+
+
+def is_valid_borrower_history(history: str) -> bool:
+    return BORROWER_HISTORY_PATTERN.match(history) is not None
+
+
+def is_valid_number(number: str) -> bool:
+    if number.isascii():
+        # fewer than 19 digits always fit MAX_NUMBER
+        return number.isdigit() and (len(number) < 19 or int(number) <= MAX_NUMBER)
+    try:
+        return validate_number_input(number) and int(number) <= MAX_NUMBER
+    except ValueError:
+        # digits int() does not understand, e.g. superscripts
+        return False
+
+
+# ------------------------------------------ Field rules ---------------------------------------------------------------
+
+def _choice_rule(options: dict):
+    return options.__contains__, f"Enter one of {', '.join(options)}."
+
+
+# field -> (check taking the stripped text, message) in the same words credit_batch uses
+FIELD_RULES = {
+    "full_name": (is_valid_full_name, INVALID_NAME_MESSAGE),
+    "entity_type": _choice_rule(entity_type_dic),
+    "bank_status": _choice_rule(client_bank_status_dic),
+    "number_of_guarantors": (is_valid_number, INVALID_NUMBER_GUARANTOR_MESSAGE),
+    "age_of_guarantors": (is_valid_number, INVALID_NUMBER_GUARANTOR_MESSAGE),
+    "borrowing_history": (is_valid_borrower_history, INVALID_BORROWER_HISTORY_MESSAGE),
+    "current_total_debt": (is_valid_number, INVALID_TOTAL_DEBT_MESSAGE),
+    "gross_income": (is_valid_number, INVALID_TOTAL_INCOME_MESSAGE),
+    "total_sales_per_year": (is_valid_number, INVALID_TOTAL_SALES_PER_YEAR_MESSAGE),
+    "current_market_value": (is_valid_number, INVALID_CURRENT_MARKET_VALUE),
+    "type_of_property": _choice_rule(property_type_dic),
+    "current_property_status": _choice_rule(current_property_status_dic),
+    "location_of_the_property": _choice_rule(property_location_dic),
+    "type_of_facility_applying": _choice_rule(type_of_facility_applying_dic),
+    "applied_loan_amount": (is_valid_number, INVALID_APPLIED_LOAN_AMOUNT_MESSAGE),
+}
+
+
+def field_error(field: str, missing: bool) -> str:
+    if missing:
+        return f"Missing field '{field}'."
+    return f"{field}: {FIELD_RULES[field][1]}"
+
+
+# ------------------------------------------ Columns -------------------------------------------------------------------
+
+class ValidationReport:
+    """
+    Outcome of validate_columns. invalid_fields[row] has the FIELD_BITS of every field
+    that failed on that row and missing_fields[row] the bits of the fields that were absent.
+    """
+
+    def __init__(self, rows: int):
+        self.rows = rows
+        self.invalid_fields = array(MASK_TYPECODE, bytes(rows * array(MASK_TYPECODE).itemsize))
+        self.missing_fields = array(MASK_TYPECODE, bytes(rows * array(MASK_TYPECODE).itemsize))
+
+    def __len__(self):
+        return self.rows
+
+    def is_valid(self, row: int) -> bool:
+        return not self.invalid_fields[row]
+
+    def valid_rows(self) -> list:
+        return [row for row, mask in enumerate(self.invalid_fields) if not mask]
+
+    def invalid_rows(self) -> list:
+        return [row for row, mask in enumerate(self.invalid_fields) if mask]
+
+    def row_errors(self, row: int) -> list:
+        """(field, message) for every field that failed on row, in input field order."""
+        mask = self.invalid_fields[row]
+        missing = self.missing_fields[row]
+        return [(field, field_error(field, bool(missing & bit))) for field, bit in FIELD_BITS.items() if mask & bit]
+
+    def error_counts(self) -> dict:
+        counts = dict.fromkeys(INPUT_FIELDS, 0)
+        for mask in self.invalid_fields:
+            if mask:
+                for field, bit in FIELD_BITS.items():
+                    if mask & bit:
+                        counts[field] += 1
+        return counts
+
+
+def _stripped_texts(values) -> list:
+    return [None if value is None else str(value).strip() for value in values]
+
+
+def validate_columns(columns: dict, rows: int = None) -> ValidationReport:
+    """
+    Validate a batch given as {field: sequence of raw values}. A field that is not
+    in columns counts as missing on every row.
+    """
+    if rows is None:
+        rows = len(next(iter(columns.values()))) if columns else 0
+    report = ValidationReport(rows)
+    invalid_fields = report.invalid_fields
+    missing_fields = report.missing_fields
+    for field, (check, _) in FIELD_RULES.items():
+        bit = FIELD_BITS[field]
+        values = columns.get(field)
+        if values is None:
+            for row in range(rows):
+                invalid_fields[row] |= bit
+                missing_fields[row] |= bit
+            continue
+        if len(values) != rows:
+            raise ValueError(f"Column '{field}' has {len(values)} values, expected {rows}.")
+        texts = _stripped_texts(values)
+        # most rows pass, so only the failing ones are touched row by row
+        for row in [row for row, text in enumerate(texts) if text is None or not check(text)]:
+            invalid_fields[row] |= bit
+            if texts[row] is None:
+                missing_fields[row] |= bit
+    return report
+
+
+def records_to_columns(records: list) -> dict:
+    return {field: [record.get(field) for record in records] for field in INPUT_FIELDS}
+
+
+def validate_records(records: list) -> ValidationReport:
+    return validate_columns(records_to_columns(records), len(records))
+
+
+def partition_records(records: list, report: ValidationReport = None):
+    """Return (valid records, [(row, record, errors)]) with rows counted from 0."""
+    if report is None:
+        report = validate_records(records)
+    valid = []
+    quarantined = []
+    for row, record in enumerate(records):
+        if report.is_valid(row):
+            valid.append(record)
+        else:
+            quarantined.append((row, record, report.row_errors(row)))
+    return valid, quarantined
+
+
+def main(argv=None):
+    import argparse
+    import csv
+    import sys
+    from credit_batch import detect_format, read_records
+
+    parser = argparse.ArgumentParser(description="Validate a CSV or JSONL applications file without scoring it.")
+    parser.add_argument("input", help="applications file")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="defaults to the input file extension")
+    parser.add_argument("--errors", metavar="PATH", help="write one CSV line per row and failing field to PATH")
+    args = parser.parse_args(argv)
+
+    with open(args.input, newline="", encoding="utf-8") as stream:
+        records = list(read_records(stream, args.input_format or detect_format(args.input)))
+    report = validate_records(records)
+    invalid_rows = report.invalid_rows()
+    if args.errors:
+        with open(args.errors, "w", newline="", encoding="utf-8") as stream:
+            writer = csv.writer(stream)
+            writer.writerow(("row", "field", "error"))
+            for row in invalid_rows:
+                for field, message in report.row_errors(row):
+                    writer.writerow((row + 1, field, message))
+    print(f"{len(records)} rows, {len(invalid_rows)} invalid", file=sys.stderr)
+    for field, count in report.error_counts().items():
+        if count:
+            print(f"  {field:<28}{count:>10}", file=sys.stderr)
+    return report
+
+
+if __name__ == "__main__":
+    main()
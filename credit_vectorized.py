@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+Filename: credit_vectorized.py
+Description: Columnar (NumPy) scoring of whole portfolios.
+
+Each argument of score_columns is one column of the portfolio. Enum columns hold
+the enum values (e.g. EntityType.SOLE_PROPRIETORSHIP.value == 3) and money columns
+hold integers. Every ratio, band score, section score and rejection flag is
+computed with array operations and matches the scalar BorrowerCreditAnalysis
+path exactly, as long as the money amounts stay below 2**53.
+
+Usage:
+    scores = score_columns(**columns_from_analyses(analyses))
+    scores.status  # BorrowStatus values, one per row
+"""
+
+import numpy as np
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    CurrentPropertyStatus, BorrowStatus, DEFAULT_SCORECARD, BandTable, Scorecard, RejectionReason, BASIS_POINTS,
+    invalid_borrow_history_grade,
+)
+
+COLUMN_NAMES = (
+    "entity_type", "bank_status", "number_of_guarantors", "age_of_guarantors", "borrowing_history",
+    "current_total_debt", "gross_income", "total_sales_per_year",
+    "current_market_value", "type_of_property", "current_property_status", "location_of_the_property",
+    "type_of_facility_applying", "applied_loan_amount",
+)
+
+
+class CompiledScorecard:
+    """The lookup tables of a Scorecard as NumPy arrays."""
+
+    def __init__(self, scorecard: Scorecard):
+        self.scorecard = scorecard
+        self.entity_type_points = np.array(scorecard.entity_type_table, dtype=np.int64)
+        self.bank_status_points = np.array(scorecard.bank_status_table, dtype=np.int64)
+        self.guarantor_points = np.array(scorecard.guarantor_points, dtype=np.int64)
+        self.property_type_points = np.array(scorecard.property_type_table, dtype=np.int64)
+        self.property_location_points = np.array(scorecard.property_location_table, dtype=np.int64)
+        self.facility_type_points = np.array(scorecard.facility_type_table, dtype=np.int64)
+        self._section_cubes = {}
+
+    def section_cube(self, section: str, threshold) -> tuple:
+        """(scores, reason flags) arrays of Scorecard.borrower_cube or collateral_cube, indexed by cell."""
+        cube = self._section_cubes.get((section, threshold))
+        if cube is None:
+            results = getattr(self.scorecard, f"{section}_cube")(threshold)
+            cube = self._section_cubes[(section, threshold)] = (
+                np.array([result.score for result in results], dtype=np.int64),
+                np.array([int(result.reasons) for result in results], dtype=REASON_FLAG_DTYPE))
+        return cube
+
+
+def compile_scorecard(scorecard: Scorecard = None) -> CompiledScorecard:
+    scorecard = scorecard or DEFAULT_SCORECARD
+    # kept on the scorecard itself, like its section cubes, so it goes away with the scorecard
+    compiled = getattr(scorecard, "_vectorized", None)
+    if compiled is None:
+        compiled = scorecard._vectorized = CompiledScorecard(scorecard)
+    return compiled
+
+
+# ------------------------------------------ Ratios --------------------------------------------------------------------
+
+def _percentage_ratio(numerator, denominator) -> np.ndarray:
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    ratio = np.zeros(np.broadcast(numerator, denominator).shape, dtype=np.float64)
+    np.divide(numerator, denominator, out=ratio, where=denominator != 0)
+    return ratio * 100
+
+
+def get_debt_to_sales_ratios(current_total_debt, total_sales_per_year) -> np.ndarray:
+    return _percentage_ratio(current_total_debt, total_sales_per_year)
+
+
+def get_debt_to_income_ratios(current_total_debt, gross_income) -> np.ndarray:
+    return _percentage_ratio(current_total_debt, gross_income)
+
+
+def get_loan_to_valuation_ratios(applied_loan_amount, current_market_value) -> np.ndarray:
+    return _percentage_ratio(applied_loan_amount, current_market_value)
+
+
+# ------------------------------------------ Band scores ---------------------------------------------------------------
+
+def get_band_scores(bands: BandTable, ratio) -> np.ndarray:
+    """Same lookup as BandTable.score: searchsorted(side='right') is bisect_right."""
+    band_index = np.searchsorted(np.asarray(bands.edges, dtype=np.float64), np.asarray(ratio, dtype=np.float64),
+                                 side="right")
+    return np.asarray(bands.points, dtype=np.int64)[band_index]
+
+
+_INT64_LIMIT = np.iinfo(np.int64).max
+
+
+def _exact_operands(numerator, denominator, bands: BandTable):
+    """
+    numerator and denominator as int64 arrays, a zero denominator turned into the ratio 0/1.
+    When the cross products could overflow int64 they are returned as Python int object arrays.
+    """
+    numerator = np.asarray(numerator, dtype=np.int64)
+    denominator = np.asarray(denominator, dtype=np.int64)
+    zero = denominator == 0
+    numerator = np.where(zero, 0, numerator)
+    denominator = np.where(zero, 1, denominator)
+    largest_edge = max((abs(edge_numerator) * edge_denominator
+                        for edge_numerator, edge_denominator, _ in bands.basis_point_edges), default=1)
+    largest = max(int(np.abs(numerator).max(initial=0)), int(denominator.max(initial=0)))
+    if largest * BASIS_POINTS * largest_edge > _INT64_LIMIT:
+        return numerator.astype(object), denominator.astype(object)
+    return numerator, denominator
+
+
+def get_band_indices_exact(bands: BandTable, numerator, denominator) -> np.ndarray:
+    """Same decisions as BandTable.band_index_exact, one cross-multiplication per edge and row."""
+    numerator, denominator = _exact_operands(numerator, denominator, bands)
+    scaled = numerator * BASIS_POINTS
+    band_index = np.zeros(scaled.shape, dtype=np.intp)
+    for edge_numerator, edge_denominator, strict in bands.basis_point_edges:
+        left = scaled * edge_denominator if edge_denominator != 1 else scaled
+        right = denominator * edge_numerator
+        band_index += np.asarray((left > right) if strict else (left >= right), dtype=bool)
+    return band_index
+
+
+def get_band_scores_exact(bands: BandTable, numerator, denominator) -> np.ndarray:
+    return np.asarray(bands.points, dtype=np.int64)[get_band_indices_exact(bands, numerator, denominator)]
+
+
+def get_ratio_basis_points(numerator, denominator) -> np.ndarray:
+    """RatioBand.basis_points for whole columns: the ratio in basis points rounded down, 0 for a zero denominator."""
+    numerator = np.asarray(numerator, dtype=np.int64)
+    denominator = np.asarray(denominator, dtype=np.int64)
+    if int(np.abs(numerator).max(initial=0)) * BASIS_POINTS > _INT64_LIMIT:
+        return np.array([value * BASIS_POINTS // divisor if divisor else 0
+                         for value, divisor in zip(numerator.tolist(), denominator.tolist())], dtype=object)
+    basis_points = np.zeros(np.broadcast(numerator, denominator).shape, dtype=np.int64)
+    np.floor_divide(numerator * BASIS_POINTS, denominator, out=basis_points, where=denominator != 0)
+    return basis_points
+
+
+def get_debt_sales_ratio_scores(debt_sales_ratio, scorecard: Scorecard = None) -> np.ndarray:
+    return get_band_scores((scorecard or DEFAULT_SCORECARD).debt_to_sales_bands, debt_sales_ratio)
+
+
+def get_to_income_ratio_scores(debt_to_income_ratio, scorecard: Scorecard = None) -> np.ndarray:
+    return get_band_scores((scorecard or DEFAULT_SCORECARD).debt_to_income_bands, debt_to_income_ratio)
+
+
+def get_loan_to_valuation_ratio_scores(loan_to_valuation_ratio, scorecard: Scorecard = None) -> np.ndarray:
+    return get_band_scores((scorecard or DEFAULT_SCORECARD).loan_to_valuation_bands, loan_to_valuation_ratio)
+
+
+def encode_borrowing_history(borrowing_history, scorecard: Scorecard = None):
+    """
+    Return (grade points, invalid grade flag) per row. The scalar rules run once per
+    distinct history string, so a portfolio with a handful of grades costs one sort.
+    """
+    scorecard = scorecard or DEFAULT_SCORECARD
+    distinct, inverse = np.unique(np.asarray(borrowing_history, dtype=str), return_inverse=True)
+    grade_points = np.array([scorecard.grade_history_score(history.upper()) for history in distinct],
+                            dtype=np.int64)
+    grade_invalid = np.array([invalid_borrow_history_grade(history) for history in distinct], dtype=bool)
+    inverse = inverse.reshape(-1)
+    return grade_points[inverse], grade_invalid[inverse]
+
+
+def encode_grade_categories(borrowing_history, scorecard: Scorecard = None) -> np.ndarray:
+    """The grade category of Scorecard.borrower_cell per row, worked out once per distinct history."""
+    scorecard = scorecard or DEFAULT_SCORECARD
+    distinct, inverse = np.unique(np.asarray(borrowing_history, dtype=str), return_inverse=True)
+    categories = []
+    for history in distinct:
+        grade = history.upper()
+        category = scorecard.grade_categories.get(grade)
+        if category is None:
+            category = scorecard.unknown_grade_category + invalid_borrow_history_grade(grade)
+        categories.append(category)
+    return np.array(categories, dtype=np.int64)[inverse.reshape(-1)]
+
+
+def borrower_cells(entity_type, bank_status, number_of_guarantors, age_of_guarantors, borrowing_history,
+                   scorecard: Scorecard = None) -> np.ndarray:
+    """Scorecard.borrower_cell for whole columns."""
+    scorecard = scorecard or DEFAULT_SCORECARD
+    number_of_guarantors = np.asarray(number_of_guarantors, dtype=np.int64)
+    age_of_guarantors = np.asarray(age_of_guarantors, dtype=np.int64)
+    bucket = np.where(number_of_guarantors >= 1, np.minimum(number_of_guarantors, scorecard.max_guarantor_index) + 1, 0)
+    cells = (np.asarray(entity_type, dtype=np.int64) * len(scorecard.bank_status_table) +
+             np.asarray(bank_status, dtype=np.int64)) * (len(scorecard.guarantor_points) + 1) + bucket
+    cells = cells * (scorecard.unknown_grade_category + 2) + encode_grade_categories(borrowing_history, scorecard)
+    return cells * 2 + ((age_of_guarantors < 21) | (age_of_guarantors > 65))
+
+
+def collateral_cells(type_of_property, location_of_the_property, current_property_status,
+                     scorecard: Scorecard = None) -> np.ndarray:
+    """Scorecard.collateral_cell for whole columns."""
+    scorecard = scorecard or DEFAULT_SCORECARD
+    cells = (np.asarray(type_of_property, dtype=np.int64) * len(scorecard.property_location_table) +
+             np.asarray(location_of_the_property, dtype=np.int64))
+    return cells * 2 + (np.asarray(current_property_status) == CurrentPropertyStatus.UNDER_CONSTRUCTION.value)
+
+
+# ------------------------------------------ Rejection reasons ---------------------------------------------------------
+
+REASON_FLAG_DTYPE = np.uint16
+
+
+def _reason_bits(condition, reason: RejectionReason) -> np.ndarray:
+    return np.asarray(condition, dtype=REASON_FLAG_DTYPE) * REASON_FLAG_DTYPE(reason)
+
+
+def count_rejection_reasons(reason_flags) -> dict:
+    """Number of rows carrying each RejectionReason, counted with one AND per reason."""
+    reason_flags = np.asarray(reason_flags)
+    return {reason: int(np.count_nonzero(reason_flags & int(reason))) for reason in RejectionReason}
+
+
+# ------------------------------------------ Portfolio scoring ---------------------------------------------------------
+
+class ColumnarScores:
+    """Per-row results of score_columns. Every attribute is an array with one entry per application."""
+
+    def __init__(self, **columns):
+        self.debt_to_sales_ratio = columns["debt_to_sales_ratio"]
+        self.debt_to_income_ratio = columns["debt_to_income_ratio"]
+        self.loan_to_valuation_ratio = columns["loan_to_valuation_ratio"]
+        self.debt_sales_ratio_score = columns["debt_sales_ratio_score"]
+        self.debt_to_income_score = columns["debt_to_income_score"]
+        self.loan_to_valuation_score = columns["loan_to_valuation_score"]
+        self.borrower_score = columns["borrower_score"]
+        self.financial_score = columns["financial_score"]
+        self.collateral_score = columns["collateral_score"]
+        self.facility_score = columns["facility_score"]
+        self.total_credit_score = columns["total_credit_score"]
+        self.borrower_rejected = columns["borrower_rejected"]
+        self.financial_rejected = columns["financial_rejected"]
+        self.collateral_rejected = columns["collateral_rejected"]
+        self.facility_rejected = columns["facility_rejected"]
+        self.rejected = columns["rejected"]
+        self.reason_flags = columns["reason_flags"]
+        self.status = columns["status"]
+
+    def __len__(self):
+        return len(self.status)
+
+    def statuses(self) -> list:
+        return [BorrowStatus(value) for value in self.status.tolist()]
+
+
+def score_columns(entity_type, bank_status, number_of_guarantors, age_of_guarantors, borrowing_history,
+                  current_total_debt, gross_income, total_sales_per_year,
+                  current_market_value, type_of_property, current_property_status, location_of_the_property,
+                  type_of_facility_applying, applied_loan_amount,
+                  min_borrow_info_score=15, min_financial_details_score=7, min_collateral_score=5,
+                  min_facility_score=4, min_total_credit_score=20, scorecard: Scorecard = None,
+                  exact_ratios: bool = False) -> ColumnarScores:
+    """
+    With exact_ratios the bands are decided on the integer amounts by cross-multiplication,
+    as BandTable.band_index_exact does, instead of on the floating point ratios.
+    """
+    scorecard = scorecard or DEFAULT_SCORECARD
+    tables = compile_scorecard(scorecard)
+
+    # borrower details
+    borrower_cube_scores, borrower_cube_reasons = tables.section_cube("borrower", min_borrow_info_score)
+    borrower_cell = borrower_cells(entity_type, bank_status, number_of_guarantors, age_of_guarantors,
+                                   borrowing_history, scorecard)
+    borrower_score = borrower_cube_scores[borrower_cell]
+    borrower_reasons = borrower_cube_reasons[borrower_cell]
+
+    # financial details
+    debt_to_sales_ratio = get_debt_to_sales_ratios(current_total_debt, total_sales_per_year)
+    debt_to_income_ratio = get_debt_to_income_ratios(current_total_debt, gross_income)
+    if exact_ratios:
+        debt_sales_ratio_score = get_band_scores_exact(scorecard.debt_to_sales_bands, current_total_debt,
+                                                       total_sales_per_year)
+        debt_to_income_score = get_band_scores_exact(scorecard.debt_to_income_bands, current_total_debt,
+                                                     gross_income)
+    else:
+        debt_sales_ratio_score = get_debt_sales_ratio_scores(debt_to_sales_ratio, scorecard)
+        debt_to_income_score = get_to_income_ratio_scores(debt_to_income_ratio, scorecard)
+    financial_score = debt_sales_ratio_score + debt_to_income_score
+    financial_reasons = (_reason_bits(debt_sales_ratio_score == 0, RejectionReason.DEBT_TO_SALES) |
+                         _reason_bits(debt_to_income_score == 0, RejectionReason.DEBT_TO_INCOME) |
+                         _reason_bits(financial_score >= min_financial_details_score,
+                                      RejectionReason.FINANCIAL_SCORE))
+
+    # collateral details
+    collateral_cube_scores, collateral_cube_reasons = tables.section_cube("collateral", min_collateral_score)
+    collateral_cell = collateral_cells(type_of_property, location_of_the_property, current_property_status, scorecard)
+    collateral_score = collateral_cube_scores[collateral_cell]
+    collateral_reasons = collateral_cube_reasons[collateral_cell]
+
+    # facility details
+    loan_to_valuation_ratio = get_loan_to_valuation_ratios(applied_loan_amount, current_market_value)
+    if exact_ratios:
+        loan_to_valuation_score = get_band_scores_exact(scorecard.loan_to_valuation_bands, applied_loan_amount,
+                                                        current_market_value)
+    else:
+        loan_to_valuation_score = get_loan_to_valuation_ratio_scores(loan_to_valuation_ratio, scorecard)
+    facility_score = tables.facility_type_points[np.asarray(type_of_facility_applying)] + loan_to_valuation_score
+    facility_reasons = (_reason_bits(loan_to_valuation_score == 0, RejectionReason.LOAN_TO_VALUATION) |
+                        _reason_bits(facility_score >= min_facility_score, RejectionReason.FACILITY_SCORE))
+
+    total_credit_score = borrower_score + financial_score + collateral_score + facility_score
+    reason_flags = (borrower_reasons | financial_reasons | collateral_reasons | facility_reasons |
+                    _reason_bits(total_credit_score >= min_total_credit_score, RejectionReason.TOTAL_SCORE))
+    rejected = reason_flags != 0
+    status = np.where(rejected, BorrowStatus.REJECTED.value, BorrowStatus.ACCEPTED.value).astype(np.int8)
+
+    return ColumnarScores(
+        debt_to_sales_ratio=debt_to_sales_ratio, debt_to_income_ratio=debt_to_income_ratio,
+        loan_to_valuation_ratio=loan_to_valuation_ratio, debt_sales_ratio_score=debt_sales_ratio_score,
+        debt_to_income_score=debt_to_income_score, loan_to_valuation_score=loan_to_valuation_score,
+        borrower_score=borrower_score, financial_score=financial_score, collateral_score=collateral_score,
+        facility_score=facility_score, total_credit_score=total_credit_score,
+        borrower_rejected=borrower_reasons != 0, financial_rejected=financial_reasons != 0,
+        collateral_rejected=collateral_reasons != 0, facility_rejected=facility_reasons != 0,
+        rejected=rejected, reason_flags=reason_flags, status=status)
+
+
+def columns_from_analyses(analyses) -> dict:
+    """Turn BorrowerCreditAnalysis objects into the keyword columns taken by score_columns."""
+    columns = {name: [] for name in COLUMN_NAMES}
+    for analysis in analyses:
+        borrower = analysis.borrower_information_details
+        financial = analysis.borrower_financial_details
+        collateral = analysis.borrower_collateral_detail
+        facility = analysis.borrower_facility_details
+        columns["entity_type"].append(borrower.entity_type.value)
+        columns["bank_status"].append(borrower.bank_status.value)
+        columns["number_of_guarantors"].append(borrower.number_of_guarantors)
+        columns["age_of_guarantors"].append(borrower.age_of_guarantors)
+        columns["borrowing_history"].append(borrower.borrowing_history)
+        columns["current_total_debt"].append(financial.current_total_debt)
+        columns["gross_income"].append(financial.gross_income)
+        columns["total_sales_per_year"].append(financial.total_sales_per_year)
+        columns["current_market_value"].append(collateral.current_market_value)
+        columns["type_of_property"].append(collateral.type_of_property.value)
+        columns["current_property_status"].append(collateral.current_property_status.value)
+        columns["location_of_the_property"].append(collateral.location_of_the_property.value)
+        columns["type_of_facility_applying"].append(facility.type_of_facility_applying.value)
+        columns["applied_loan_amount"].append(facility.applied_loan_amount)
+    return {name: np.asarray(values) for name, values in columns.items()}
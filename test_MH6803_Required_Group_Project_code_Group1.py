@@ -0,0 +1,468 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from unittest.runner import TextTestResult
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    BorrowStatus, BorrowerCreditAnalysis, ClientBankStatus, EntityType, GradeScore,
+    facility_details, financial_details, input_borrower_full_name, input_location_of_property, input_type_of_property,
+    get_bank_status_score, get_debt_sales_ratio_score, get_debt_to_income_ratio, get_debt_to_sales_ratio,
+    get_entity_type_score, get_grade_history_score, get_guarantor_score, get_loan_to_valuation_ratio,
+    get_loan_to_valuation_ratio_score, get_to_income_ratio_score, invalid_borrow_history_grade, invalid_guarantors_age,
+    property_location_dic, property_type_dic, type_of_facility_applying_dic,
+    validate_borrower_history, validate_client_bank_status_option, validate_entity_type, validate_full_name,
+    validate_number_input, validate_property_location, validate_property_status_input, validate_property_type,
+    validate_type_of_facility_applying_input,
+    Borrower, FinancialDetails, CollateralDetails, FacilityDetails, CurrentPropertyStatus, LocationProperty,
+    TypeProperty, TypeFacilityApplying, BandTable, Scorecard, DEFAULT_SCORECARD,
+    evaluate_financial_section, RejectionReason, rejection_messages,
+    get_debt_to_sales_band, get_debt_to_income_band, get_loan_to_valuation_band,
+    evaluate_borrower_section, evaluate_collateral_section, NO_REJECTION,
+)
+
+MODULE_NAME = "MH6803_Required_Group_Project_code_Group1"
+
+
+def make_credit_analysis(borrowing_history="A", current_total_debt=80000, applied_loan_amount=90000):
+    return BorrowerCreditAnalysis(
+        Borrower("John Doe", EntityType.COMPANY_LIMITED, ClientBankStatus.EXISTING_TO_A_BANK, 2, 40,
+                 borrowing_history),
+        FinancialDetails(current_total_debt, 100000, 100000, get_debt_to_sales_ratio(current_total_debt, 100000),
+                         get_debt_to_income_ratio(current_total_debt, 100000)),
+        CollateralDetails(100000, TypeProperty.RESIDENTIAL_LANDED, CurrentPropertyStatus.COMPLETED,
+                          LocationProperty.CENTRAL_AREA),
+        FacilityDetails(TypeFacilityApplying.TERM_LOAN, applied_loan_amount,
+                        get_loan_to_valuation_ratio(applied_loan_amount, 100000)))
+
+
+class TestBorrowerDetails(unittest.TestCase):
+
+    def test_validate_full_name_valid(self):
+        valid_names = [
+            "John Doe",
+            "Dirceu de Medeiros Teixeira",
+            "José Silva",
+            "Marie Curie",
+            "René Descartes",
+            "Müller",
+            "李小龙",
+            "Иван Иванович"
+        ]
+        for name in valid_names:
+            self.assertTrue(validate_full_name(name), f"'{name}' should be valid")
+
+    def test_validate_full_name_invalid(self):
+        invalid_names = [
+            "123 John",
+            "John_Doe",
+            "John@Doe",
+            "",
+            " "
+        ]
+        for name in invalid_names:
+            self.assertFalse(validate_full_name(name), f"'{name}' should be invalid")
+
+    def test_get_age_status(self):
+        self.assertEqual(invalid_guarantors_age(20), True, "Age 20 should be REJECTED")
+        self.assertEqual(invalid_guarantors_age(65), False, "Age 65 should be ACCEPTED")
+        self.assertEqual(invalid_guarantors_age(21), False, "Age 21 should be ACCEPTED")
+        self.assertEqual(invalid_guarantors_age(66), True, "Age 66 should be REJECTED")
+
+    def test_get_guarantor_score(self):
+        self.assertEqual(get_guarantor_score(1), 5, "1 guarantor should give a score of 5")
+        self.assertEqual(get_guarantor_score(2), 4, "2 guarantors should give a score of 4")
+        self.assertEqual(get_guarantor_score(3), 3, "3 guarantors should give a score of 3")
+        self.assertEqual(get_guarantor_score(4), 2, "4 guarantors should give a score of 2")
+        self.assertEqual(get_guarantor_score(5), 1, "More than 4 guarantors should give a score of 1")
+
+    def test_grade_score_enum(self):
+        self.assertEqual(GradeScore.A.value, 1, "GradeScore A should have value 1")
+        self.assertEqual(GradeScore.B.value, 2, "GradeScore B should have value 2")
+
+    @patch('builtins.input', side_effect=["123 John", "John Doe"])
+    def test_get_borrower_name_invalid(self, mock):
+        result = input_borrower_full_name()
+        self.assertEqual(result, "John Doe", "The function should return the valid name after invalid attempts")
+
+    @patch('builtins.input', side_effect=["John Doe", "John Doe"])
+    def test_get_borrower_name(self, mock):
+        result = input_borrower_full_name()
+        self.assertEqual(result, "John Doe", "The function should return the valid name immediately")
+
+    def test_get_grade_history_score(self):
+        self.assertEqual(get_grade_history_score("A"), 1, "Grade A should give a score of 1")
+        self.assertEqual(get_grade_history_score("B"), 2, "Grade B should give a score of 2")
+        self.assertEqual(get_grade_history_score("C"), 3, "Grade C should give a score of 3")
+
+    def test_get_bank_status_score(self):
+        self.assertEqual(get_bank_status_score(ClientBankStatus.NEW_BANK), 4, "New Bank should give a score of 4")
+        self.assertEqual(get_bank_status_score(ClientBankStatus.EXISTING_TO_A_BANK), 2,
+                         "Existing Bank should give a score of 2")
+
+    def test_get_entity_type_score(self):
+        self.assertEqual(get_entity_type_score(EntityType.SOLE_PROPRIETORSHIP), 3,
+                         "Sole Proprietorship should give a score of 3")
+        self.assertEqual(get_entity_type_score(EntityType.LIMITED_PARTNERSHIP), 2,
+                         "Limited Partnership should give a score of 2")
+        self.assertEqual(get_entity_type_score(EntityType.COMPANY_LIMITED), 1,
+                         "Company Limited should give a score of 1")
+
+    def test_get_borrow_history_status(self):
+        self.assertEqual(invalid_borrow_history_grade("A"), False, "Grade A should not reject")
+        self.assertEqual(invalid_borrow_history_grade("C"), False, "Grade C should not reject")
+        self.assertEqual(invalid_borrow_history_grade("D"), True, "Grade D should be rejected")
+        self.assertEqual(invalid_borrow_history_grade("Z"), True, "Grade Z should be rejected")
+
+    def test_validate_borrower_history(self):
+        self.assertTrue(validate_borrower_history("A"), "History 'A' should be valid")
+        self.assertTrue(validate_borrower_history("B"), "History 'B' should be valid")
+        self.assertFalse(validate_borrower_history("123"), "Numeric history should be invalid")
+        self.assertFalse(validate_borrower_history(""), "Empty history should be invalid")
+
+    def test_validate_client_bank_status_option(self):
+        self.assertTrue(validate_client_bank_status_option("1"), "Option '1' should be valid")
+        self.assertTrue(validate_client_bank_status_option("2"), "Option '2' should be valid")
+        self.assertFalse(validate_client_bank_status_option("3"), "Option '3' should be invalid")
+
+    def test_validate_number_input(self):
+        self.assertTrue(validate_number_input("5"), "Number '5' should be valid")
+        self.assertFalse(validate_number_input("-1"), "Negative numbers should be invalid")
+        self.assertFalse(validate_number_input("abc"), "Non-numeric input should be invalid")
+
+    def test_validate_entity_type(self):
+        self.assertTrue(validate_entity_type("1"), "Option '1' should be valid")
+        self.assertTrue(validate_entity_type("2"), "Option '2' should be valid")
+        self.assertTrue(validate_entity_type("3"), "Option '3' should be valid")
+        self.assertFalse(validate_entity_type("4"), "Option '4' should be invalid")
+
+    def test_validate_property_type(self):
+        self.assertTrue(validate_property_type("1"), "Option '1' should be valid")
+        self.assertTrue(validate_property_type("2"), "Option '2' should be valid")
+        self.assertFalse(validate_property_type("5"), "Option '5' should be invalid")
+
+    def test_validate_property_location(self):
+        self.assertTrue(validate_property_location("1"), "Option '1' should be valid")
+        self.assertTrue(validate_property_location("2"), "Option '2' should be valid")
+        self.assertFalse(validate_property_location("4"), "Option '4' should be invalid")
+
+    def test_validate_property_status_input(self):
+        self.assertTrue(validate_property_status_input("1"), "Option '1' should be valid")
+        self.assertTrue(validate_property_status_input("2"), "Option '2' should be valid")
+        self.assertFalse(validate_property_status_input("3"), "Option '3' should be invalid")
+
+    def test_validate_type_of_facility_applying_input(self):
+        self.assertTrue(validate_type_of_facility_applying_input("1"), "Option '1' should be valid")
+        self.assertTrue(validate_type_of_facility_applying_input("2"), "Option '2' should be valid")
+        self.assertFalse(validate_type_of_facility_applying_input("3"), "Option '3' should be invalid")
+
+    def test_get_debt_to_sales_ratio(self):
+        self.assertAlmostEqual(get_debt_to_sales_ratio(50000, 100000), 50.0, msg="Ratio should be 50.0%")
+        self.assertAlmostEqual(get_debt_to_sales_ratio(20000, 50000), 40.0, msg="Ratio should be 40.0%")
+
+    def test_get_loan_to_valuation(self):
+        self.assertAlmostEqual(get_loan_to_valuation_ratio(50000, 100000), 50.0, msg="Ratio should be 50.0%")
+        self.assertAlmostEqual(get_loan_to_valuation_ratio(20000, 50000), 40.0, msg="Ratio should be 40.0%")
+
+    def test_get_debt_to_income_ratio(self):
+        self.assertAlmostEqual(get_debt_to_income_ratio(50000, 100000), 50.0, msg="Ratio should be 50.0%")
+        self.assertAlmostEqual(get_debt_to_income_ratio(20000, 50000), 40.0, msg="Ratio should be 40.0%")
+
+    def test_get_debt_sales_ratio_score(self):
+        self.assertEqual(get_debt_sales_ratio_score(75), 0, "Ratio > 70% should return 0")
+        self.assertEqual(get_debt_sales_ratio_score(65), 4, "Ratio between 60-70% should return 4")
+        self.assertEqual(get_debt_sales_ratio_score(50), 3, "Ratio between 50-59% should return 3")
+        self.assertEqual(get_debt_sales_ratio_score(30), 1, "Ratio < 40% should return 1")
+
+    def test_get_to_income_ratio_score(self):
+        self.assertEqual(get_to_income_ratio_score(60), 0, "Ratio > 55% should return 0")
+        self.assertEqual(get_to_income_ratio_score(50), 3, "Ratio between 35-55% should return 3")
+        self.assertEqual(get_to_income_ratio_score(20), 1, "Ratio < 35% should return 1")
+
+    def test_get_loan_to_valuation_ratio_score(self):
+        self.assertEqual(get_loan_to_valuation_ratio_score(85), 0, "Ratio > 80% should return 0")
+        self.assertEqual(get_loan_to_valuation_ratio_score(75), 2, "Ratio between 60-79% should return 2")
+        self.assertEqual(get_loan_to_valuation_ratio_score(50), 1, "Ratio < 60% should return 1")
+
+    def test_calculate_score_and_update_status(self):
+        borrower_credit_analysis = BorrowerCreditAnalysis()
+
+        borrower_credit_analysis.get_borrower_information_details_score = lambda: 10
+        borrower_credit_analysis.get_financial_details_score = lambda: 5
+        borrower_credit_analysis.get_collateral_details_score = lambda: 3
+        borrower_credit_analysis.get_facility_details_score = lambda: 3
+        borrower_credit_analysis.min_total_credit_score = 20
+
+        borrower_credit_analysis.calculate_score_and_update_status()
+        self.assertEqual(
+            borrower_credit_analysis.borrower_analysis_status, BorrowStatus.REJECTED,
+            "Score >= min_total_credit_score should set status to REJECTED"
+        )
+
+        borrower_credit_analysis.get_borrower_information_details_score = lambda: 9
+        borrower_credit_analysis.get_financial_details_score = lambda: 5
+        borrower_credit_analysis.get_collateral_details_score = lambda: 3
+        borrower_credit_analysis.get_facility_details_score = lambda: 2
+
+        borrower_credit_analysis.calculate_score_and_update_status()
+        self.assertEqual(
+            borrower_credit_analysis.borrower_analysis_status, BorrowStatus.ACCEPTED,
+            "Score < min_total_credit_score should set status to ACCEPTED"
+        )
+
+    def test_display_rejection_reasons(self):
+        borrower_credit_analysis = BorrowerCreditAnalysis()
+        borrower_credit_analysis.rejection_reasons.append("Debt-to-sales ratio exceeds 70%.")
+        self.assertIn("Debt-to-sales ratio exceeds 70%.",
+                      borrower_credit_analysis.get_rejection_results()['rejection_reasons'])
+
+    @patch('builtins.input', side_effect=["50000", "100000", "200000"])
+    def test_financial_details_inputs(self, mock_input):
+        details = financial_details()
+        self.assertEqual(details[0], 50000, "Total debt input mismatch")
+        self.assertEqual(details[1], 100000, "Gross income input mismatch")
+        self.assertEqual(details[2], 200000, "Total sales input mismatch")
+
+    @patch('builtins.input', side_effect=["1", "2", "3", "4"])
+    def test_property_inputs(self, mock_input):
+        location_of_property = input_location_of_property()
+        self.assertEqual(location_of_property, property_location_dic["1"], "Location property input mismatch")
+
+        type_of_property = input_type_of_property()
+        self.assertEqual(type_of_property, property_type_dic["2"], "Property type input mismatch")
+
+    @patch('builtins.input', side_effect=["1", "50000", "75000"])
+    def test_facility_inputs(self, mock_input):
+        type_of_facility, applied_loan_amount = facility_details()
+        self.assertEqual(type_of_facility, type_of_facility_applying_dic["1"], "Facility type mismatch")
+        self.assertEqual(applied_loan_amount, 50000, "Loan amount mismatch")
+
+
+class TestScorecard(unittest.TestCase):
+
+    def test_band_gaps_are_closed(self):
+        self.assertEqual(get_debt_sales_ratio_score(59.5), 3, "Ratio between 59-60% should return 3")
+        self.assertEqual(get_debt_sales_ratio_score(49.5), 3, "Ratio between 49-50% should return 3")
+        self.assertEqual(get_loan_to_valuation_ratio_score(79.5), 2, "Ratio between 79-80% should return 2")
+
+    def test_band_edges(self):
+        self.assertEqual(get_debt_sales_ratio_score(70), 4, "Ratio of exactly 70% should return 4")
+        self.assertEqual(get_debt_sales_ratio_score(70.000001), 0, "Ratio just above 70% should return 0")
+        self.assertEqual(get_debt_sales_ratio_score(40), 3, "Ratio of exactly 40% should return 3")
+        self.assertEqual(get_to_income_ratio_score(55), 3, "Ratio of exactly 55% should return 3")
+        self.assertEqual(get_loan_to_valuation_ratio_score(80), 2, "Ratio of exactly 80% should return 2")
+        self.assertEqual(get_loan_to_valuation_ratio_score(60), 2, "Ratio of exactly 60% should return 2")
+
+    def test_band_index(self):
+        bands = DEFAULT_SCORECARD.debt_to_sales_bands
+        self.assertEqual([bands.band_index(ratio) for ratio in (10, 45, 55, 65, 75)], [0, 1, 2, 3, 4])
+
+    def test_exact_band_edges(self):
+        bands = DEFAULT_SCORECARD.debt_to_income_bands
+        self.assertEqual(bands.score_exact(55, 100), 3, "Exactly 55% should return 3")
+        self.assertEqual(bands.score_exact(550001, 1000000), 0, "Just above 55% should return 0")
+        self.assertEqual(bands.score_exact(35, 100), 3, "Exactly 35% should return 3")
+        self.assertEqual(bands.score_exact(3499999, 10000000), 1, "Just below 35% should return 1")
+        self.assertEqual(bands.score_exact(5, 0), 1, "A zero denominator counts as a ratio of 0")
+        # 55 / 100 * 100 is 55.00000000000001 in floating point
+        self.assertEqual(get_to_income_ratio_score(get_debt_to_income_ratio(55, 100)), 0)
+
+    def test_exact_band_index_matches_float_away_from_edges(self):
+        bands = DEFAULT_SCORECARD.debt_to_sales_bands
+        for numerator, denominator in ((1, 3), (2, 3), (45, 100), (123456, 200000), (7, 9), (10 ** 9, 1)):
+            self.assertEqual(bands.band_index_exact(numerator, denominator),
+                             bands.band_index(get_debt_to_sales_ratio(numerator, denominator)))
+
+    def test_exact_decimal_edges(self):
+        bands = BandTable(1, [(39.5, 2, False), (55.1, 0, True)])
+        self.assertEqual(bands.basis_point_edges, ((3950, 1, False), (5510, 1, True)))
+        self.assertEqual([bands.band_index_exact(numerator, 1000) for numerator in (394, 395, 551, 552)], [0, 1, 1, 2])
+
+    def test_ratio_band_reports_exact_ratio(self):
+        band = get_debt_to_sales_band(1, 3)
+        self.assertEqual((band.numerator, band.denominator, band.band, band.points), (1, 3, 0, 1))
+        self.assertEqual((band.basis_points, band.remainder), (3333, 1))
+        self.assertEqual(get_loan_to_valuation_band(80, 100).points, 2)
+        self.assertEqual(get_debt_to_income_band(1, 0).basis_points, 0)
+
+    def test_borrower_cube_covers_every_combination(self):
+        for entity_type in EntityType:
+            for bank_status in ClientBankStatus:
+                for guarantors in range(8):
+                    for history in ("A", "b", "C", "AB", "D", "xyz"):
+                        for age in (20, 40, 66):
+                            borrower = Borrower("John Doe", entity_type, bank_status, guarantors, age, history)
+                            section = evaluate_borrower_section(borrower, DEFAULT_SCORECARD, 12)
+                            score = (get_entity_type_score(entity_type) + get_bank_status_score(bank_status) +
+                                     get_guarantor_score(guarantors) + get_grade_history_score(history.upper()))
+                            self.assertEqual(section.score, score, f"{borrower}")
+                            self.assertEqual(bool(section.reasons & RejectionReason.BORROWING_HISTORY),
+                                             invalid_borrow_history_grade(history))
+                            self.assertEqual(bool(section.reasons & RejectionReason.GUARANTOR_AGE),
+                                             invalid_guarantors_age(age))
+                            self.assertEqual(bool(section.reasons & RejectionReason.NO_GUARANTORS), guarantors < 1)
+                            self.assertEqual(bool(section.reasons & RejectionReason.BORROWER_SCORE), score >= 12)
+
+    def test_collateral_cube_covers_every_combination(self):
+        for type_of_property in TypeProperty:
+            for location in LocationProperty:
+                for status in CurrentPropertyStatus:
+                    section = evaluate_collateral_section(CollateralDetails(100000, type_of_property, status, location),
+                                                          DEFAULT_SCORECARD, 5)
+                    score = type_of_property.value + location.value
+                    expected = NO_REJECTION
+                    if status == CurrentPropertyStatus.UNDER_CONSTRUCTION:
+                        expected |= RejectionReason.UNDER_CONSTRUCTION
+                    if score >= 5:
+                        expected |= RejectionReason.COLLATERAL_SCORE
+                    self.assertEqual((section.score, section.reasons), (score, expected))
+
+    def test_section_cubes_are_built_once_per_threshold(self):
+        self.assertIs(DEFAULT_SCORECARD.borrower_cube(15), DEFAULT_SCORECARD.borrower_cube(15))
+        self.assertIsNot(DEFAULT_SCORECARD.collateral_cube(5), DEFAULT_SCORECARD.collateral_cube(6))
+
+    def test_band_edges_must_ascend(self):
+        with self.assertRaises(ValueError):
+            BandTable(1, [(60, 2, False), (40, 3, False)])
+
+    def test_guarantor_points_beyond_table(self):
+        self.assertEqual(get_guarantor_score(0), 1, "No guarantors should give a score of 1")
+        self.assertEqual(get_guarantor_score(12), 1, "More than 4 guarantors should give a score of 1")
+
+    def test_unknown_grade_scores_zero(self):
+        self.assertEqual(get_grade_history_score("D"), 0, "Grade D should give a score of 0")
+
+    def test_analysis_scores_through_custom_scorecard(self):
+        scorecard = Scorecard(
+            entity_type_points={entity: 0 for entity in EntityType},
+            bank_status_points={status: 0 for status in ClientBankStatus},
+            guarantor_points=(0,),
+            grade_points={},
+            property_type_points={property_type: 0 for property_type in TypeProperty},
+            property_location_points={location: 0 for location in LocationProperty},
+            facility_type_points={facility: 0 for facility in TypeFacilityApplying},
+            debt_to_sales_bands=BandTable(1, [(90, 0, True)]),
+            debt_to_income_bands=BandTable(1, []),
+            loan_to_valuation_bands=BandTable(1, []),
+        )
+        analysis = BorrowerCreditAnalysis(
+            Borrower("John Doe", EntityType.SOLE_PROPRIETORSHIP, ClientBankStatus.NEW_BANK, 1, 30, "A"),
+            FinancialDetails(80000, 100000, 100000, 80.0, 80.0),
+            CollateralDetails(100000, TypeProperty.OTHER, CurrentPropertyStatus.COMPLETED, LocationProperty.URBAN),
+            FacilityDetails(TypeFacilityApplying.REVOLVING_CREDIT, 90000, 90.0),
+            scorecard=scorecard)
+        self.assertEqual(analysis.calculate_score_and_update_status(), 3, "Only the ratio bands should score")
+        self.assertEqual(analysis.borrower_analysis_status, BorrowStatus.ACCEPTED,
+                         "80% debt-to-sales is within the custom bands")
+
+
+class TestSectionResults(unittest.TestCase):
+
+    def test_each_section_is_evaluated_once(self):
+        analysis = make_credit_analysis()
+        with patch(f"{MODULE_NAME}.evaluate_financial_section", wraps=evaluate_financial_section) as evaluate:
+            analysis.calculate_score_and_update_status()
+            analysis.get_rejection_results()
+            analysis.evaluate()
+            analysis.calculate_score_and_update_status()
+        self.assertEqual(evaluate.call_count, 1, "The financial section should be evaluated exactly once")
+
+    @patch('builtins.print')
+    def test_summaries_do_not_duplicate_reasons(self, mock_print):
+        analysis = make_credit_analysis(borrowing_history="D")
+        analysis.calculate_score_and_update_status()
+        analysis.borrower_details_summary()
+        analysis.borrower_details_summary()
+        analysis.calculate_score_and_update_status()
+        self.assertEqual(analysis.get_rejection_results()['rejection_reasons'],
+                         ["Only borrowing history A,B or C are accepted.", "Debt-to-sales ratio exceeds 70%.",
+                          "Debt-to-income ratio exceeds 55%.", "Loan-to-valuation ratio exceeds 80%."],
+                         "Every reason should be reported once, in section order")
+
+    def test_financial_section_keeps_ratios(self):
+        section = make_credit_analysis(current_total_debt=50000).financial_section()
+        self.assertEqual((section.debt_to_sales_ratio, section.debt_to_income_ratio), (50.0, 50.0))
+        self.assertEqual((section.score, section.rejected), (6, False))
+
+    def test_section_result_is_immutable(self):
+        section = make_credit_analysis().borrower_section()
+        with self.assertRaises(AttributeError):
+            section.score = 0
+
+    def test_cache_follows_inputs_and_thresholds(self):
+        analysis = make_credit_analysis(current_total_debt=50000)
+        self.assertFalse(analysis.financial_section().rejected, "A score of 6 is below the default threshold of 7")
+        analysis.min_financial_details_score = 6
+        self.assertTrue(analysis.financial_section().rejected, "A lower threshold should re-score the section")
+        analysis.borrower_financial_details = FinancialDetails(10000, 100000, 100000, 10.0, 10.0)
+        self.assertEqual(analysis.financial_section().score, 2, "New details should re-score the section")
+
+    def test_evaluate_does_not_change_the_analysis(self):
+        analysis = make_credit_analysis(current_total_debt=30000, applied_loan_amount=50000)
+        decision = analysis.evaluate()
+        self.assertEqual(decision.status, BorrowStatus.ACCEPTED, "Low risk application should be accepted")
+        self.assertEqual(decision.total_credit_score, 14, "Total score mismatch")
+        self.assertEqual(analysis.borrower_analysis_status, BorrowStatus.IN_PROGRESS, "Status should not change")
+        self.assertEqual(analysis.total_credit_score, 0, "Total should not change")
+
+    def test_evaluate_staged_stops_at_first_rejection(self):
+        decision = make_credit_analysis(borrowing_history="D").evaluate_staged()
+        self.assertEqual(decision.status, BorrowStatus.REJECTED, "Grade D history should reject")
+        self.assertEqual(decision.rejected_stage, "borrower", "The borrower section should reject")
+        self.assertEqual(decision.sections[1:], (None, None, None), "Later sections should be skipped")
+        self.assertEqual(decision.rejection_reasons, ["Only borrowing history A,B or C are accepted."])
+
+    def test_evaluate_staged_matches_evaluate(self):
+        analysis = make_credit_analysis(current_total_debt=30000, applied_loan_amount=50000)
+        self.assertEqual(analysis.evaluate_staged(), analysis.evaluate(), "Accepted applications score every section")
+        analysis.min_total_credit_score = 10
+        self.assertEqual(analysis.evaluate_staged().rejected_stage, "total", "Only the total threshold rejects")
+
+    def test_reasons_are_bit_flags(self):
+        decision = make_credit_analysis(borrowing_history="D").evaluate()
+        self.assertEqual(decision.borrower.reasons, RejectionReason.BORROWING_HISTORY,
+                         "Grade D history should set only its own bit")
+        self.assertTrue(decision.reasons & RejectionReason.DEBT_TO_SALES, "Section bits should be ORed together")
+        self.assertFalse(decision.reasons & RejectionReason.TOTAL_SCORE, "The total is below its threshold")
+        self.assertEqual(decision.rejection_reasons, list(rejection_messages(int(decision.reasons))),
+                         "Messages should follow the flags")
+
+    def test_threshold_bits_have_no_message(self):
+        analysis = make_credit_analysis(current_total_debt=50000)
+        analysis.min_financial_details_score = 6
+        section = analysis.financial_section()
+        self.assertEqual(section.reasons, RejectionReason.FINANCIAL_SCORE, "Only the threshold should reject")
+        self.assertTrue(section.rejected, "A threshold bit rejects the section")
+        self.assertEqual(section.rejection_reasons, (), "Threshold rejections have no message")
+
+    def test_concurrent_evaluation(self):
+        analysis = make_credit_analysis(borrowing_history="D")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            decisions = list(executor.map(lambda _: analysis.evaluate(), range(64)))
+        self.assertEqual(len(set(decisions)), 1, "Every thread should see the same decision")
+        self.assertEqual(decisions[0].status, BorrowStatus.REJECTED, "Grade D history should reject")
+
+
+class TestResult(TextTestResult):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.test_cases = []
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self.test_cases.append(f"{test} - PASSED")
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self.test_cases.append(f"{test} - FAILED")
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self.test_cases.append(f"{test} - ERROR")
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self.test_cases.append(f"{test} - SKIPPED")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from credit_aggregate import Histogram, PortfolioAggregate, aggregate_dataset
+from credit_batch import build_credit_analysis, main as batch_main, score_record
+from credit_benchmark import synthetic_records
+from credit_columnar import import_records, score_dataset
+from credit_vectorized import columns_from_analyses, score_columns
+from test_credit_batch import make_record, to_csv
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_quantiles_and_outside_values(self):
+        histogram = Histogram(bins=10)
+        for value in [3, 1, 2, 2, 9, -4, 25]:
+            histogram.add(value)
+        self.assertEqual(histogram.total, 7)
+        self.assertEqual(histogram.quantile(0.5), 2)
+        self.assertEqual(histogram.quantile(0.0), 0, "Values below the bins report the lowest edge")
+        self.assertEqual(histogram.quantile(1.0), 10, "Values above the bins report the overflow edge")
+        self.assertEqual(histogram.to_dict(), {"<0": 1, "1": 1, "2": 2, "3": 1, "9": 1, "10": 1})
+        self.assertIsNone(Histogram().quantile(0.5))
+
+    def test_add_array_matches_add(self):
+        values = [0, 5, 5, 7, 13, -1, 40]
+        one_by_one = Histogram(bins=8, low=0, width=2)
+        for value in values:
+            one_by_one.add(value)
+        at_once = Histogram(bins=8, low=0, width=2)
+        at_once.add_array(values)
+        self.assertEqual(at_once.counts, one_by_one.counts)
+
+    def test_merge_needs_the_same_bins(self):
+        with self.assertRaises(ValueError):
+            Histogram(bins=10).merge(Histogram(bins=12))
+
+
+class TestPortfolioAggregate(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.records = list(synthetic_records(500, seed=9))
+        cls.decisions = [score_record(record, row) for row, record in enumerate(cls.records, 1)]
+
+    def aggregate_records(self, records, decisions) -> PortfolioAggregate:
+        aggregate = PortfolioAggregate()
+        for record, decision in zip(records, decisions):
+            aggregate.add(record, decision)
+        return aggregate
+
+    def assert_same_report(self, report: dict, expected: dict):
+        # the ratio sums are added up in a different order
+        means = report.pop("mean_ratios")
+        for name, mean in expected.pop("mean_ratios").items():
+            self.assertAlmostEqual(means[name], mean, places=9, msg=name)
+        self.assertEqual(report, expected)
+
+    def test_counts(self):
+        aggregate = self.aggregate_records(self.records, self.decisions)
+        accepted = sum(decision["status"] == "ACCEPTED" for decision in self.decisions)
+        self.assertEqual((aggregate.rows, aggregate.accepted, aggregate.rejected), (500, accepted, 500 - accepted))
+        totals = sorted(decision["total_credit_score"] for decision in self.decisions)
+        self.assertEqual(aggregate.quantile(0.5), totals[249], "Integer score quantiles should be exact")
+        report = aggregate.to_dict()
+        self.assertEqual(sum(report["score_histograms"]["borrower_score"].values()), 500)
+        self.assertEqual(sum(counts["applications"] for counts in report["breakdowns"]["entity_type"].values()), 500)
+        expected_mean = sum(float(record["current_total_debt"]) / float(record["gross_income"]) * 100
+                            for record in self.records) / 500
+        self.assertAlmostEqual(report["mean_ratios"]["debt_to_income_ratio"], expected_mean)
+
+    def test_merged_parts_equal_the_whole(self):
+        whole = self.aggregate_records(self.records, self.decisions)
+        merged = self.aggregate_records(self.records[:120], self.decisions[:120]).merge(
+            self.aggregate_records(self.records[120:], self.decisions[120:]))
+        self.assert_same_report(merged.to_dict(), whole.to_dict())
+
+    def test_columns_agree_with_records(self):
+        columns = columns_from_analyses([build_credit_analysis(record) for record in self.records])
+        from_columns = PortfolioAggregate()
+        for start in range(0, 500, 150):
+            chunk = {name: values[start:start + 150] for name, values in columns.items()}
+            from_columns.add_columns(chunk, score_columns(**chunk))
+        self.assert_same_report(from_columns.to_dict(),
+                                self.aggregate_records(self.records, self.decisions).to_dict())
+
+    def test_invalid_and_staged_decisions(self):
+        # rejected at the borrower stage, so the broken facility fields are never read
+        staged = make_record(borrowing_history="D", type_of_facility_applying="9")
+        records = [make_record(gross_income="lots"), staged]
+        aggregate = self.aggregate_records(records, [score_record(records[0], 1),
+                                                     score_record(staged, 2, staged=True)])
+        self.assertEqual((aggregate.invalid, aggregate.rejected), (1, 1))
+        report = aggregate.to_dict()
+        self.assertEqual(report["rejection_reasons"]["BORROWING_HISTORY"], 1)
+        self.assertEqual(report["breakdowns"]["entity_type"]["COMPANY_LIMITED"]["applications"], 1)
+        self.assertEqual(sum(counts["applications"]
+                             for counts in report["breakdowns"]["type_of_facility_applying"].values()), 0)
+        self.assertIsNone(report["mean_ratios"]["loan_to_valuation_ratio"])
+
+    def test_staged_breakdowns_match_full_scoring(self):
+        staged = self.aggregate_records(self.records, [score_record(record, row, staged=True)
+                                                       for row, record in enumerate(self.records, 1)])
+        full = self.aggregate_records(self.records, self.decisions)
+        self.assertEqual(staged.to_dict()["breakdowns"], full.to_dict()["breakdowns"],
+                         "Approval rates by facility type should not depend on the stage an application reached")
+
+    def test_dataset_workers_merge(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "portfolio.cols")
+            import_records(self.records, path)
+            with self.assertRaises(ValueError):
+                aggregate_dataset(path)
+            score_dataset(path)
+            serial = aggregate_dataset(path, workers=1, chunk_size=90)
+            parallel = aggregate_dataset(path, workers=2, chunk_size=90)
+        self.assert_same_report(parallel.to_dict(), serial.to_dict())
+        self.assertEqual(serial.accepted, sum(decision["status"] == "ACCEPTED" for decision in self.decisions))
+
+    def test_batch_report_option(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "applications.csv")
+            report_path = os.path.join(directory, "report.json")
+            with open(input_path, "w", newline="", encoding="utf-8") as stream:
+                stream.write(to_csv([make_record(), make_record(borrowing_history="D")]))
+            with contextlib.redirect_stderr(io.StringIO()):
+                batch_main([input_path, os.path.join(directory, "decisions.csv"), "--report", report_path])
+            with open(report_path, encoding="utf-8") as stream:
+                report = json.load(stream)
+        self.assertEqual((report["accepted"], report["rejected"]), (1, 1))
+        self.assertEqual(report["approval_rate"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
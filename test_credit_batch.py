@@ -0,0 +1,171 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from credit_batch import (
+    build_credit_analysis, score_record, score_records, score_stream, read_records, run_batch, detect_format,
+    InvalidRecordError, INPUT_FIELDS, INVALID_STATUS,
+)
+
+
+def make_record(**overrides):
+    record = {
+        "full_name": "John Doe",
+        "entity_type": "3",
+        "bank_status": "2",
+        "number_of_guarantors": "3",
+        "age_of_guarantors": "40",
+        "borrowing_history": "A",
+        "current_total_debt": "20000",
+        "gross_income": "100000",
+        "total_sales_per_year": "100000",
+        "current_market_value": "200000",
+        "type_of_property": "1",
+        "current_property_status": "2",
+        "location_of_the_property": "1",
+        "type_of_facility_applying": "2",
+        "applied_loan_amount": "100000",
+    }
+    record.update(overrides)
+    return record
+
+
+def to_csv(records):
+    lines = [",".join(INPUT_FIELDS)]
+    for record in records:
+        lines.append(",".join(record[field] for field in INPUT_FIELDS))
+    return "\n".join(lines) + "\n"
+
+
+class TestCreditBatch(unittest.TestCase):
+
+    def test_build_credit_analysis_matches_interactive_objects(self):
+        analysis = build_credit_analysis(make_record())
+        self.assertEqual(analysis.borrower_information_details.full_name, "John Doe", "Name mismatch")
+        self.assertEqual(analysis.borrower_financial_details.debt_to_sales_ration, 20.0, "Debt-to-sales mismatch")
+        self.assertEqual(analysis.borrower_facility_details.loan_to_valuation, 50.0, "LTV mismatch")
+
+    def test_invalid_record_raises(self):
+        with self.assertRaises(InvalidRecordError):
+            build_credit_analysis(make_record(full_name="123 John"))
+        with self.assertRaises(InvalidRecordError):
+            build_credit_analysis(make_record(entity_type="9"))
+        with self.assertRaises(InvalidRecordError):
+            build_credit_analysis(make_record(current_total_debt="-5"))
+
+    def test_score_record_accepted(self):
+        decision = score_record(make_record(), row=1)
+        self.assertEqual(decision["status"], "ACCEPTED", "Low risk application should be accepted")
+        self.assertEqual(decision["total_credit_score"], 13, "Total score mismatch")
+        self.assertEqual(decision["rejection_reasons"], [], "No rejection reasons expected")
+
+    def test_score_record_section_rejection_is_final(self):
+        decision = score_record(make_record(borrowing_history="D"))
+        self.assertEqual(decision["status"], "REJECTED", "Grade D history should reject even with a low total")
+        self.assertIn("Only borrowing history A,B or C are accepted.", decision["rejection_reasons"])
+
+    def test_score_record_invalid_row(self):
+        decision = score_record(make_record(number_of_guarantors="abc"), row=7)
+        self.assertEqual(decision["status"], INVALID_STATUS, "Bad input should be reported as invalid")
+        self.assertEqual(decision["row"], 7, "Row number should be kept")
+        self.assertIn("number_of_guarantors", decision["error"])
+
+    def test_digits_int_cannot_read_are_invalid(self):
+        for value in ("²", "①", "3²"):
+            decision = score_record(make_record(number_of_guarantors=value), row=2)
+            self.assertEqual(decision["status"], INVALID_STATUS, f"{value!r} should make the row invalid")
+            self.assertIn("number_of_guarantors", decision["error"])
+
+    def test_oversized_amounts_are_invalid(self):
+        huge = "9" * 400
+        records = [make_record(current_total_debt=huge), make_record(), make_record(applied_loan_amount=huge),
+                   make_record(gross_income=str(2 ** 63))]
+        for staged in (False, True):
+            decisions = list(score_records(records, staged=staged))
+            self.assertEqual([d["status"] for d in decisions], [INVALID_STATUS, "ACCEPTED", INVALID_STATUS,
+                                                                INVALID_STATUS], f"staged={staged}")
+            self.assertIn("current_total_debt", decisions[0]["error"])
+        self.assertEqual(score_record(make_record(gross_income=str(2 ** 63 - 1)))["status"], "ACCEPTED",
+                         "The largest int64 amount is still valid")
+
+    def test_malformed_jsonl_lines_are_invalid_rows(self):
+        lines = [json.dumps(make_record()), "{not json", "[1, 2]", json.dumps(make_record(borrowing_history="D"))]
+        output = io.StringIO()
+        stats = score_stream(io.StringIO("\n".join(lines) + "\n"), output, "jsonl", "jsonl")
+        decisions = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([d["status"] for d in decisions], ["ACCEPTED", INVALID_STATUS, INVALID_STATUS, "REJECTED"])
+        self.assertIn("Line 2 is not valid JSON", decisions[1]["error"])
+        self.assertIn("Line 3 is not a JSON object", decisions[2]["error"])
+        self.assertEqual((stats.rows, stats.invalid), (4, 2))
+
+    def test_score_stream_csv_to_jsonl(self):
+        records = [make_record(), make_record(borrowing_history="D"), make_record(age_of_guarantors="x")]
+        output = io.StringIO()
+        stats = score_stream(io.StringIO(to_csv(records)), output, "csv", "jsonl")
+        decisions = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([d["status"] for d in decisions], ["ACCEPTED", "REJECTED", INVALID_STATUS])
+        self.assertEqual((stats.rows, stats.accepted, stats.rejected, stats.invalid), (3, 1, 1, 1))
+
+    def test_read_jsonl_accepts_numbers(self):
+        record = make_record(number_of_guarantors=3, current_total_debt=20000)
+        records = list(read_records(io.StringIO(json.dumps(record) + "\n\n"), "jsonl"))
+        self.assertEqual(len(records), 1, "Blank lines should be skipped")
+        self.assertEqual(score_record(records[0])["status"], "ACCEPTED", "Numeric JSON values should be accepted")
+
+    def test_run_batch_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "applications.csv")
+            output_path = os.path.join(directory, "decisions.csv")
+            with open(input_path, "w", newline="", encoding="utf-8") as stream:
+                stream.write(to_csv([make_record()] * 5))
+            stats = run_batch(input_path, output_path)
+            with open(output_path, encoding="utf-8") as stream:
+                lines = stream.read().splitlines()
+        self.assertEqual(stats.rows, 5, "All rows should be scored")
+        self.assertEqual(len(lines), 6, "Header plus one line per decision expected")
+        self.assertGreater(stats.rows_per_second, 0, "Throughput should be reported")
+
+    def test_staged_stops_at_first_rejection(self):
+        decision = score_record(make_record(borrowing_history="D"), staged=True)
+        self.assertEqual(decision["status"], "REJECTED", "Grade D history should reject")
+        self.assertEqual(decision["rejected_stage"], "borrower", "The borrower stage should reject")
+        self.assertIsNone(decision["financial_score"], "Later stages should not be scored")
+        self.assertIsNone(decision["total_credit_score"], "No total for a short-circuited application")
+        self.assertEqual(decision["rejection_reasons"], ["Only borrowing history A,B or C are accepted."])
+
+    def test_staged_does_not_decode_later_stages(self):
+        record = make_record(borrowing_history="D", current_market_value="not a number")
+        self.assertEqual(score_record(record, staged=True)["status"], "REJECTED",
+                         "Fields of skipped stages should not be validated")
+        self.assertEqual(score_record(record)["status"], INVALID_STATUS, "The full evaluation validates every field")
+
+    def test_staged_matches_full_status(self):
+        records = [make_record(borrowing_history=history, current_total_debt=debt, applied_loan_amount=loan,
+                               current_property_status=status)
+                   for history in ("A", "C", "D") for debt in ("20000", "60000", "90000")
+                   for loan in ("50000", "150000", "170000") for status in ("1", "2")]
+        full = [decision["status"] for decision in score_records(records)]
+        staged = [decision["status"] for decision in score_records(records, staged=True)]
+        self.assertEqual(staged, full, "Early exit must not change any decision")
+
+    def test_stage_counts(self):
+        records = [make_record(), make_record(borrowing_history="D"), make_record(current_total_debt="90000"),
+                   make_record(current_property_status="1"), make_record(applied_loan_amount="170000"),
+                   make_record(full_name="")]
+        stats = score_stream(io.StringIO(to_csv(records)), io.StringIO(), "csv", "csv",
+                             scorer=lambda rows: score_records(rows, staged=True))
+        self.assertEqual(stats.stage_passed, {"borrower": 4, "financial": 3, "collateral": 2, "facility": 1})
+        self.assertEqual(stats.stage_rejected, {"borrower": 1, "financial": 1, "collateral": 1, "facility": 1})
+        self.assertIn("collateral", stats.summary())
+
+    def test_detect_format(self):
+        self.assertEqual(detect_format("a.CSV"), "csv")
+        self.assertEqual(detect_format("a.jsonl"), "jsonl")
+        with self.assertRaises(ValueError):
+            detect_format("a.txt")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import random
+import tempfile
+import unittest
+
+from credit_batch import score_records, INVALID_STATUS
+from credit_benchmark import (
+    BenchmarkResult, synthetic_records, synthetic_record, run_benchmarks, write_results, read_results,
+    compare_results, main,
+)
+
+
+class TestCreditBenchmark(unittest.TestCase):
+
+    def test_synthetic_records_are_valid_and_mixed(self):
+        statuses = {decision["status"] for decision in score_records(synthetic_records(500))}
+        self.assertNotIn(INVALID_STATUS, statuses, "Synthetic applications should all be valid")
+        self.assertEqual(statuses, {"ACCEPTED", "REJECTED"}, "Both outcomes should be exercised")
+        self.assertEqual(synthetic_record(random.Random(3)), synthetic_record(random.Random(3)),
+                         "The same seed should give the same application")
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(sizes=(200,), min_time=0.001, repeat=1, startup_runs=1)
+        names = {result.name for result in results}
+        self.assertIn("validate_full_name", names)
+        self.assertIn("calculate_score_and_update_status", names)
+        self.assertIn("run_batch[200]", names)
+        self.assertIn("startup[credit_cli]", names)
+        self.assertTrue(all(result.value > 0 for result in results), "Every benchmark should report a speed")
+
+    def test_results_round_trip(self):
+        results = [BenchmarkResult("a", "bands", "ns/call", 100.0, 10, 0.001)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            write_results(path, results)
+            self.assertEqual(read_results(path), results, "Results should survive a round trip")
+
+    def test_compare_results(self):
+        baseline = [BenchmarkResult("call", "bands", "ns/call", 100.0, 1, 1.0),
+                    BenchmarkResult("batch", "batch", "rows/s", 1000.0, 1, 1.0)]
+        faster = [BenchmarkResult("call", "bands", "ns/call", 80.0, 1, 1.0),
+                  BenchmarkResult("batch", "batch", "rows/s", 1200.0, 1, 1.0)]
+        slower = [BenchmarkResult("call", "bands", "ns/call", 130.0, 1, 1.0),
+                  BenchmarkResult("batch", "batch", "rows/s", 700.0, 1, 1.0)]
+        self.assertEqual(compare_results(baseline, faster), [], "Speed-ups are not regressions")
+        self.assertEqual([name for name, *_ in compare_results(baseline, slower)], ["call", "batch"])
+
+    def test_main_flags_regressions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, "baseline.json")
+            write_results(baseline, [BenchmarkResult("validate_full_name", "validators", "ns/call", 0.001, 1, 1.0)])
+            status = main(["--output", os.path.join(directory, "new.json"), "--sizes", "--min-time", "0.001",
+                           "--repeat", "1", "--startup-runs", "0", "--compare", baseline])
+        self.assertEqual(status, 1, "A slower run should fail the comparison")
+
+
+if __name__ == "__main__":
+    unittest.main()
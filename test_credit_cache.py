@@ -0,0 +1,139 @@
+import contextlib
+import gc
+import io
+import os
+import tempfile
+import unittest
+import weakref
+
+import credit_batch
+from MH6803_Required_Group_Project_code_Group1 import BorrowStatus, BandTable, Scorecard, DEFAULT_SCORECARD
+from credit_batch import build_credit_analysis
+from credit_cache import (
+    DecisionCache, LRUCache, SQLiteDecisionStore, application_fingerprint, encode_decision, decode_decision,
+    scorecard_fingerprint,
+)
+from test_credit_batch import make_record, to_csv
+
+
+def custom_scorecard(debt_to_income_bands: BandTable) -> Scorecard:
+    return Scorecard(DEFAULT_SCORECARD.entity_type_points, DEFAULT_SCORECARD.bank_status_points,
+                     DEFAULT_SCORECARD.guarantor_points, DEFAULT_SCORECARD.grade_points,
+                     DEFAULT_SCORECARD.property_type_points, DEFAULT_SCORECARD.property_location_points,
+                     DEFAULT_SCORECARD.facility_type_points, DEFAULT_SCORECARD.debt_to_sales_bands,
+                     debt_to_income_bands, DEFAULT_SCORECARD.loan_to_valuation_bands)
+
+
+class TestCreditCache(unittest.TestCase):
+
+    def test_fingerprint_ignores_name_and_grade_case(self):
+        first = build_credit_analysis(make_record(full_name="John Doe", borrowing_history="a"))
+        second = build_credit_analysis(make_record(full_name="Jane Roe", borrowing_history="A"))
+        self.assertEqual(application_fingerprint(first), application_fingerprint(second),
+                         "Inputs that cannot change the decision should share a key")
+        third = build_credit_analysis(make_record(current_total_debt="20001"))
+        self.assertNotEqual(application_fingerprint(first), application_fingerprint(third))
+
+    def test_thresholds_and_scorecard_change_the_key(self):
+        analysis = build_credit_analysis(make_record())
+        key = application_fingerprint(analysis)
+        analysis.min_total_credit_score = 10
+        self.assertNotEqual(application_fingerprint(analysis), key, "A new threshold should invalidate the entry")
+        analysis.min_total_credit_score = 20
+        analysis.scorecard = custom_scorecard(BandTable(1, [(30, 3, False), (55, 0, True)]))
+        self.assertNotEqual(application_fingerprint(analysis), key, "A new scorecard should invalidate the entry")
+
+    def test_fingerprints_do_not_keep_scorecards_alive(self):
+        scorecard = custom_scorecard(DEFAULT_SCORECARD.debt_to_income_bands)
+        self.assertEqual(scorecard_fingerprint(scorecard), scorecard_fingerprint(DEFAULT_SCORECARD),
+                         "Equal tables should give equal fingerprints")
+        collected = weakref.ref(scorecard)
+        del scorecard
+        gc.collect()
+        self.assertIsNone(collected(), "A replaced scorecard should not be kept by the fingerprint cache")
+
+    def test_cached_decisions_match_fresh_ones(self):
+        cache = DecisionCache()
+        records = [make_record(), make_record(borrowing_history="D"), make_record(current_total_debt="60000")]
+        for record in records * 3:
+            analysis = build_credit_analysis(record)
+            self.assertEqual(cache.evaluate(analysis), build_credit_analysis(record).evaluate())
+        stats = cache.stats()
+        self.assertEqual((stats["misses"], stats["memory_hits"]), (3, 6))
+        self.assertAlmostEqual(stats["hit_rate"], 6 / 9)
+
+    def test_threshold_change_is_not_served_stale(self):
+        cache = DecisionCache()
+        analysis = build_credit_analysis(make_record())
+        self.assertEqual(cache.calculate_score_and_update_status(analysis), 13)
+        self.assertEqual(analysis.borrower_analysis_status, BorrowStatus.ACCEPTED)
+        analysis.min_total_credit_score = 13
+        cache.calculate_score_and_update_status(analysis)
+        self.assertEqual(analysis.borrower_analysis_status, BorrowStatus.REJECTED, "The new threshold should apply")
+
+    def test_encoding_round_trip(self):
+        decision = build_credit_analysis(make_record(borrowing_history="D")).evaluate()
+        self.assertEqual(decode_decision(encode_decision(decision)), decision)
+
+    def test_lru_eviction(self):
+        lru = LRUCache(2)
+        lru.put("a", 1)
+        lru.put("b", 2)
+        lru.get("a")
+        lru.put("c", 3)
+        self.assertEqual((lru.get("a"), lru.get("b"), lru.get("c")), (1, None, 3), "The least recently used goes")
+
+    def test_disk_tier_survives_and_evicts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.sqlite")
+            with DecisionCache(path=path) as cache:
+                cache.evaluate(build_credit_analysis(make_record()))
+            with DecisionCache(path=path) as cache:
+                decision = cache.evaluate(build_credit_analysis(make_record()))
+                self.assertEqual(cache.stats()["disk_hits"], 1, "The decision should come from the file")
+                self.assertEqual(decision.total_credit_score, 13)
+            store = SQLiteDecisionStore(path, max_entries=10)
+            for index in range(25):
+                store.put(f"key{index}", "{}")
+            self.assertLessEqual(len(store), 10, "The file should stay within its size")
+            self.assertIsNotNone(store.get("key24"), "The newest entry should be kept")
+            self.assertIsNone(store.get("key0"), "The oldest entry should be evicted")
+            store.close()
+
+    def test_disk_tier_counts_updates_once(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteDecisionStore(os.path.join(directory, "cache.sqlite"), max_entries=10)
+            for _ in range(3):
+                for index in range(8):
+                    store.put(f"key{index}", "{}")
+            self.assertEqual(len(store), 8, "Putting a key again should not count it again")
+            self.assertIsNotNone(store.get("key0"), "Nothing should be evicted below max_entries")
+            store.close()
+
+    def test_disk_tier_evicts_by_size(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteDecisionStore(os.path.join(directory, "cache.sqlite"), max_bytes=64 * 1024)
+            for index in range(2000):
+                store.put(f"key{index}", "x" * 200)
+            self.assertLessEqual(store.size_bytes(), 64 * 1024, "The used pages should stay within max_bytes")
+            self.assertLess(len(store), 2000, "Old entries should be evicted to make room")
+            self.assertIsNotNone(store.get("key1999"), "The newest entry should be kept")
+            self.assertIsNone(store.get("key0"), "The oldest entry should be evicted")
+            store.close()
+
+    def test_batch_cache_option(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "applications.csv")
+            with open(input_path, "w", newline="", encoding="utf-8") as stream:
+                stream.write(to_csv([make_record()] * 5))
+            arguments = [input_path, os.path.join(directory, "decisions.csv"),
+                         "--cache", os.path.join(directory, "cache.sqlite")]
+            errors = io.StringIO()
+            with contextlib.redirect_stderr(errors):
+                stats = credit_batch.main(arguments)
+        self.assertEqual(stats.accepted, 5, "Cached decisions should be written like fresh ones")
+        self.assertIn("80.0% hits", errors.getvalue(), "Four of the five rows should hit the cache")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from credit_cli import main
+from test_credit_batch import make_record, to_csv
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def modules_loaded_by(statement: str) -> set:
+    output = subprocess.run([sys.executable, "-c", f"import sys; {statement}; print(' '.join(sys.modules))"],
+                            cwd=DIRECTORY, capture_output=True, text=True, check=True).stdout
+    return set(output.split())
+
+
+class TestCreditCli(unittest.TestCase):
+
+    def test_score_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "applications.csv")
+            output_path = os.path.join(directory, "decisions.jsonl")
+            with open(input_path, "w", newline="", encoding="utf-8") as stream:
+                stream.write(to_csv([make_record(), make_record(borrowing_history="D")]))
+            with contextlib.redirect_stderr(io.StringIO()):
+                stats = main(["score", input_path, output_path, "--staged"])
+        self.assertEqual((stats.accepted, stats.rejected), (1, 1), "Options should reach the score command")
+
+    def test_command_help_is_passed_on(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), self.assertRaises(SystemExit):
+            main(["score", "--help"])
+        self.assertIn("--workers", output.getvalue(), "The score command should print its own help")
+
+    def test_unknown_command(self):
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            main(["explode"])
+
+    def test_lean_imports(self):
+        scoring = modules_loaded_by("import credit_batch")
+        self.assertFalse({"locale", "unittest", "argparse", "numpy"} & scoring,
+                         "Scoring should not load the reports, the tests or the argument parser")
+        cli = modules_loaded_by("import credit_cli")
+        self.assertFalse({"argparse", "credit_batch", "MH6803_Required_Group_Project_code_Group1"} & cli,
+                         "The CLI should import nothing before a command is chosen")
+
+
+if __name__ == "__main__":
+    unittest.main()
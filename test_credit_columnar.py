@@ -0,0 +1,184 @@
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+import credit_columnar
+from credit_batch import iter_csv_records
+from credit_benchmark import synthetic_records
+from credit_columnar import (
+    DECISION_DTYPES, ColumnarDataset, ColumnarFormatError, ColumnarWriter, export_records, import_records, main,
+    score_dataset,
+)
+from credit_vectorized import columns_from_analyses, score_columns
+from test_credit_batch import make_record, to_csv
+from test_credit_vectorized import random_analysis
+
+
+class TestCreditColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._directory.name, "portfolio.cols")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_records_round_trip(self):
+        records = list(synthetic_records(300, seed=4))
+        records[7]["full_name"] = "Chloé Müller"
+        written, errors = import_records(records, self.path, buffer_rows=64)
+        self.assertEqual((written, errors), (300, []))
+        dataset = ColumnarDataset(self.path)
+        self.assertEqual(list(dataset.records()), records, "Records should come back as they were imported")
+        self.assertEqual(dataset.full_name(7), "Chloé Müller")
+        self.assertEqual(dataset.full_names(6, 9), [record["full_name"] for record in records[6:9]])
+
+    def test_columns_score_like_the_analyses(self):
+        rng = random.Random(5)
+        analyses = [random_analysis(rng) for _ in range(400)]
+        with ColumnarWriter(self.path) as writer:
+            for analysis in analyses[:150]:
+                writer.append_analysis(analysis)
+        with ColumnarWriter(self.path) as writer:
+            writer.append_columns(columns_from_analyses(analyses[150:]),
+                                  [analysis.borrower_information_details.full_name for analysis in analyses[150:]])
+        dataset = ColumnarDataset(self.path)
+        self.assertEqual(len(dataset), 400)
+        self.assertIsInstance(dataset.arrays["gross_income"], np.memmap, "Columns should be memory-mapped")
+        expected = score_columns(**columns_from_analyses(analyses))
+        scores = score_columns(**dataset.columns())
+        self.assertEqual(scores.reason_flags.tolist(), expected.reason_flags.tolist())
+
+    def test_score_dataset_stores_decisions(self):
+        rng = random.Random(6)
+        analyses = [random_analysis(rng) for _ in range(250)]
+        with ColumnarWriter(self.path) as writer:
+            for analysis in analyses:
+                writer.append_analysis(analysis)
+        self.assertFalse(ColumnarDataset(self.path).scored)
+        for threshold in (20, 16):
+            counts = score_dataset(self.path, chunk_size=100, min_total_credit_score=threshold)
+            expected = score_columns(**columns_from_analyses(analyses), min_total_credit_score=threshold)
+            dataset = ColumnarDataset(self.path)
+            self.assertTrue(dataset.scored)
+            for name in DECISION_DTYPES:
+                self.assertEqual(dataset.decisions[name].tolist(), getattr(expected, name).tolist(), name)
+            self.assertEqual(counts["ACCEPTED"], int((expected.status == 1).sum()))
+
+    def test_interrupted_append_is_cut_off(self):
+        import_records([make_record(full_name="Ann Lee")], self.path)
+        # an append that died after extending the files but before the header
+        for file_name in ("gross_income.col", "full_name.heap", "full_name.offsets"):
+            with open(os.path.join(self.path, file_name), "ab") as stream:
+                stream.write(b"\x07" * 5)
+        self.assertEqual(len(ColumnarDataset(self.path)), 1, "Readers should only see committed rows")
+        import_records([make_record(full_name="Bo Tan", gross_income="5000")], self.path)
+        dataset = ColumnarDataset(self.path)
+        self.assertEqual(dataset.full_names(), ["Ann Lee", "Bo Tan"])
+        self.assertEqual(dataset.arrays["gross_income"].tolist(), [100000, 5000])
+
+    def test_failed_append_writes_nothing(self):
+        rng = random.Random(8)
+        analyses = [random_analysis(rng) for _ in range(30)]
+        columns = columns_from_analyses(analyses)
+        names = [analysis.borrower_information_details.full_name for analysis in analyses]
+        with ColumnarWriter(self.path) as writer:
+            writer.append_columns({name: values[:10] for name, values in columns.items()}, names[:10])
+            short = {name: values[10:20] for name, values in columns.items()}
+            short["gross_income"] = short["gross_income"][:5]
+            with self.assertRaises(ValueError):
+                writer.append_columns(short, names[10:20])
+            writer.append_columns({name: values[20:] for name, values in columns.items()}, names[20:])
+        dataset = ColumnarDataset(self.path)
+        self.assertEqual(len(dataset), 20)
+        for name in ("current_total_debt", "gross_income", "borrowing_history"):
+            expected = np.concatenate([columns[name][:10], columns[name][20:]]).tolist()
+            self.assertEqual(dataset.columns()[name].tolist(), expected, f"{name} should stay aligned")
+        self.assertEqual(dataset.full_names(), names[:10] + names[20:])
+
+    def test_interrupted_write_is_cut_off(self):
+        import_records([make_record(full_name="Ann Lee")], self.path)
+        real_open = open
+
+        def failing_open(file, mode="r", *args, **kwargs):
+            if mode == "ab" and file.endswith("full_name.offsets"):
+                raise OSError("disk full")
+            return real_open(file, mode, *args, **kwargs)
+
+        with ColumnarWriter(self.path) as writer:
+            writer.append_analysis(random_analysis(random.Random(2)))
+            with patch.object(credit_columnar, "open", failing_open, create=True), self.assertRaises(OSError):
+                writer.flush()
+            writer.append_analysis(random_analysis(random.Random(3)))
+        dataset = ColumnarDataset(self.path)
+        self.assertEqual(len(dataset), 2)
+        self.assertEqual(os.path.getsize(os.path.join(self.path, "gross_income.col")), 2 * 8,
+                         "The bytes of the failed write should be truncated")
+        self.assertEqual(dataset.full_names(), ["Ann Lee", "John Doe"])
+
+    def test_export_round_trip(self):
+        records = list(synthetic_records(50, seed=12))
+        import_records(records, self.path)
+        score_dataset(self.path)
+        for output_format in ("csv", "jsonl"):
+            stream = io.StringIO()
+            self.assertEqual(export_records(self.path, stream, output_format, chunk_size=16), 50)
+            stream.seek(0)
+            if output_format == "csv":
+                exported = list(iter_csv_records(stream))
+            else:
+                exported = [json.loads(line) for line in stream]
+            self.assertEqual([{field: str(line[field]) for field in records[0]} for line in exported],
+                             [{field: str(value) for field, value in record.items()} for record in records],
+                             output_format)
+            self.assertTrue(all(line["status"] in ("ACCEPTED", "REJECTED") for line in exported))
+
+    def test_invalid_records_are_skipped(self):
+        written, errors = import_records([make_record(), make_record(gross_income="lots"), make_record(),
+                                          make_record(age_of_guarantors="²")], self.path)
+        self.assertEqual(written, 2)
+        self.assertEqual([row for row, _ in errors], [2, 4])
+
+    def test_decisions_cannot_outnumber_applications(self):
+        import_records([make_record()], self.path)
+        with ColumnarWriter(self.path) as writer, self.assertRaises(ValueError):
+            writer.append_decisions({name: np.zeros(2) for name in DECISION_DTYPES})
+
+    def test_empty_dataset(self):
+        ColumnarWriter(self.path).close()
+        dataset = ColumnarDataset(self.path)
+        self.assertEqual(len(dataset), 0)
+        self.assertEqual(score_columns(**dataset.columns()).status.tolist(), [])
+        self.assertEqual(score_dataset(self.path), {"ACCEPTED": 0, "REJECTED": 0})
+
+    def test_not_a_dataset(self):
+        with self.assertRaises(ColumnarFormatError):
+            ColumnarDataset(self._directory.name)
+
+    def test_command_line_import_score_export(self):
+        input_path = os.path.join(self._directory.name, "applications.csv")
+        output_path = os.path.join(self._directory.name, "decisions.jsonl")
+        with open(input_path, "w", newline="", encoding="utf-8") as stream:
+            stream.write(to_csv([make_record(), make_record(borrowing_history="D")]))
+        with contextlib.redirect_stdout(io.StringIO()):
+            main(["import", input_path, self.path])
+            counts = main(["score", self.path])
+            main(["export", self.path, output_path])
+        self.assertEqual(counts, {"ACCEPTED": 1, "REJECTED": 1})
+        with open(output_path, encoding="utf-8") as stream:
+            lines = [json.loads(line) for line in stream]
+        self.assertEqual([line["status"] for line in lines], ["ACCEPTED", "REJECTED"])
+        with open(input_path, newline="", encoding="utf-8") as stream:
+            original = list(iter_csv_records(stream))
+        self.assertEqual([{field: line[field] for field in original[0]} for line in lines], original)
+
+
+if __name__ == "__main__":
+    unittest.main()
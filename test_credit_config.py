@@ -0,0 +1,198 @@
+import contextlib
+import copy
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    BandTable, BorrowerCreditAnalysis, RejectionReason, Scorecard, DEFAULT_SCORECARD,
+)
+from credit_batch import score_record
+from credit_config import (
+    CompiledScorecard, ScorecardConfigError, ScorecardReloader, compile_config, config_from_scorecard,
+    load_scorecard, main,
+)
+from credit_service import MicroBatcher
+from test_credit_batch import make_record
+from test_credit_vectorized import random_analysis
+
+CUSTOM_TOML = """
+version = "2024-06"
+
+[thresholds]
+min_borrow_info_score = 13
+min_total_credit_score = 18
+
+[points]
+guarantors = [2, 6, 3, 1]
+borrowing_history = { A = 1, B = 3, C = 5, D = 7 }
+
+[bands.debt_to_income]
+base_points = 2
+edges = [{ edge = 30, points = 4 }, { edge = 45.5, points = 0, strict = true }]
+"""
+
+
+def analysis_decision(analysis: BorrowerCreditAnalysis, scorecard: Scorecard, thresholds: dict):
+    return BorrowerCreditAnalysis(analysis.borrower_information_details, analysis.borrower_financial_details,
+                                  analysis.borrower_collateral_detail, analysis.borrower_facility_details,
+                                  scorecard=scorecard, **thresholds).evaluate()
+
+
+class TestCompiledScorecard(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(25)
+        cls.analyses = [random_analysis(rng) for _ in range(2000)]
+
+    def test_default_config_matches_the_analysis(self):
+        compiled = compile_config(config_from_scorecard())
+        self.assertTrue(compiled.default_rules)
+        for analysis in self.analyses:
+            self.assertEqual(compiled.evaluate_analysis(analysis), analysis.evaluate())
+        self.assertEqual(compile_config({}).evaluate_analysis(self.analyses[0]), self.analyses[0].evaluate(),
+                         "Missing tables should fall back to the defaults")
+
+    def test_custom_config_matches_its_scorecard(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "scorecard.toml")
+            with open(path, "w", encoding="utf-8") as stream:
+                stream.write(CUSTOM_TOML)
+            compiled = load_scorecard(path)
+        self.assertEqual(compiled.version, "2024-06")
+        self.assertEqual(compiled.thresholds["min_borrow_info_score"], 13)
+        self.assertEqual(compiled.thresholds["min_facility_score"], 4, "Unset thresholds keep their default")
+        self.assertEqual(compiled.scorecard.debt_to_income_bands.bands, ((30, 4, False), (45.5, 0, True)))
+        self.assertEqual(compiled.scorecard.debt_to_sales_bands.bands, DEFAULT_SCORECARD.debt_to_sales_bands.bands)
+        for analysis in self.analyses:
+            self.assertEqual(compiled.evaluate_analysis(analysis),
+                             analysis_decision(analysis, compiled.scorecard, compiled.thresholds))
+
+    def test_disabled_rules_and_guarantor_ages(self):
+        config = config_from_scorecard()
+        config["reject_rules"].update(borrowing_history=False, under_construction=False, debt_to_income=False,
+                                      guarantor_age={"min": 18, "max": 70})
+        compiled = compile_config(config)
+        self.assertFalse(compiled.default_rules)
+        stripped = RejectionReason.BORROWING_HISTORY | RejectionReason.UNDER_CONSTRUCTION | \
+            RejectionReason.DEBT_TO_INCOME | RejectionReason.GUARANTOR_AGE
+        for analysis in self.analyses:
+            decision = compiled.evaluate_analysis(analysis)
+            expected = analysis.evaluate()
+            age = analysis.borrower_information_details.age_of_guarantors
+            age_reason = RejectionReason.GUARANTOR_AGE if age < 18 or age > 70 else RejectionReason(0)
+            self.assertEqual(decision.reasons, expected.reasons & ~stripped | age_reason)
+            self.assertEqual(decision.total_credit_score, expected.total_credit_score)
+            self.assertEqual(decision.status.name, "REJECTED" if decision.reasons else "ACCEPTED")
+
+        config["reject_rules"]["guarantor_age"] = False
+        decision = compile_config(config).evaluate_analysis(self.analyses[0])
+        self.assertFalse(decision.reasons & RejectionReason.GUARANTOR_AGE)
+
+    def test_records_are_scored_like_credit_batch(self):
+        compiled = compile_config({})
+        records = [make_record(), make_record(borrowing_history="D"), make_record(gross_income="lots")]
+        self.assertEqual(compiled.score_batch(records),
+                         [score_record(record, row) for row, record in enumerate(records, 1)])
+
+    def test_invalid_configs(self):
+        invalid = [
+            {"thresholds": {"min_total": 20}},
+            {"thresholds": {"min_total_credit_score": "20"}},
+            {"points": {"entity_type": {"SOLE_PROPRIETORSHIP": 3}}},
+            {"points": {"guarantors": []}},
+            {"points": {"borrowing_history": {"a": 1}}},
+            {"bands": {"debt_to_sales": {"base_points": 1, "edges": [{"edge": 50, "points": 3},
+                                                                     {"edge": 40, "points": 2}]}}},
+            {"bands": {"loan_to_valuation": {"edges": [{"edge": 60}]}}},
+            {"reject_rules": {"guarantor_age": {"min": 70, "max": 20}}},
+            {"reject_rules": {"no_guarantors": "yes"}},
+            {"scorecard": {}},
+        ]
+        for config in invalid:
+            with self.assertRaises(ScorecardConfigError, msg=json.dumps(config)):
+                compile_config(config)
+
+    def test_default_config_round_trips_through_json(self):
+        config = json.loads(json.dumps(config_from_scorecard()))
+        scorecard = CompiledScorecard(config).scorecard
+        for name in ("guarantor_points", "grade_points", "entity_type_points", "facility_type_points"):
+            self.assertEqual(getattr(scorecard, name), getattr(DEFAULT_SCORECARD, name), name)
+        bands = BandTable(1, [(60, 2, False), (80, 0, True)])
+        self.assertEqual(scorecard.loan_to_valuation_bands.edges, bands.edges)
+
+
+class TestScorecardReloader(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._directory.name, "scorecard.json")
+        self.write_config(config_from_scorecard(version="1"))
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def write_config(self, config):
+        with open(self.path, "w", encoding="utf-8") as stream:
+            stream.write(config if isinstance(config, str) else json.dumps(config))
+        # make the change visible even on file systems with coarse modification times
+        signature = os.stat(self.path)
+        os.utime(self.path, ns=(signature.st_atime_ns, signature.st_mtime_ns + 1000000))
+
+    def test_reload_swaps_the_version(self):
+        reloader = ScorecardReloader(self.path)
+        self.assertFalse(reloader.reload_if_changed(), "An unchanged file should not be compiled again")
+        in_flight = reloader.current
+        config = config_from_scorecard(version="2")
+        config["thresholds"]["min_total_credit_score"] = 10
+        self.write_config(config)
+        self.assertTrue(reloader.reload_if_changed())
+        self.assertEqual((reloader.current.version, reloader.reloads), ("2", 1))
+        self.assertEqual(in_flight.version, "1", "A batch holding the old version keeps scoring with it")
+        decision, = reloader.score_batch([make_record()])
+        self.assertEqual(decision["status"], "REJECTED", "The new threshold should be used")
+
+    def test_invalid_file_keeps_the_current_version(self):
+        reloader = ScorecardReloader(self.path)
+        config = copy.deepcopy(config_from_scorecard(version="2"))
+        config["points"]["guarantors"] = "many"
+        self.write_config(config)
+        self.assertFalse(reloader.reload_if_changed())
+        self.assertIsInstance(reloader.last_error, ScorecardConfigError)
+        self.assertEqual(reloader.current.version, "1")
+        self.assertFalse(reloader.reload_if_changed(), "A broken file should not be retried until it changes")
+        self.write_config("{not json")
+        self.assertFalse(reloader.reload_if_changed())
+        self.assertEqual(reloader.current.version, "1")
+
+    def test_watcher_thread_and_service_scorer(self):
+        reloader = ScorecardReloader(self.path).start(interval=0.01)
+        try:
+            batcher = MicroBatcher(reloader.score_batch)
+            self.write_config(config_from_scorecard(version="2"))
+            for _ in range(500):
+                if reloader.current.version == "2":
+                    break
+                reloader._stop.wait(0.01)
+        finally:
+            reloader.stop()
+        self.assertEqual(reloader.current.version, "2", "The watcher should pick up the change")
+        self.assertEqual(batcher.scorer([make_record()])[0]["status"], "ACCEPTED")
+
+    def test_command_line(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main(["default", self.path])
+            main(["check", self.path])
+        self.assertIn("Scorecard 'default' is valid", output.getvalue())
+        self.write_config({"thresholds": {"min_total": 1}})
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            main(["check", self.path])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import csv
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    BorrowerCreditAnalysis, BorrowStatus, FacilityDetails, TypeFacilityApplying, get_loan_to_valuation_ratio,
+)
+from credit_max_loan import (
+    UNLIMITED, NO_LOAN_COLUMN, UNLIMITED_COLUMN, max_approvable_loans, max_approvable_loan_columns,
+    largest_amount_below, main,
+)
+from credit_vectorized import columns_from_analyses
+from test_credit_batch import make_record
+from test_credit_vectorized import random_analysis
+
+
+def status_with_loan(analysis: BorrowerCreditAnalysis, facility_type: TypeFacilityApplying, amount: int):
+    market_value = analysis.borrower_collateral_detail.current_market_value
+    facility = FacilityDetails(facility_type, amount, get_loan_to_valuation_ratio(amount, market_value))
+    return BorrowerCreditAnalysis(analysis.borrower_information_details, analysis.borrower_financial_details,
+                                  analysis.borrower_collateral_detail, facility).evaluate().status
+
+
+class TestCreditMaxLoan(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(3)
+        cls.analyses = [random_analysis(rng) for _ in range(1500)]
+        cls.loans = [max_approvable_loans(analysis.borrower_information_details,
+                                          analysis.borrower_financial_details, analysis.borrower_collateral_detail)
+                     for analysis in cls.analyses]
+
+    def test_max_loan_is_accepted_and_one_more_is_rejected(self):
+        solved = 0
+        for analysis, loans in zip(self.analyses, self.loans):
+            for facility_type, loan in loans.items():
+                if loan is None or loan == UNLIMITED:
+                    continue
+                solved += 1
+                self.assertEqual(status_with_loan(analysis, facility_type, loan), BorrowStatus.ACCEPTED,
+                                 f"{loan} should be accepted for {facility_type.name}")
+                self.assertEqual(status_with_loan(analysis, facility_type, loan + 1), BorrowStatus.REJECTED,
+                                 f"{loan + 1} should be rejected for {facility_type.name}")
+        self.assertGreater(solved, 20, "the sample should have approvable applications")
+
+    def test_no_loan_and_unlimited(self):
+        for analysis, loans in zip(self.analyses, self.loans):
+            market_value = analysis.borrower_collateral_detail.current_market_value
+            for facility_type, loan in loans.items():
+                if loan is None:
+                    for amount in (0, market_value // 2, market_value * 7 // 10, market_value * 3):
+                        self.assertEqual(status_with_loan(analysis, facility_type, amount), BorrowStatus.REJECTED)
+                elif loan == UNLIMITED:
+                    self.assertEqual(status_with_loan(analysis, facility_type, 10 ** 12), BorrowStatus.ACCEPTED)
+
+    def test_columns_match_scalar(self):
+        columns = columns_from_analyses(self.analyses)
+        loan_columns = max_approvable_loan_columns(**columns)
+        for facility_type in TypeFacilityApplying:
+            expected = [NO_LOAN_COLUMN if loans[facility_type] is None else
+                        UNLIMITED_COLUMN if loans[facility_type] == UNLIMITED else loans[facility_type]
+                        for loans in self.loans]
+            self.assertEqual(loan_columns[facility_type].tolist(), expected, facility_type.name)
+
+    def test_largest_amount_below_handles_rounding(self):
+        for market_value in (1, 3, 7, 10 ** 7 + 1, 2 ** 52 + 1):
+            amount = largest_amount_below(60.0, market_value)
+            self.assertLess(get_loan_to_valuation_ratio(amount, market_value), 60.0)
+            self.assertGreaterEqual(get_loan_to_valuation_ratio(amount + 1, market_value), 60.0)
+
+    def test_command_line_reports_bad_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "applications.jsonl")
+            output_path = os.path.join(directory, "offers.csv")
+            with open(input_path, "w", encoding="utf-8") as stream:
+                stream.write("\n".join([json.dumps(make_record()), "{broken",
+                                        json.dumps(make_record(gross_income="²"))]) + "\n")
+            main([input_path, output_path])
+            with open(output_path, newline="", encoding="utf-8") as stream:
+                lines = list(csv.DictReader(stream))
+        self.assertEqual([line["error"] != "" for line in lines], [False, True, True],
+                         "Unreadable rows should be reported, not end the run")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+
+import MH6803_Required_Group_Project_code_Group1 as credit
+import credit_batch
+from credit_batch import score_records
+from credit_metrics import (
+    MetricsRegistry, StageMetrics, enable_instrumentation, disable_instrumentation, instrumentation_enabled,
+)
+from test_credit_batch import make_record, to_csv
+
+
+class TestCreditMetrics(unittest.TestCase):
+
+    def tearDown(self):
+        disable_instrumentation()
+
+    def test_disabled_leaves_the_originals_in_place(self):
+        original_section = credit.BorrowerCreditAnalysis.get_financial_details_score
+        original_score_record = credit_batch.score_record
+        enable_instrumentation(MetricsRegistry())
+        self.assertIsNot(credit_batch.score_record, original_score_record, "Enabled stages should be wrapped")
+        disable_instrumentation()
+        self.assertFalse(instrumentation_enabled(), "Nothing should stay instrumented")
+        self.assertIs(credit.BorrowerCreditAnalysis.get_financial_details_score, original_section)
+        self.assertIs(credit_batch.score_record, original_score_record)
+
+    def test_batch_stages_are_counted(self):
+        registry = enable_instrumentation(MetricsRegistry())
+        records = [make_record(), make_record(borrowing_history="D"), make_record(current_total_debt="x")]
+        decisions = list(score_records(records))
+        disable_instrumentation()
+        stages = registry.snapshot()
+        self.assertEqual([decision["status"] for decision in decisions], ["ACCEPTED", "REJECTED", "INVALID"],
+                         "Instrumentation must not change any decision")
+        self.assertEqual(stages["score_record"]["calls"], 3, "Every record should be counted")
+        self.assertEqual(stages["score_record"]["rejected"], 1, "One record is rejected")
+        self.assertEqual(stages["borrower_section"]["rejected"], 1, "Grade D rejects in the borrower section")
+        self.assertEqual(stages["decode_financial"]["errors"], 1, "The bad debt amount should count as an error")
+        self.assertGreater(stages["financial_section"]["total_seconds"], 0, "Time should be accumulated")
+
+    def test_interactive_steps_are_counted(self):
+        registry = enable_instrumentation(MetricsRegistry())
+        analysis = credit_batch.build_credit_analysis(make_record(borrowing_history="D"))
+        analysis.get_borrower_information_details_score()
+        disable_instrumentation()
+        stage = registry.snapshot()["get_borrower_information_details_score"]
+        self.assertEqual((stage["calls"], stage["rejected"]), (1, 1))
+
+    def test_rejection_is_counted_on_its_own_stage(self):
+        registry = enable_instrumentation(MetricsRegistry())
+        analysis = credit_batch.build_credit_analysis(make_record(borrowing_history="D"))
+        analysis.calculate_score_and_update_status()
+        disable_instrumentation()
+        stages = registry.snapshot()
+        self.assertEqual(stages["get_borrower_information_details_score"]["rejected"], 1)
+        for name in ("get_financial_details_score", "get_collateral_details_score", "get_facility_details_score"):
+            self.assertEqual((stages[name]["calls"], stages[name]["rejected"]), (1, 0),
+                             f"The borrower rejection should not be counted again in {name}")
+        self.assertEqual(stages["borrower_section"]["calls"], 1, "Sections should not be scored again")
+
+    def test_exports(self):
+        registry = MetricsRegistry()
+        for milliseconds in range(1, 101):
+            registry.stage("financial_section").record(milliseconds / 1000, rejected=milliseconds > 90)
+        snapshot = json.loads(registry.to_json())["stages"]["financial_section"]
+        self.assertEqual((snapshot["calls"], snapshot["rejected"]), (100, 10))
+        self.assertAlmostEqual(snapshot["p99_seconds"], 0.099)
+        text = registry.to_prometheus()
+        self.assertIn('credit_stage_seconds{stage="financial_section",quantile="0.5"} 0.05', text)
+        self.assertIn('credit_stage_seconds_count{stage="financial_section"} 100', text)
+        self.assertIn('credit_stage_rejected_total{stage="financial_section"} 10', text)
+
+    def test_empty_stage(self):
+        self.assertEqual(StageMetrics("empty").snapshot()["p50_seconds"], 0.0)
+
+    def test_batch_metrics_option(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "applications.csv")
+            metrics_path = os.path.join(directory, "metrics.json")
+            with open(input_path, "w", newline="", encoding="utf-8") as stream:
+                stream.write(to_csv([make_record()] * 4))
+            credit_batch.main([input_path, os.path.join(directory, "decisions.csv"), "--metrics", metrics_path])
+            with open(metrics_path, encoding="utf-8") as stream:
+                stages = json.load(stream)["stages"]
+        self.assertEqual(stages["score_record"]["calls"], 4, "Every row should be timed")
+        self.assertFalse(instrumentation_enabled(), "The batch should switch instrumentation off again")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import io
+import json
+import unittest
+
+from credit_batch import score_records, score_stream
+from credit_parallel import iter_chunks, score_records_parallel, parallel_scorer
+from test_credit_batch import make_record, to_csv
+
+
+def sample_records(count):
+    histories = ["A", "B", "C", "D"]
+    return [make_record(borrowing_history=histories[row % 4], current_total_debt=str(1000 * row))
+            for row in range(count)]
+
+
+class TestCreditParallel(unittest.TestCase):
+
+    def test_iter_chunks(self):
+        chunks = list(iter_chunks(range(7), 3))
+        self.assertEqual(chunks, [(1, [0, 1, 2]), (4, [3, 4, 5]), (7, [6])], "Chunks should keep row numbers")
+        with self.assertRaises(ValueError):
+            list(iter_chunks(range(3), 0))
+
+    def test_parallel_matches_sequential_order(self):
+        records = sample_records(50)
+        sequential = list(score_records(records))
+        parallel = list(score_records_parallel(iter(records), workers=2, chunk_size=4, chunks_in_flight=3))
+        self.assertEqual(parallel, sequential, "Parallel decisions should match the sequential ones in order")
+
+    def test_parallel_scorer_in_stream(self):
+        output = io.StringIO()
+        stats = score_stream(io.StringIO(to_csv(sample_records(20))), output, "csv", "jsonl",
+                             scorer=parallel_scorer(workers=2, chunk_size=6))
+        rows = [json.loads(line)["row"] for line in output.getvalue().splitlines()]
+        self.assertEqual(rows, list(range(1, 21)), "Rows should be written in input order")
+        self.assertEqual(stats.rows, 20, "All rows should be counted")
+
+    def test_empty_input(self):
+        self.assertEqual(list(score_records_parallel([], workers=2)), [], "No records should give no decisions")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import random
+import unittest
+
+import numpy as np
+
+from credit_records import (
+    ApplicationBatch, ApplicationRecord, BorrowerRecord, measure_bytes_per_record,
+)
+from credit_vectorized import score_columns, columns_from_analyses
+from test_credit_vectorized import random_analysis
+
+
+def details_of(analysis):
+    return [vars(details) for details in (analysis.borrower_information_details, analysis.borrower_financial_details,
+                                          analysis.borrower_collateral_detail, analysis.borrower_facility_details)]
+
+
+class TestCreditRecords(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(3)
+        self.analyses = [random_analysis(rng) for _ in range(300)]
+
+    def test_record_round_trip_is_lossless(self):
+        for analysis in self.analyses:
+            restored = ApplicationRecord.from_analysis(analysis).to_analysis()
+            self.assertEqual(details_of(restored), details_of(analysis), "Round trip should keep every field")
+
+    def test_records_score_like_the_original_classes(self):
+        for analysis in self.analyses:
+            record = ApplicationRecord.from_analysis(analysis)
+            self.assertEqual(record.to_scoring_analysis().evaluate(), analysis.evaluate(),
+                             "Frozen records should score exactly like the original classes")
+
+    def test_records_are_frozen_and_slotted(self):
+        record = BorrowerRecord.from_borrower(self.analyses[0].borrower_information_details)
+        self.assertFalse(hasattr(record, "__dict__"), "Records should not carry a __dict__")
+        with self.assertRaises(AttributeError):
+            record.full_name = "Jane Doe"
+
+    def test_batch_round_trip_is_lossless(self):
+        batch = ApplicationBatch.from_analyses(self.analyses)
+        self.assertEqual(len(batch), len(self.analyses), "Batch length mismatch")
+        for index, analysis in enumerate(self.analyses):
+            self.assertEqual(details_of(batch.analysis(index)), details_of(analysis), f"Row {index} differs")
+
+    def test_batch_keeps_unicode_names(self):
+        analysis = self.analyses[0]
+        analysis.borrower_information_details.full_name = "李小龙"
+        batch = ApplicationBatch.from_analyses([analysis, self.analyses[1]])
+        self.assertEqual(batch.full_name(0), "李小龙", "Names should survive the UTF-8 heap")
+        self.assertEqual(batch.full_name(1), "John Doe", "Name offsets should not overlap")
+
+    def test_batch_holds_more_histories_than_fit_in_16_bits(self):
+        analysis = self.analyses[0]
+        borrower = analysis.borrower_information_details
+        batch = ApplicationBatch()
+        histories = []
+        for index in range(70000):
+            borrower.borrowing_history = "".join(chr(65 + index // 26 ** power % 26) for power in range(4))
+            histories.append(borrower.borrowing_history)
+            batch.append_analysis(analysis)
+        self.assertEqual(batch.columns()["borrowing_history"][-3:].tolist(), histories[-3:])
+        self.assertEqual(batch.analysis(69999).borrower_information_details.borrowing_history, histories[-1])
+
+    def test_batch_columns_score_like_the_objects(self):
+        batch = ApplicationBatch.from_analyses(self.analyses)
+        from_batch = score_columns(**batch.columns())
+        from_objects = score_columns(**columns_from_analyses(self.analyses))
+        self.assertTrue(np.array_equal(from_batch.status, from_objects.status), "Statuses should match")
+        self.assertTrue(np.array_equal(from_batch.total_credit_score, from_objects.total_credit_score),
+                        "Totals should match")
+
+    def test_batch_is_smaller_than_objects(self):
+        measured = measure_bytes_per_record(2000)
+        self.assertLess(measured["ApplicationBatch arrays"], measured["BorrowerCreditAnalysis objects"] / 4,
+                        "The struct-of-arrays layout should be several times smaller")
+        self.assertLess(measured["ApplicationRecord tuples"], measured["BorrowerCreditAnalysis objects"],
+                        "Frozen records should be smaller than the original classes")
+
+
+if __name__ == "__main__":
+    unittest.main()
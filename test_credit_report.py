@@ -0,0 +1,104 @@
+import contextlib
+import csv
+import io
+import locale
+import random
+import unittest
+from unittest.mock import patch
+
+import MH6803_Required_Group_Project_code_Group1 as credit_analysis
+from credit_report import EN_US_CONVENTIONS, CurrencyFormatter, ReportRenderer, measure_throughput, render_reports
+from test_credit_vectorized import random_analysis
+
+AMOUNTS = (0, 7, -7, 999, 1000, -1000, 12.345, 1234567, -1234567.5, 98765432109)
+# localeconv() variants covering the symbol, sign and grouping rules of locale.currency
+CONVENTIONS = {
+    "en_US": EN_US_CONVENTIONS,
+    "de_DE": dict(EN_US_CONVENTIONS, currency_symbol="EUR", mon_decimal_point=",", mon_thousands_sep=".",
+                  mon_grouping=[3, 0], p_cs_precedes=0, n_cs_precedes=0, p_sep_by_space=1, n_sep_by_space=1),
+    "en_IN": dict(EN_US_CONVENTIONS, currency_symbol="Rs", mon_grouping=[3, 2, 0], n_sign_posn=0),
+    "one group": dict(EN_US_CONVENTIONS, mon_grouping=[3], n_sign_posn=2, positive_sign="+", p_sign_posn=3),
+    "no grouping": dict(EN_US_CONVENTIONS, mon_grouping=[127], mon_thousands_sep="", n_sign_posn=4),
+}
+
+
+def with_conventions(conventions: dict):
+    return patch.object(locale, "localeconv", return_value=dict(conventions, int_frac_digits=2))
+
+
+class TestCurrencyFormatter(unittest.TestCase):
+
+    def test_matches_locale_currency(self):
+        for name, conventions in CONVENTIONS.items():
+            formatter = CurrencyFormatter(conventions)
+            with with_conventions(conventions):
+                for amount in AMOUNTS:
+                    self.assertEqual(formatter(amount), locale.currency(amount, grouping=True), f"{name} {amount}")
+
+    def test_c_locale_cannot_format(self):
+        with self.assertRaises(ValueError):
+            CurrencyFormatter(dict(EN_US_CONVENTIONS, frac_digits=127))
+
+
+class TestReportRenderer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(23)
+        cls.analyses = [random_analysis(rng) for _ in range(40)]
+        cls.currency = CurrencyFormatter(EN_US_CONVENTIONS)
+
+    def test_text_matches_display_credit_analysis_result(self):
+        output = io.StringIO()
+        with with_conventions(EN_US_CONVENTIONS), patch.object(credit_analysis, "_report_locale", locale), \
+                contextlib.redirect_stdout(output):
+            for analysis in self.analyses:
+                analysis.calculate_score_and_update_status()
+                analysis.display_credit_analysis_result()
+        rendered = io.StringIO()
+        count = render_reports(self.analyses, rendered, "text", self.currency, chunk_size=7)
+        self.assertEqual(count, 40)
+        self.assertEqual(rendered.getvalue(), output.getvalue(), "The text layout should not change")
+
+    def test_csv_has_one_line_per_analysis(self):
+        rendered = io.StringIO()
+        render_reports(self.analyses, rendered, "csv", self.currency)
+        rows = list(csv.DictReader(io.StringIO(rendered.getvalue())))
+        self.assertEqual(len(rows), 40)
+        first = self.analyses[0]
+        self.assertEqual(rows[0]["Full Name"], first.borrower_information_details.full_name)
+        self.assertEqual(rows[0]["Gross Income"], self.currency(first.borrower_financial_details.gross_income))
+        self.assertEqual(rows[0]["Total Credit Analysis Score"], str(first.total_credit_score))
+
+    def test_html_is_escaped(self):
+        borrower = self.analyses[0].borrower_information_details
+        full_name = borrower.full_name
+        borrower.full_name = "Tom <&> Jerry"
+        try:
+            rendered = ReportRenderer("html", self.currency).render(self.analyses[:1])
+        finally:
+            borrower.full_name = full_name
+        self.assertIn("<td>Tom &lt;&amp;&gt; Jerry</td>", rendered)
+        self.assertEqual(rendered.count("<th colspan=\"2\">"), 6, "Every section should get a header row")
+
+    def test_thread_pool_keeps_the_order(self):
+        for report_format in ("text", "csv", "html"):
+            serial = io.StringIO()
+            render_reports(self.analyses, serial, report_format, self.currency, chunk_size=3)
+            threaded = io.StringIO()
+            render_reports(self.analyses, threaded, report_format, self.currency, chunk_size=3, workers=3)
+            self.assertEqual(threaded.getvalue(), serial.getvalue(), report_format)
+
+    def test_empty_input_and_bad_format(self):
+        rendered = io.StringIO()
+        self.assertEqual(render_reports([], rendered, "html", self.currency), 0)
+        self.assertTrue(rendered.getvalue().endswith("</html>\n"))
+        with self.assertRaises(ValueError):
+            ReportRenderer("pdf", self.currency)
+
+    def test_throughput_is_measured(self):
+        self.assertGreater(measure_throughput(self.analyses, "text", self.currency), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    BandTable, DEFAULT_SCORECARD, EntityType, GradeScore, Scorecard, SECTION_NAMES,
+)
+from credit_rescore import ScoredPortfolio, changed_ratio_ranges
+from credit_vectorized import score_columns, columns_from_analyses
+from test_credit_vectorized import random_analysis
+
+
+def modified_scorecard(**changes) -> Scorecard:
+    tables = dict(
+        entity_type_points=DEFAULT_SCORECARD.entity_type_points, bank_status_points=DEFAULT_SCORECARD.bank_status_points,
+        guarantor_points=DEFAULT_SCORECARD.guarantor_points, grade_points=DEFAULT_SCORECARD.grade_points,
+        property_type_points=DEFAULT_SCORECARD.property_type_points,
+        property_location_points=DEFAULT_SCORECARD.property_location_points,
+        facility_type_points=DEFAULT_SCORECARD.facility_type_points,
+        debt_to_sales_bands=DEFAULT_SCORECARD.debt_to_sales_bands,
+        debt_to_income_bands=DEFAULT_SCORECARD.debt_to_income_bands,
+        loan_to_valuation_bands=DEFAULT_SCORECARD.loan_to_valuation_bands)
+    tables.update(changes)
+    return Scorecard(**tables)
+
+
+class TestCreditRescore(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.columns = columns_from_analyses([random_analysis(rng) for _ in range(800)])
+
+    def assert_matches_full_scoring(self, portfolio: ScoredPortfolio, scorecard: Scorecard, **thresholds):
+        expected = score_columns(**self.columns, scorecard=scorecard, **thresholds)
+        for section in SECTION_NAMES:
+            self.assertEqual(getattr(portfolio, f"{section}_score").tolist(),
+                             getattr(expected, f"{section}_score").tolist(), f"{section} scores")
+        self.assertEqual(portfolio.total_credit_score.tolist(), expected.total_credit_score.tolist())
+        self.assertEqual(portfolio.reason_flags.tolist(), expected.reason_flags.tolist(), "reason flags")
+        self.assertEqual(portfolio.status.tolist(), expected.status.tolist(), "statuses")
+
+    def test_initial_scoring_matches_score_columns(self):
+        self.assert_matches_full_scoring(ScoredPortfolio(self.columns), DEFAULT_SCORECARD)
+
+    def test_moving_band_edge_touches_only_rows_in_between(self):
+        portfolio = ScoredPortfolio(self.columns)
+        scorecard = modified_scorecard(debt_to_sales_bands=BandTable(
+            1, [(40, 3, False), (50, 3, False), (60, 4, False), (65, 0, True)]))
+        report = portfolio.rescore(scorecard)
+        ratios = np.asarray(portfolio.debt_to_sales_ratio)
+        self.assertEqual(report.touched, int(((ratios > 65) & (ratios <= 70)).sum()),
+                         "only ratios between the old and the new edge are recomputed")
+        self.assertEqual(report.sections, ("financial",))
+        self.assert_matches_full_scoring(portfolio, scorecard)
+
+    def test_table_and_threshold_changes_match_full_scoring(self):
+        portfolio = ScoredPortfolio(self.columns)
+        entity_type_points = dict(DEFAULT_SCORECARD.entity_type_points)
+        entity_type_points[EntityType.COMPANY_LIMITED] = 3
+        grade_points = dict(DEFAULT_SCORECARD.grade_points, **{GradeScore.C.name: 1})
+        scorecard = modified_scorecard(entity_type_points=entity_type_points, grade_points=grade_points,
+                                       guarantor_points=(1, 5, 4, 3, 2, 2, 1),
+                                       loan_to_valuation_bands=BandTable(2, [(60, 2, False), (80, 0, True)]))
+        report = portfolio.rescore(scorecard, min_total_credit_score=18, min_collateral_score=6)
+        self.assert_matches_full_scoring(portfolio, scorecard, min_total_credit_score=18, min_collateral_score=6)
+        self.assertLess(report.touched, len(portfolio))
+        self.assertGreaterEqual(report.touched, report.status_changed)
+
+    def test_unchanged_scorecard_touches_nothing(self):
+        report = ScoredPortfolio(self.columns).rescore(DEFAULT_SCORECARD)
+        self.assertEqual((report.touched, report.sections), (0, ()))
+
+    def test_changed_ratio_ranges(self):
+        old = DEFAULT_SCORECARD.debt_to_income_bands
+        self.assertEqual(changed_ratio_ranges(old, old), [])
+        ranges = changed_ratio_ranges(old, BandTable(1, [(35, 3, False), (50, 0, True)]))
+        self.assertEqual(len(ranges), 1)
+        self.assertTrue(ranges[0][0] > 50 and ranges[0][1] > 55, "the scores change just above 50 up to 55")
+
+    def test_save_and_load(self):
+        portfolio = ScoredPortfolio(self.columns, min_total_credit_score=19)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "portfolio.npz")
+            portfolio.save(path)
+            loaded = ScoredPortfolio.load(path)
+            with self.assertRaises(ValueError):
+                ScoredPortfolio.load(path, modified_scorecard(guarantor_points=(1, 1)))
+        self.assertEqual(loaded.thresholds["min_total_credit_score"], 19)
+        loaded.rescore(min_total_credit_score=20)
+        self.assert_matches_full_scoring(loaded, DEFAULT_SCORECARD)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import unittest
+
+from credit_batch import score_records
+from credit_metrics import percentile
+from credit_service import MicroBatcher, ServiceStats, start_service, is_loopback
+from test_credit_batch import make_record
+
+
+async def post(port: int, path: str, payload=None, method: str = "POST"):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n"
+                 f"Connection: close\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+class TestCreditService(unittest.TestCase):
+
+    def run_with_service(self, scenario, **batcher_options):
+        async def run():
+            server = await start_service("127.0.0.1", 0, MicroBatcher(**batcher_options))
+            async with server:
+                return await scenario(server.sockets[0].getsockname()[1], server.service)
+
+        return asyncio.run(run())
+
+    def test_single_application(self):
+        async def scenario(port, service):
+            return await post(port, "/score", make_record())
+
+        status, decision = self.run_with_service(scenario)
+        self.assertEqual(status, 200, "The request should succeed")
+        self.assertEqual(decision["status"], "ACCEPTED", "Low risk application should be accepted")
+        self.assertEqual(decision["total_credit_score"], 13, "Total score mismatch")
+
+    def test_batched_applications(self):
+        async def scenario(port, service):
+            return await post(port, "/score", {"applications": [make_record(), make_record(borrowing_history="D")]})
+
+        status, payload = self.run_with_service(scenario)
+        self.assertEqual([d["status"] for d in payload["decisions"]], ["ACCEPTED", "REJECTED"])
+        self.assertEqual([d["row"] for d in payload["decisions"]], [1, 2], "Rows are numbered within the request")
+        self.assertIn("Only borrowing history A,B or C are accepted.", payload["decisions"][1]["rejection_reasons"])
+
+    def test_concurrent_requests_share_batches(self):
+        async def scenario(port, service):
+            results = await asyncio.gather(*[post(port, "/score", make_record(full_name=f"Client {index}"))
+                                             for index in range(20)])
+            return results, (await post(port, "/stats", method="GET"))[1]
+
+        results, stats = self.run_with_service(scenario, max_batch_size=8, max_delay=0.05)
+        self.assertEqual([payload["full_name"] for _, payload in results], [f"Client {i}" for i in range(20)],
+                         "Every request should get its own decision back")
+        self.assertEqual(stats["decisions"], 20, "Every application should be scored once")
+        self.assertLess(stats["batches"], 20, "Concurrent requests should be coalesced")
+        self.assertGreater(stats["latency_p99_ms"], 0, "Latency should be measured")
+
+    def test_errors(self):
+        async def scenario(port, service):
+            return (await post(port, "/score", [1, 2]), await post(port, "/nowhere", method="GET"),
+                    await post(port, "/score", method="GET"))
+
+        bad_payload, missing, wrong_method = self.run_with_service(scenario)
+        self.assertEqual((bad_payload[0], missing[0], wrong_method[0]), (400, 404, 405))
+
+    def test_invalid_record_is_reported_not_raised(self):
+        async def scenario(port, service):
+            return await post(port, "/score", make_record(number_of_guarantors="abc"))
+
+        status, decision = self.run_with_service(scenario)
+        self.assertEqual((status, decision["status"]), (200, "INVALID"))
+
+    def test_bad_record_does_not_fail_its_batch_neighbours(self):
+        async def scenario(port, service):
+            return await asyncio.gather(post(port, "/score", make_record(full_name="Clean Client")),
+                                        post(port, "/score", make_record(number_of_guarantors="²")))
+
+        (clean_status, clean), (bad_status, bad) = self.run_with_service(scenario, max_batch_size=2, max_delay=1.0)
+        self.assertEqual((clean_status, clean["status"]), (200, "ACCEPTED"))
+        self.assertEqual((bad_status, bad["status"]), (200, "INVALID"))
+
+    def test_scorer_failure_is_isolated_per_request(self):
+        def fragile_scorer(records):
+            if any(record.get("full_name") == "Crash Client" for record in records):
+                raise ValueError("scorer failed")
+            return list(score_records(records))
+
+        async def scenario(port, service):
+            return await asyncio.gather(post(port, "/score", [make_record(), make_record(full_name="Other One")]),
+                                        post(port, "/score", make_record(full_name="Crash Client")))
+
+        (clean_status, clean), (bad_status, bad) = self.run_with_service(
+            scenario, scorer=fragile_scorer, max_batch_size=3, max_delay=1.0)
+        self.assertEqual(clean_status, 200, "The clean request should not see the other request's failure")
+        self.assertEqual([decision["row"] for decision in clean["decisions"]], [1, 2])
+        self.assertEqual((bad_status, bad["error"]), (400, "scorer failed"))
+
+    def test_unexpected_scorer_error_is_answered_with_500(self):
+        def broken_scorer(records):
+            raise KeyError("full_name")
+
+        async def scenario(port, service):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            responses = []
+            for _ in range(2):
+                body = json.dumps(make_record()).encode("utf-8")
+                writer.write(f"POST /score HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n"
+                             .encode("latin-1") + body)
+                await writer.drain()
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+                responses.append((int(head.split()[1]), json.loads(await reader.readexactly(length))))
+            writer.close()
+            return responses, service.stats.errors
+
+        responses, errors = self.run_with_service(scenario, scorer=broken_scorer, max_delay=0.001)
+        self.assertEqual([status for status, _ in responses], [500, 500],
+                         "Every request should get an answer on the same kept-alive connection")
+        self.assertIn("KeyError", responses[0][1]["error"])
+        self.assertEqual(errors, 2, "Server errors should be counted")
+
+    def test_only_binds_to_localhost(self):
+        self.assertTrue(is_loopback("localhost") and is_loopback("127.0.0.1") and is_loopback("::1"))
+        with self.assertRaises(ValueError):
+            asyncio.run(start_service("0.0.0.0", 0))
+
+    def test_percentiles(self):
+        stats = ServiceStats()
+        for milliseconds in range(1, 101):
+            stats.record_request(milliseconds / 1000)
+        snapshot = stats.snapshot()
+        self.assertAlmostEqual(snapshot["latency_p50_ms"], 50)
+        self.assertAlmostEqual(snapshot["latency_p99_ms"], 99)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
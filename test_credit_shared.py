@@ -0,0 +1,60 @@
+import random
+import unittest
+from multiprocessing.shared_memory import SharedMemory
+
+from credit_shared import (
+    OUTPUT_DTYPES, SharedBatch, row_ranges, score_pickled, score_pickled_columns, score_shared,
+)
+from credit_vectorized import columns_from_analyses, score_columns
+from test_credit_vectorized import random_analysis
+
+
+class TestCreditShared(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(17)
+        cls.analyses = [random_analysis(rng) for _ in range(600)]
+        cls.columns = columns_from_analyses(cls.analyses)
+        cls.expected = score_columns(**cls.columns)
+
+    def assert_matches_expected(self, outputs: dict, expected=None):
+        expected = expected or self.expected
+        for name in OUTPUT_DTYPES:
+            self.assertEqual(outputs[name].tolist(), getattr(expected, name).tolist(), name)
+
+    def test_row_ranges(self):
+        self.assertEqual(row_ranges(7, 3), [(0, 3), (3, 6), (6, 7)])
+        self.assertEqual(row_ranges(0, 3), [])
+        with self.assertRaises(ValueError):
+            row_ranges(3, 0)
+
+    def test_workers_write_into_shared_outputs(self):
+        with SharedBatch(self.columns) as batch:
+            self.assert_matches_expected(score_shared(batch, workers=2, chunk_size=70))
+
+    def test_in_process_scoring_with_thresholds(self):
+        with SharedBatch(self.columns) as batch:
+            outputs = score_shared(batch, workers=1, chunk_size=250, min_total_credit_score=17)
+        self.assert_matches_expected(outputs, score_columns(**self.columns, min_total_credit_score=17))
+
+    def test_blocks_are_unlinked_on_close(self):
+        batch = SharedBatch(self.columns)
+        block_name = batch.spec()["blocks"]["status"][0]
+        batch.close()
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name=block_name)
+
+    def test_pickling_baselines_agree(self):
+        statuses = [status for status, _, _ in score_pickled(self.analyses, workers=2, chunk_size=200)]
+        self.assertEqual(statuses, self.expected.status.tolist())
+        self.assert_matches_expected(score_pickled_columns(self.columns, workers=2, chunk_size=200))
+
+    def test_empty_batch(self):
+        empty = {name: [] for name in self.columns}
+        with SharedBatch(empty) as batch:
+            self.assertEqual(score_shared(batch, workers=2)["status"].tolist(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import credit_batch
+from MH6803_Required_Group_Project_code_Group1 import BorrowerCreditAnalysis
+from credit_batch import build_borrower, build_credit_analysis, score_records
+from credit_store import DecisionStore, record_from_analysis
+from test_credit_batch import make_record, to_csv
+
+
+class TestCreditStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "decisions.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_and_query(self):
+        records = [make_record(), make_record(full_name="Jane Roe", borrowing_history="D"),
+                   make_record(gross_income="abc")]
+        with DecisionStore(self.path, buffer_rows=2) as store:
+            for decision, record in zip(score_records(records), records):
+                store.write(decision, record)
+        store = DecisionStore(self.path)
+        self.assertEqual(store.count_by_status(), {"ACCEPTED": 1, "REJECTED": 1, "INVALID": 1})
+        rejected = store.query(status="REJECTED")
+        self.assertEqual(len(rejected), 1, "One rejected decision expected")
+        self.assertEqual(rejected[0]["full_name"], "Jane Roe")
+        self.assertEqual(rejected[0]["borrowing_history"], "D", "Inputs should be stored with the decision")
+        self.assertIn("Only borrowing history A,B or C are accepted.", rejected[0]["rejection_reasons"])
+        self.assertEqual([row["row"] for row in store.query(min_total=13, max_total=13)], [1])
+        self.assertEqual(store.query(full_name="Nobody"), [])
+        store.close()
+
+    def test_runs_are_kept_apart(self):
+        with DecisionStore(self.path) as store:
+            first = store.start_run("first.csv")
+            store.write(next(score_records([make_record()])))
+            second = store.start_run("second.csv")
+            store.write(next(score_records([make_record(borrowing_history="D")])))
+            self.assertEqual(store.count_by_status(first), {"ACCEPTED": 1})
+            self.assertEqual(store.count_by_status(second), {"REJECTED": 1})
+
+    def test_interactive_analysis(self):
+        analysis = build_credit_analysis(make_record())
+        self.assertEqual(record_from_analysis(analysis), make_record(), "The input record should be rebuilt")
+        with DecisionStore(self.path) as store:
+            store.write_analysis(analysis)
+            self.assertEqual(store.query()[0]["total_credit_score"], 13)
+
+    def test_interactive_analysis_keeps_its_own_decision(self):
+        # rejected at the borrower stage, before the other details were entered
+        rejected_early = BorrowerCreditAnalysis(build_borrower(make_record(borrowing_history="D")))
+        strict = build_credit_analysis(make_record())
+        strict.min_total_credit_score = 10
+        with DecisionStore(self.path) as store:
+            store.write_analysis(rejected_early, row=1)
+            store.write_analysis(strict, row=2)
+            first, second = store.query()
+        self.assertEqual((first["status"], first["rejected_stage"], first["error"]), ("REJECTED", "borrower", ""))
+        self.assertIsNone(first["current_total_debt"], "Details that were never entered are not stored")
+        self.assertEqual((second["status"], second["rejected_stage"]), ("REJECTED", "total"),
+                         "The analysis' own threshold should decide")
+
+    def test_batch_store_option(self):
+        input_path = os.path.join(self.directory.name, "applications.csv")
+        with open(input_path, "w", newline="", encoding="utf-8") as stream:
+            stream.write(to_csv([make_record(), make_record(borrowing_history="D")] * 3))
+        with contextlib.redirect_stderr(io.StringIO()):
+            credit_batch.main([input_path, os.path.join(self.directory.name, "out.csv"), "--store", self.path])
+        with DecisionStore(self.path) as store:
+            self.assertEqual(store.count_by_status(), {"ACCEPTED": 3, "REJECTED": 3})
+            self.assertEqual([row["row"] for row in store.query(status="REJECTED")], [2, 4, 6])
+
+
+if __name__ == "__main__":
+    unittest.main()
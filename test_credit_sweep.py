@@ -0,0 +1,70 @@
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+
+from MH6803_Required_Group_Project_code_Group1 import BorrowStatus, RejectionReason
+from credit_sweep import main, sweep_thresholds, threshold_grid, THRESHOLDS
+from credit_vectorized import score_columns, columns_from_analyses
+from test_credit_batch import make_record, to_csv
+from test_credit_vectorized import random_analysis
+
+GRID = {"min_borrow_info_score": [10, 15], "min_financial_details_score": [5, 7, 12],
+        "min_collateral_score": [3, 5], "min_total_credit_score": [16, 20, 40]}
+
+
+class TestCreditSweep(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(11)
+        cls.analyses = [random_analysis(rng) for _ in range(600)]
+        cls.scores = score_columns(**columns_from_analyses(cls.analyses))
+
+    def test_grid_is_cartesian_product_with_defaults(self):
+        grid = threshold_grid({"min_total_credit_score": [18, 19], "min_collateral_score": [4, 5, 6]})
+        self.assertEqual(len(grid["min_total_credit_score"]), 6, "2 x 3 grid points")
+        self.assertEqual(set(grid["min_facility_score"].tolist()), {4}, "thresholds left out keep their default")
+        with self.assertRaises(ValueError):
+            threshold_grid({"min_unknown_score": [1]})
+
+    def test_sweep_matches_scalar_evaluation(self):
+        result = sweep_thresholds(self.scores, GRID)
+        self.assertEqual(len(result), 2 * 3 * 2 * 3)
+        for point, row in enumerate(result.rows()):
+            accepted = 0
+            reasons = dict.fromkeys(result.reasons, 0)
+            for analysis in self.analyses:
+                for name in THRESHOLDS:
+                    setattr(analysis, name, row[name])
+                decision = analysis.evaluate()
+                accepted += decision.status == BorrowStatus.ACCEPTED
+                for reason in reasons:
+                    reasons[reason] += bool(decision.reasons & reason)
+            self.assertEqual(row["accepted"], accepted, f"accepted count at grid point {point}")
+            for reason, count in reasons.items():
+                self.assertEqual(row[reason.name], count, f"{reason.name} count at grid point {point}")
+        self.assertGreater(result.accepted.max(), 0, "the grid should accept some applications")
+
+    def test_sweep_at_default_thresholds_matches_score_columns(self):
+        result = sweep_thresholds(self.scores, {})
+        self.assertEqual(int(result.accepted[0]), int((~self.scores.rejected).sum()))
+        self.assertEqual(int(result.reasons[RejectionReason.TOTAL_SCORE][0]),
+                         int((self.scores.total_credit_score >= 20).sum()))
+
+    def test_command_line_reports_invalid_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "applications.csv")
+            with open(path, "w", newline="", encoding="utf-8") as stream:
+                stream.write(to_csv([make_record(), make_record(gross_income="lots"), make_record()]))
+            errors = io.StringIO()
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(errors):
+                result = main([path])
+        self.assertEqual(int(result.accepted[0]), 2, "Only the valid applications should be swept")
+        self.assertIn("1 invalid applications skipped", errors.getvalue(), "Invalid rows should be reported")
+
+
+if __name__ == '__main__':
+    unittest.main()
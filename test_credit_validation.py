@@ -0,0 +1,83 @@
+import random
+import unittest
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    validate_full_name, validate_borrower_history, validate_number_input,
+)
+from credit_batch import MAX_NUMBER, build_credit_analysis, InvalidRecordError
+from credit_validation import (
+    is_valid_full_name, is_valid_borrower_history, is_valid_number, validate_records, validate_columns,
+    partition_records,
+)
+from test_credit_batch import make_record
+
+NAMES = ["John Doe", "John  Doe", " John", "John ", "John\n", "John\nDoe", "José García", "Zoë", "O'Brien",
+         "Anne-Marie", "李小龍", "Nguyễn Văn A", "John3", "John_Doe", "", " ", "½", "a²", "x٠", "Ωmega Ψ",
+         "John\tDoe", "ǅemal", "Á", "ß"]
+NUMBERS = ["0", "00", "123", "-1", "+1", "1.5", "", " ", "1e3", "١٢٣", "²", "①", "12\n", "１２", "9" * 30,
+           str(2 ** 63 - 1), "0" + str(2 ** 63 - 1), str(2 ** 63), "９" * 19]
+HISTORIES = ["A", "abc", "D", "AB1", "", "é", "A\n", "Z"]
+
+
+def single_number_verdict(number: str) -> bool:
+    # the interactive check plus the int64 bound credit_batch applies
+    try:
+        return validate_number_input(number) and int(number) <= MAX_NUMBER
+    except ValueError:
+        return False
+
+
+class TestCreditValidation(unittest.TestCase):
+
+    def test_agrees_with_single_value_validators(self):
+        for name in NAMES:
+            self.assertEqual(is_valid_full_name(name), validate_full_name(name), f"Name verdict differs for {name!r}")
+        for number in NUMBERS:
+            self.assertEqual(is_valid_number(number), single_number_verdict(number),
+                             f"Number verdict differs for {number!r}")
+        for history in HISTORIES:
+            self.assertEqual(is_valid_borrower_history(history), validate_borrower_history(history),
+                             f"History verdict differs for {history!r}")
+
+    def test_agrees_with_batch_decoding(self):
+        rng = random.Random(5)
+        fields = list(make_record())
+        records = []
+        for _ in range(3000):
+            record = make_record()
+            for _ in range(rng.randint(0, 2)):
+                record[rng.choice(fields)] = rng.choice(NAMES + NUMBERS + HISTORIES + ["1", "2", "3", "9"])
+            records.append(record)
+        report = validate_records(records)
+        for row, record in enumerate(records):
+            try:
+                build_credit_analysis(record)
+                decoded = True
+            except (InvalidRecordError, ValueError):
+                decoded = False
+            self.assertEqual(report.is_valid(row), decoded, f"Verdict differs on row {row}: {record}")
+
+    def test_every_error_of_a_row_is_collected(self):
+        records = [make_record(), make_record(full_name="J0hn", gross_income="-5", entity_type="7")]
+        del records[1]["applied_loan_amount"]
+        report = validate_records(records)
+        self.assertEqual(report.invalid_rows(), [1], "Only the second row is invalid")
+        errors = dict(report.row_errors(1))
+        self.assertEqual(list(errors), ["full_name", "entity_type", "gross_income", "applied_loan_amount"],
+                         "Every failing field should be reported in input order")
+        self.assertEqual(errors["applied_loan_amount"], "Missing field 'applied_loan_amount'.")
+        self.assertEqual(report.error_counts()["gross_income"], 1)
+
+    def test_partition_records(self):
+        records = [make_record(), make_record(borrowing_history="A1"), make_record(full_name="Jane Roe")]
+        valid, quarantined = partition_records(records)
+        self.assertEqual([record["full_name"] for record in valid], ["John Doe", "Jane Roe"])
+        self.assertEqual([(row, errors[0][0]) for row, _, errors in quarantined], [(1, "borrowing_history")])
+
+    def test_columns_must_have_the_same_length(self):
+        with self.assertRaises(ValueError):
+            validate_columns({"full_name": ["John"], "entity_type": ["1", "2"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
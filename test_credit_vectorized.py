@@ -0,0 +1,157 @@
+import gc
+import random
+import unittest
+import weakref
+
+import numpy as np
+
+from MH6803_Required_Group_Project_code_Group1 import (
+    Borrower, FinancialDetails, CollateralDetails, FacilityDetails, BorrowerCreditAnalysis, BorrowStatus,
+    EntityType, ClientBankStatus, TypeProperty, LocationProperty, CurrentPropertyStatus, TypeFacilityApplying,
+    get_debt_sales_ratio_score, get_to_income_ratio_score, get_loan_to_valuation_ratio_score,
+    get_debt_to_sales_ratio, get_debt_to_income_ratio, get_loan_to_valuation_ratio, RejectionReason,
+    DEFAULT_SCORECARD, get_debt_to_sales_band, Scorecard,
+)
+from credit_vectorized import (
+    score_columns, columns_from_analyses, get_debt_sales_ratio_scores, get_to_income_ratio_scores,
+    get_loan_to_valuation_ratio_scores, get_debt_to_sales_ratios, count_rejection_reasons,
+    get_band_scores_exact, get_ratio_basis_points, borrower_cells, collateral_cells, compile_scorecard,
+)
+
+BOUNDARY_RATIOS = [0, 34.9, 35, 39.5, 40, 49, 49.5, 50, 55, 55.1, 59, 59.5, 60, 70, 70.1, 79, 79.5, 80, 80.1, 120]
+
+
+def random_analysis(rng: random.Random) -> BorrowerCreditAnalysis:
+    current_total_debt = rng.choice([0, rng.randint(0, 10 ** 7)])
+    gross_income = rng.choice([0, rng.randint(1, 10 ** 7)])
+    total_sales_per_year = rng.choice([0, rng.randint(1, 10 ** 7)])
+    current_market_value = rng.choice([0, rng.randint(1, 10 ** 7)])
+    applied_loan_amount = rng.randint(0, 10 ** 7)
+    borrower = Borrower("John Doe", rng.choice(list(EntityType)), rng.choice(list(ClientBankStatus)),
+                        rng.randint(0, 7), rng.randint(15, 70), rng.choice(["A", "b", "C", "D", "z", "AB", "abc"]))
+    financial = FinancialDetails(current_total_debt, gross_income, total_sales_per_year,
+                                 get_debt_to_sales_ratio(current_total_debt, total_sales_per_year),
+                                 get_debt_to_income_ratio(current_total_debt, gross_income))
+    collateral = CollateralDetails(current_market_value, rng.choice(list(TypeProperty)),
+                                   rng.choice(list(CurrentPropertyStatus)), rng.choice(list(LocationProperty)))
+    facility = FacilityDetails(rng.choice(list(TypeFacilityApplying)), applied_loan_amount,
+                               get_loan_to_valuation_ratio(applied_loan_amount, current_market_value))
+    return BorrowerCreditAnalysis(borrower, financial, collateral, facility)
+
+
+class TestCreditVectorized(unittest.TestCase):
+
+    def test_band_scores_match_scalar(self):
+        ratios = np.array(BOUNDARY_RATIOS, dtype=np.float64)
+        self.assertEqual(get_debt_sales_ratio_scores(ratios).tolist(),
+                         [get_debt_sales_ratio_score(ratio) for ratio in BOUNDARY_RATIOS])
+        self.assertEqual(get_to_income_ratio_scores(ratios).tolist(),
+                         [get_to_income_ratio_score(ratio) for ratio in BOUNDARY_RATIOS])
+        self.assertEqual(get_loan_to_valuation_ratio_scores(ratios).tolist(),
+                         [get_loan_to_valuation_ratio_score(ratio) for ratio in BOUNDARY_RATIOS])
+
+    def test_ratios_match_scalar_bit_for_bit(self):
+        rng = random.Random(7)
+        debts = [rng.randint(0, 10 ** 9) for _ in range(2000)]
+        sales = [rng.choice([0, rng.randint(1, 10 ** 9)]) for _ in range(2000)]
+        vectorized = get_debt_to_sales_ratios(debts, sales).tolist()
+        scalar = [get_debt_to_sales_ratio(debt, sale) for debt, sale in zip(debts, sales)]
+        self.assertEqual(vectorized, scalar, "Ratios should be identical to the scalar path")
+
+    def test_exact_band_scores_match_scalar(self):
+        rng = random.Random(13)
+        numerators = [rng.choice([55, 70, 80, 35, 40, rng.randint(0, 10 ** 9)]) * rng.choice([1, 3, 10 ** 6])
+                      for _ in range(2000)]
+        denominators = [rng.choice([0, 100 * multiple, rng.randint(1, 10 ** 9)])
+                        for multiple in [rng.choice([1, 3, 10 ** 6]) for _ in range(2000)]]
+        for bands in (DEFAULT_SCORECARD.debt_to_sales_bands, DEFAULT_SCORECARD.debt_to_income_bands,
+                      DEFAULT_SCORECARD.loan_to_valuation_bands):
+            self.assertEqual(get_band_scores_exact(bands, numerators, denominators).tolist(),
+                             [bands.score_exact(numerator, denominator)
+                              for numerator, denominator in zip(numerators, denominators)])
+        self.assertEqual(get_ratio_basis_points(numerators, denominators).tolist(),
+                         [get_debt_to_sales_band(numerator, denominator).basis_points
+                          for numerator, denominator in zip(numerators, denominators)])
+
+    def test_exact_band_scores_do_not_overflow(self):
+        bands = DEFAULT_SCORECARD.debt_to_income_bands
+        numerators, denominators = [55 * 10 ** 15, 55 * 10 ** 15 + 1], [10 ** 17, 10 ** 17]
+        self.assertEqual(get_band_scores_exact(bands, numerators, denominators).tolist(), [3, 0])
+
+    def test_exact_ratios_option(self):
+        columns = columns_from_analyses([random_analysis(random.Random(seed)) for seed in range(200)])
+        columns["current_total_debt"][:2] = [55, 70]
+        columns["gross_income"][:2] = [100, 100]
+        columns["total_sales_per_year"][:2] = [100, 100]
+        exact = score_columns(**columns, exact_ratios=True)
+        self.assertEqual(exact.debt_to_income_score[0], 3, "Exactly 55% should score 3")
+        self.assertEqual(score_columns(**columns).debt_to_income_score[0], 0, "The float ratio is above 55%")
+
+    def test_cells_match_scalar(self):
+        rng = random.Random(21)
+        analyses = [random_analysis(rng) for _ in range(500)]
+        columns = columns_from_analyses(analyses)
+        self.assertEqual(
+            borrower_cells(columns["entity_type"], columns["bank_status"], columns["number_of_guarantors"],
+                           columns["age_of_guarantors"], columns["borrowing_history"]).tolist(),
+            [DEFAULT_SCORECARD.borrower_cell(analysis.borrower_information_details) for analysis in analyses])
+        self.assertEqual(
+            collateral_cells(columns["type_of_property"], columns["location_of_the_property"],
+                             columns["current_property_status"]).tolist(),
+            [DEFAULT_SCORECARD.collateral_cell(analysis.borrower_collateral_detail) for analysis in analyses])
+
+    def test_portfolio_matches_scalar(self):
+        rng = random.Random(42)
+        analyses = [random_analysis(rng) for _ in range(3000)]
+        scores = score_columns(**columns_from_analyses(analyses))
+        statuses = scores.statuses()
+        for row, analysis in enumerate(analyses):
+            borrower_score = analysis.get_borrower_information_details_score()
+            financial_score = analysis.get_financial_details_score()
+            collateral_score = analysis.get_collateral_details_score()
+            facility_score = analysis.get_facility_details_score()
+            total_credit_score = analysis.calculate_score_and_update_status()
+            self.assertEqual(
+                (scores.borrower_score[row], scores.financial_score[row], scores.collateral_score[row],
+                 scores.facility_score[row], scores.total_credit_score[row]),
+                (borrower_score, financial_score, collateral_score, facility_score, total_credit_score),
+                f"Section scores differ on row {row}")
+            self.assertEqual(statuses[row], analysis.borrower_analysis_status, f"Status differs on row {row}")
+
+    def test_reason_flags_match_scalar(self):
+        rng = random.Random(3)
+        analyses = [random_analysis(rng) for _ in range(2000)]
+        scores = score_columns(**columns_from_analyses(analyses))
+        expected = [int(analysis.evaluate().reasons) for analysis in analyses]
+        self.assertEqual(scores.reason_flags.tolist(), expected, "Reason flags should match the scalar path")
+        counts = count_rejection_reasons(scores.reason_flags)
+        for reason in RejectionReason:
+            self.assertEqual(counts[reason], sum(1 for flags in expected if flags & reason),
+                             f"Count mismatch for {reason.name}")
+
+    def test_thresholds_are_applied(self):
+        rng = random.Random(1)
+        columns = columns_from_analyses([random_analysis(rng) for _ in range(500)])
+        strict = score_columns(**columns, min_total_credit_score=0)
+        self.assertTrue(np.all(strict.status == BorrowStatus.REJECTED.value), "A zero total threshold rejects all")
+
+    def test_compiled_scorecards_do_not_outlive_their_scorecard(self):
+        scorecard = Scorecard(**{name: getattr(DEFAULT_SCORECARD, name) for name in (
+            "entity_type_points", "bank_status_points", "guarantor_points", "grade_points", "property_type_points",
+            "property_location_points", "facility_type_points", "debt_to_sales_bands", "debt_to_income_bands",
+            "loan_to_valuation_bands")})
+        compiled = compile_scorecard(scorecard)
+        self.assertIs(compile_scorecard(scorecard), compiled, "A scorecard should be compiled once")
+        collected = weakref.ref(scorecard)
+        del scorecard, compiled
+        gc.collect()
+        self.assertIsNone(collected(), "Compiling must not keep a scorecard alive, e.g. across hot reloads")
+
+    def test_empty_portfolio(self):
+        scores = score_columns(**{name: np.array([], dtype=np.int64) for name in
+                                  columns_from_analyses([]).keys()})
+        self.assertEqual(len(scores), 0, "An empty portfolio should produce no rows")
+
+
+if __name__ == "__main__":
+    unittest.main()